@@ -9,9 +9,13 @@ from pathlib import Path
 # Add src to path
 sys.path.append(str(Path(__file__).parent.parent / 'src'))
 
-from dashboard.predictor import RentPredictor
+from dashboard.predictor import BASELINE_LABEL, RentPredictor
 from dashboard.components import property_input_form, price_comparison_card
-from dashboard.visualizations import create_price_comparison_chart, create_model_comparison_chart
+from dashboard.visualizations import (
+    create_price_comparison_chart,
+    create_model_comparison_chart,
+    create_contribution_chart
+)
 
 # Page config
 st.set_page_config(
@@ -83,6 +87,12 @@ try:
                 )
                 st.plotly_chart(fig, width="stretch")
             
+            # Per-feature breakdown of the fair rent
+            explanation = predictor.explain(property_data)
+            fig = create_contribution_chart(explanation['contributions'], explanation['base_value'],
+                                            other_label=BASELINE_LABEL)
+            st.plotly_chart(fig, width="stretch")
+            
             # Insights
             st.markdown("---")
             st.subheader("💡 Insights & Recommendations")
@@ -9,9 +9,9 @@ from pathlib import Path
 # Add src to path
 sys.path.append(str(Path(__file__).parent.parent / 'src'))
 
-from dashboard.predictor import RentPredictor
+from dashboard.predictor import BASELINE_LABEL, RentPredictor
 from dashboard.components import property_input_form
-from dashboard.visualizations import create_price_comparison_chart
+from dashboard.visualizations import create_price_comparison_chart, create_contribution_chart
 
 # Page config
 st.set_page_config(
@@ -121,6 +121,15 @@ try:
                     """
                 )
             
+            # What the recommended rent is made of
+            st.markdown("---")
+            st.subheader("🔎 What Drives Your Rent")
+            explanation = predictor.explain(property_data)
+            fig = create_contribution_chart(explanation['contributions'], explanation['base_value'],
+                                            other_label=BASELINE_LABEL)
+            st.plotly_chart(fig, width="stretch")
+            st.caption("Contribution of each property feature, starting from the average predicted rent")
+            
             # Feature optimization tips
             st.markdown("---")
             st.subheader("🎯 How to Increase Your Rent")
@@ -4,6 +4,7 @@ Market Explorer: Interactive visualization of Dubai rental market
 
 import streamlit as st
 import pandas as pd
+import json
 import sys
 from pathlib import Path
 
@@ -16,6 +17,7 @@ from dashboard.visualizations import (
     create_price_per_sqft_chart,
     create_tier_comparison
 )
+from dashboard.components import feature_importance_table
 
 # Page config
 st.set_page_config(
@@ -35,6 +37,31 @@ st.markdown("---")
 def load_market_data():
     return pd.read_csv(config.FILE_ANALYTICAL_DATASET)
 
+# Rows the stored SHAP values explain, as shown in the caption
+SHAP_ROWS = {'test': 'the held-out test listings (never seen in training)',
+             'val': 'the validation listings (never seen in training)', 'all': 'all listings'}
+
+def shap_store_stamp():
+    """Modification time of the stored ensemble SHAP values (None until computed)"""
+    meta_path = config.SHAP_DIR / 'meta.json'
+    return meta_path.stat().st_mtime if meta_path.exists() else None
+
+@st.cache_data
+def load_model_drivers(store_stamp):
+    """
+    Mean |SHAP| per feature and the rows they were computed on, from the stored
+    ensemble SHAP matrix (cached per store_stamp, so a recomputed store is reloaded)
+    """
+    if store_stamp is None:
+        return None, None
+    from ml.ensemble_shap import mean_abs_shap
+    try:
+        with open(config.SHAP_DIR / 'meta.json') as f:
+            split = json.load(f).get('split', 'all')
+        return mean_abs_shap(), split
+    except FileNotFoundError:
+        return None, None
+
 try:
     df = load_market_data()
     
@@ -281,6 +308,18 @@ try:
                             f"+{beach_premium:,.0f} AED",
                             help="Average rent increase for beach-accessible properties"
                         )
+            
+            # Global model drivers (precomputed by ml.ensemble_shap, never computed here)
+            st.markdown("---")
+            st.markdown("##### What Drives the Model's Rent Estimates")
+            drivers, shap_split = load_model_drivers(shap_store_stamp())
+            if drivers:
+                top = list(drivers.items())[:15]
+                feature_importance_table([name for name, _ in top], [round(value) for _, value in top])
+                st.caption("Mean absolute SHAP value of the ensemble (AED/year) across "
+                           f"{SHAP_ROWS.get(shap_split, shap_split)}")
+            else:
+                st.caption("Run `python src/ml/ensemble_shap.py` to compute the ensemble SHAP values")
         else:
             st.warning("No data available with current filters")
     
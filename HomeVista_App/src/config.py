@@ -27,9 +27,27 @@ FILE_TENANT_PROFILES = RAW_DATA_DIR / "tenant_profiles.csv"
 FILE_MERGED_DATA = PROCESSED_DATA_DIR / "merged_listings.csv"
 FILE_ANALYTICAL_DATASET = PROCESSED_DATA_DIR / "analytical_dataset.csv"
 
+# Cache Paths (derived artifacts, safe to delete)
+CACHE_DIR = DATA_DIR / "cache"
+FEATURE_CACHE_DIR = CACHE_DIR / "features"
+# Size cap of the feature matrix cache; least recently used entries are evicted (None = unbounded)
+FEATURE_CACHE_MAX_MB = 4096
+MODEL_CACHE_DIR = CACHE_DIR / "models"
+BINNED_DATASET_CACHE_DIR = CACHE_DIR / "binned"
+# Size cap of the binned dataset cache; least recently used entries are evicted (None = unbounded)
+BINNED_DATASET_CACHE_MAX_MB = 2048
+# Quantized XGBoost matrix pairs kept in memory per process (least recently used dropped first)
+BINNED_DMATRIX_CACHE_ENTRIES = 4
+
 # Model Paths
 MODEL_PRICE_PREDICTOR = MODELS_DIR / "rental_price_model.pkl"
 MODEL_SCALER = MODELS_DIR / "feature_scaler.pkl"
+# Optuna studies (journal file, resumable and shared by tuning workers)
+OPTUNA_STORAGE = MODELS_DIR / "optuna_studies.journal"
+# Ensemble SHAP values (float32, written by ml.ensemble_shap; rows set by SHAP_SPLIT)
+SHAP_DIR = MODELS_DIR / "ensemble_shap"
+# Train/validation/test row indices and held-out matrices (written by model training)
+SPLIT_DIR = MODELS_DIR / "split"
 
 # Data Generation Parameters
 NUM_SYNTHETIC_LISTINGS = 16000  # 100% coverage of real market (16K-18K listings)
@@ -100,6 +118,84 @@ TEST_SIZE = 0.2  # 80-20 train-test split
 CROSS_VALIDATION_FOLDS = 5
 RANDOM_FOREST_ESTIMATORS = 100
 RANDOM_FOREST_MAX_DEPTH = 20
+# Grow the ensemble's Random Forest in steps of RF_OOB_TREE_STEP trees and stop
+# once a step improves the out-of-bag MAE by less than RF_OOB_TOLERANCE (relative)
+RF_OOB_EARLY_STOPPING = False
+RF_OOB_TREE_STEP = 10
+RF_OOB_TOLERANCE = 0.005
+# Rows per chunk for out-of-core feature engineering
+FEATURE_CHUNK_SIZE = 100_000
+# Categorical encoding for training: 'onehot' (dense), 'sparse' (CSR one-hot) or
+# 'native' (integer codes for LightGBM/CatBoost, CSR one-hot for RF/XGBoost)
+CATEGORICAL_ENCODING = "onehot"
+# Train the ensemble members concurrently, partitioning TRAINING_CORES between
+# them (None = all cores)
+PARALLEL_TRAINING = False
+TRAINING_CORES = None
+# Incremental retraining: extra boosting rounds / RF trees per update and the
+# share of existing listings replayed with the new ones
+INCREMENTAL_EXTRA_ROUNDS = 50
+INCREMENTAL_EXTRA_TREES = 20
+INCREMENTAL_REPLAY_FRACTION = 0.2
+# Fit ensemble weights on CROSS_VALIDATION_FOLDS out-of-fold predictions
+CV_ENSEMBLE_WEIGHTS = False
+# Record wall/CPU time, peak RSS, tree counts, model size and inference latency
+# per member in models/training_profile.json
+PROFILE_TRAINING = False
+# Importance-driven feature pruning: keep the smallest top-ranked feature subset
+# whose ensemble validation MAE is within FEATURE_PRUNING_TOLERANCE (relative)
+# of the full feature set
+FEATURE_PRUNING = False
+FEATURE_PRUNING_TOLERANCE = 0.01
+# Thread budgets (environment variables win): THREAD_LIMIT caps the cores used
+# by training and tuning runs (HOMEVISTA_THREADS, None = all available);
+# INFERENCE_THREADS is the per-request budget of the dashboard predictor
+# (HOMEVISTA_INFERENCE_THREADS). See ml.thread_budget.
+THREAD_LIMIT = None
+INFERENCE_THREADS = 1
+# Worker processes per Optuna study (None = one per core)
+OPTUNA_WORKERS = None
+# Trial pruner ("median", "hyperband" or None): trials report validation MAE
+# every OPTUNA_REPORT_INTERVAL boosting rounds (RF: trees) and are stopped once
+# they fall behind; the median pruner waits OPTUNA_PRUNING_WARMUP steps
+OPTUNA_PRUNER = "median"
+OPTUNA_REPORT_INTERVAL = 10
+OPTUNA_PRUNING_WARMUP = 30
+# Search mode: "study" (one Optuna trial per candidate on the full training
+# split), "halving" (successive halving over stratified training subsamples:
+# HALVING_ETA x more candidates start on HALVING_MIN_FRACTION of the rows and
+# the best 1/HALVING_ETA are promoted to the next, HALVING_ETA x larger sample)
+# or "multi" (Pareto front of MAE, inference latency and model size; the most
+# accurate front member within the budgets below is selected)
+OPTUNA_SEARCH = "study"
+HALVING_MIN_FRACTION = 1 / 9
+HALVING_ETA = 3
+# Per-member serving budgets for the "multi" search (None = unconstrained)
+LATENCY_BUDGET_MS = 5.0  # single-row predict
+BATCH_LATENCY_BUDGET_US = None  # per row of a LATENCY_BATCH_ROWS batch
+MODEL_SIZE_BUDGET_MB = None
+# Train the suite with the hyperparameters in models/best_hyperparameters.pkl
+USE_TUNED_HYPERPARAMETERS = False
+# Warm-started tuning: seed each search with the previous best parameters and
+# WARM_START_NEIGHBORS perturbations of them (every parameter moved by up to
+# WARM_START_SPREAD of its range) and run WARM_START_TRIALS trials instead of
+# N_TRIALS; WARM_START_NARROW also restricts the search space to that neighborhood.
+# Opt-in: each warm start runs in its own study (named after its seeds and space)
+OPTUNA_WARM_START = False
+WARM_START_NEIGHBORS = 4
+WARM_START_SPREAD = 0.15
+WARM_START_TRIALS = 8
+WARM_START_NARROW = False
+# Rows per TreeExplainer task when computing ensemble SHAP values in parallel
+SHAP_CHUNK_ROWS = 2000
+# Rows the stored ensemble SHAP values explain: a held-out split saved by model
+# training ("test", "val") or None (every listing, including training rows)
+SHAP_SPLIT = "test"
+# Sliced evaluation: metrics per value of each column below, with percentile
+# confidence intervals from BOOTSTRAP_REPLICATES Poisson-bootstrap resamples
+EVALUATION_SLICES = ['neighborhood', 'property_type', 'tier', 'furnished', 'data_source']
+BOOTSTRAP_REPLICATES = 1000
+BOOTSTRAP_CONFIDENCE = 0.95
 
 # Web Scraping Settings
 SCRAPE_TARGET_COUNT = 400  # Number of listings to scrape
@@ -7,15 +7,46 @@ feature engineering, and prediction generation with confidence intervals.
 """
 
 import joblib
+import json
 import pandas as pd
 import numpy as np
 import os
+import sys
 from typing import Dict, List, Tuple, Optional, Union, Any
 from pathlib import Path
 
+# Add src to path so project modules (and the pickled feature engineer) resolve
+# however this module is imported
+sys.path.append(str(Path(__file__).parent.parent))
+from ml.thread_budget import apply_process_limits, inference_threads, limit_model_threads, predict_options
+
 # Define paths
 MODELS_DIR = Path(__file__).parent.parent.parent / 'models'
 
+# Display names of the raw inputs explanations are reported on
+FEATURE_LABELS = {
+    'neighborhood': 'Neighborhood',
+    'property_type': 'Property Type',
+    'size_sqft': 'Size (sq ft)',
+    'bedrooms': 'Bedrooms',
+    'bathrooms': 'Bathrooms',
+    'amenity_count': 'Amenity Count',
+    'tier_numeric': 'Location Tier',
+    'furnished_numeric': 'Furnished',
+    'has_metro_numeric': 'Metro Access',
+    'beach_accessible_numeric': 'Beach Access',
+    'has_pool': 'Swimming Pool',
+    'has_gym': 'Gym',
+    'has_parking': 'Parking',
+    'has_balcony': 'Balcony',
+}
+
+# Inputs prepare_input fills with fixed placeholders instead of user values; their
+# contributions (and those of features derived from them) are not attributed to a
+# property feature but grouped under BASELINE_LABEL
+PLACEHOLDER_INPUTS = ('price_per_sqft', 'annual_rent', 'neighborhood_rent_avg', 'neighborhood_rent_std')
+BASELINE_LABEL = 'Other / model baseline'
+
 
 class RentPredictor:
     """
@@ -26,6 +57,7 @@ class RentPredictor:
         weights (Dict[str, float]): Ensemble weights for each model.
         engineer (AdvancedFeatureEngineer): Pre-fitted feature engineering pipeline.
         feature_names (List[str]): List of expected feature names.
+        raw_features (List[str]): Raw inputs that ``explain`` attributes predictions to.
     """
     
     def __init__(self):
@@ -34,6 +66,12 @@ class RentPredictor:
         self.weights: Dict[str, float] = {}
         self.engineer: Optional[Any] = None
         self.feature_names: List[str] = []
+        self.n_threads: int = 1
+        self._predict_kwargs: Dict[str, Dict[str, int]] = {}
+        self.raw_features: List[str] = []
+        self._raw_attribution: Optional[np.ndarray] = None
+        self._contribution_labels: List[str] = []
+        self._explainers: Dict[str, Any] = {}
         self._load_models()
         
     def _load_models(self) -> None:
@@ -49,9 +87,22 @@ class RentPredictor:
             self.weights = joblib.load(MODELS_DIR / 'ensemble_weights.pkl')
             self.engineer = joblib.load(MODELS_DIR / 'feature_engineer.pkl')
             
+            # Serve within the per-request thread budget instead of every core
+            self.n_threads = inference_threads()
+            apply_process_limits(self.n_threads)
+            limit_model_threads(self.models, self.n_threads)
+            self._predict_kwargs = {name: predict_options(model, self.n_threads)
+                                    for name, model in self.models.items()}
+            
             # Extract feature names if available
             if hasattr(self.engineer, 'feature_names'):
                 self.feature_names = self.engineer.feature_names
+            
+            # Check the engineer against the schema the models were trained on
+            schema_path = MODELS_DIR / 'feature_schema.json'
+            if schema_path.exists():
+                with open(schema_path) as f:
+                    self._validate_schema(json.load(f))
                 
         except FileNotFoundError as e:
             error_msg = f"""
@@ -68,6 +119,31 @@ class RentPredictor:
             print(error_msg)
             raise RuntimeError(error_msg) from e
             
+    def _validate_schema(self, schema: List[Dict[str, Any]]) -> None:
+        """
+        Verify that the feature engineer and models match the training feature schema.
+        
+        Args:
+            schema (List[Dict[str, Any]]): Feature schema saved by model training.
+            
+        Raises:
+            ValueError: If column names/order or model input widths disagree.
+        """
+        expected = [column['name'] for column in schema]
+        if list(self.feature_names) != expected:
+            raise ValueError(
+                f"Feature engineer produces {len(self.feature_names)} columns but the models "
+                f"were trained on {len(expected)}; re-run model training"
+            )
+        for name, model in self.models.items():
+            n_features = getattr(model, 'n_features_in_', None)
+            if hasattr(self.engineer, 'model_input_width'):
+                width = self.engineer.model_input_width(name)
+            else:
+                width = len(expected)
+            if n_features and n_features != width:
+                raise ValueError(f"{name} expects {n_features} features, engineer provides {width}")
+            
     def prepare_input(self, property_data: Dict[str, Any]) -> pd.DataFrame:
         """
         Convert raw user input into a DataFrame compatible with the feature engineer.
@@ -144,6 +220,142 @@ class RentPredictor:
         
         return df
     
+    def _model_inputs(self, X: Any) -> Dict[str, Any]:
+        """
+        Build each model's input from the transformed feature matrix.
+        
+        Args:
+            X (Any): Output of ``engineer.transform``.
+            
+        Returns:
+            Dict[str, Any]: Model name to model-ready input.
+        """
+        if getattr(self.engineer, 'encoding', 'onehot') != 'onehot':
+            # Sparse / native encodings: the engineer knows each member's format
+            return {name: self.engineer.model_input(X, name) for name in self.models}
+        
+        # Create DataFrame version for models that need feature names (LightGBM)
+        if self.feature_names:
+            X_df = pd.DataFrame(X, columns=self.feature_names)
+        else:
+            X_df = X
+        
+        # Random Forest was trained on numpy array, others prefer DataFrame
+        return {name: X if name == 'Random Forest' else X_df for name in self.models}
+    
+    def _tree_explainer(self, name: str) -> Any:
+        """SHAP TreeExplainer of a member without a native contribution API, built once."""
+        if name not in self._explainers:
+            import shap
+            self._explainers[name] = shap.TreeExplainer(self.models[name])
+        return self._explainers[name]
+    
+    def _member_contributions(self, name: str, X_model: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-column SHAP contributions of one member from its library's native API.
+        
+        XGBoost (``pred_contribs``), LightGBM (``pred_contrib``) and CatBoost
+        (``ShapValues``) compute them inside their predictors; other members (Random
+        Forest) use a cached TreeExplainer.
+        
+        Args:
+            name (str): Member name.
+            X_model (Any): Model-ready input.
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Contributions (rows x model input columns)
+                and the base value of each row.
+        """
+        model = self.models[name]
+        module = type(model).__module__
+        if module.startswith('xgboost'):
+            import xgboost as xgb
+            try:
+                iteration_range = (0, model.best_iteration + 1)
+            except AttributeError:
+                iteration_range = (0, 0)  # no early stopping: every tree
+            contribs = model.get_booster().predict(xgb.DMatrix(X_model, nthread=self.n_threads),
+                                                   pred_contribs=True, iteration_range=iteration_range,
+                                                   validate_features=False)
+        elif module.startswith('lightgbm'):
+            contribs = model.predict(X_model, pred_contrib=True, num_threads=self.n_threads)
+        elif module.startswith('catboost'):
+            from catboost import Pool
+            pool = Pool(X_model, cat_features=model.get_cat_feature_indices() or None)
+            contribs = model.get_feature_importance(pool, type='ShapValues', thread_count=self.n_threads)
+        else:
+            explainer = self._tree_explainer(name)
+            values = np.asarray(explainer.shap_values(X_model, check_additivity=False))
+            return values, np.full(len(values), float(np.ravel(explainer.expected_value)[0]))
+        if hasattr(contribs, 'toarray'):
+            contribs = contribs.toarray()
+        contribs = np.asarray(contribs, dtype=np.float64)
+        return contribs[:, :-1], contribs[:, -1]
+    
+    def _build_raw_attribution(self) -> None:
+        """Output-column-to-label attribution of ``explain``, placeholder inputs grouped under BASELINE_LABEL."""
+        self.raw_features, attribution = self.engineer.raw_feature_attribution()
+        labels = [BASELINE_LABEL if raw in PLACEHOLDER_INPUTS else FEATURE_LABELS.get(raw, raw)
+                  for raw in self.raw_features]
+        self._contribution_labels = list(dict.fromkeys(labels))
+        grouping = np.zeros((len(labels), len(self._contribution_labels)))
+        grouping[np.arange(len(labels)), [self._contribution_labels.index(label) for label in labels]] = 1
+        self._raw_attribution = attribution @ grouping
+    
+    def explain(self, property_data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Break the ensemble prediction down into per-feature contributions.
+        
+        Each member's contributions are folded onto the engineer's output columns,
+        combined with the ensemble weights and attributed to the raw inputs the
+        columns are computed from, so the base value plus the contributions equals
+        the ensemble prediction. Contributions of placeholder inputs the user never
+        entered (``PLACEHOLDER_INPUTS``) are grouped under ``BASELINE_LABEL``.
+        
+        Args:
+            property_data (Union[Dict[str, Any], List[Dict[str, Any]]]): One property
+                (as for ``predict``) or a list of them.
+        
+        Returns:
+            Dict[str, Any]: Dictionary containing:
+                - prediction: Ensemble prediction (float, array for a list)
+                - base_value: Expected ensemble prediction the contributions start from
+                - contributions: Feature label to AED contribution, largest effect first
+                  and ``BASELINE_LABEL`` last (DataFrame with one row per property for a list)
+        """
+        batch = not isinstance(property_data, dict)
+        rows = list(property_data) if batch else [property_data]
+        df = pd.concat([self.prepare_input(row) for row in rows], ignore_index=True)
+        X = self.engineer.transform(df)
+        
+        if self._raw_attribution is None:
+            self._build_raw_attribution()
+        
+        contributions = np.zeros((len(df), len(self.feature_names)))
+        base_values = np.zeros(len(df))
+        for name, X_model in self._model_inputs(X).items():
+            values, member_base = self._member_contributions(name, X_model)
+            folded = np.zeros_like(contributions)
+            np.add.at(folded, (slice(None), self.engineer.model_input_sources(name)), values)
+            contributions += self.weights[name] * folded
+            base_values += self.weights[name] * member_base
+        
+        by_input = pd.DataFrame(contributions @ self._raw_attribution, columns=self._contribution_labels)
+        predictions = base_values + by_input.sum(axis=1).to_numpy()
+        
+        if batch:
+            return {'prediction': predictions, 'base_value': base_values, 'contributions': by_input}
+        row = by_input.iloc[0]
+        drivers = row.drop(BASELINE_LABEL, errors='ignore')
+        order = list(drivers.abs().sort_values(ascending=False).index)
+        if BASELINE_LABEL in row.index:
+            order.append(BASELINE_LABEL)
+        return {
+            'prediction': float(predictions[0]),
+            'base_value': float(base_values[0]),
+            'contributions': {label: float(row[label]) for label in order},
+        }
+    
     def predict(self, property_data: Dict[str, Any], return_confidence: bool = True) -> Dict[str, Any]:
         """
         Predict rental price for a property.
@@ -164,22 +376,12 @@ class RentPredictor:
         
         # Apply feature engineering using the pre-fitted engineer
         # This will create all 58 features consistently
-        X_numpy = self.engineer.transform(df)
-        
-        # Create DataFrame version for models that need feature names (LightGBM)
-        if self.feature_names:
-            X_df = pd.DataFrame(X_numpy, columns=self.feature_names)
-        else:
-            X_df = X_numpy
+        X = self.engineer.transform(df)
         
         # Get predictions from all models
         predictions = {}
-        for name, model in self.models.items():
-            # Random Forest was trained on numpy array, others prefer DataFrame
-            if name == 'Random Forest':
-                predictions[name] = model.predict(X_numpy)[0]
-            else:
-                predictions[name] = model.predict(X_df)[0]
+        for name, X_model in self._model_inputs(X).items():
+            predictions[name] = self.models[name].predict(X_model, **self._predict_kwargs[name])[0]
         
         # Ensemble prediction
         ensemble_pred = sum(self.weights[name] * predictions[name] for name in predictions)
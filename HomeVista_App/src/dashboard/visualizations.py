@@ -230,3 +230,46 @@ def create_model_comparison_chart(model_predictions: Dict[str, float], weights:
     )
     
     return fig
+
+
+def create_contribution_chart(contributions: Dict[str, float], base_value: float, top_n: int = 8,
+                              other_label: str = 'Other features') -> go.Figure:
+    """
+    Create a waterfall chart from the market average to a property's predicted rent.
+    
+    Args:
+        contributions: Dict of feature label to AED contribution, largest effect first
+            (``RentPredictor.explain``)
+        base_value: Expected prediction the contributions start from
+        top_n: Features shown individually; the rest are grouped
+        other_label: Label of the grouped bar; a contribution with this label is
+            never shown as a feature and is added to the group
+    
+    Returns:
+        Plotly figure
+    """
+    items = [(label, value) for label, value in contributions.items() if label != other_label]
+    shown = items[:top_n]
+    rest = sum(value for _, value in items[top_n:]) + contributions.get(other_label, 0.0)
+    if len(items) > top_n or other_label in contributions:
+        shown.append((other_label, rest))
+    
+    fig = go.Figure(go.Waterfall(
+        x=['Market average'] + [label for label, _ in shown] + ['Predicted rent'],
+        y=[base_value] + [value for _, value in shown] + [0],
+        measure=['absolute'] + ['relative'] * len(shown) + ['total'],
+        increasing=dict(marker=dict(color='#2E86AB')),
+        decreasing=dict(marker=dict(color='#A23B72')),
+        totals=dict(marker=dict(color='#F18F01')),
+        connector=dict(line=dict(color='#999999'))
+    ))
+    
+    fig.update_layout(
+        title='What Drives This Price',
+        yaxis_title='Annual Rent (AED)',
+        template='plotly_white',
+        height=400,
+        showlegend=False
+    )
+    
+    return fig
@@ -0,0 +1,138 @@
+"""
+Apache Arrow Columnar Backend for Feature Engineering.
+
+Runs ``AdvancedFeatureEngineer`` on Arrow data (a ``pyarrow.Table``, e.g. loaded
+from Parquet, or a DataFrame with ``pd.ArrowDtype`` columns) and produces the
+same feature matrix as the pandas path.
+
+Only the columns the fitted transform plan reads are materialised. String
+categoricals are dictionary-encoded with Arrow compute kernels and handed to
+pandas as ``pd.Categorical`` (codes + a small dictionary), so target encoding
+lookups and category encoding work on the dictionary instead of every row's
+string. Numeric columns are converted without going through Python objects.
+
+pyarrow is an optional dependency; it is imported on first use.
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from ml.feature_engineering import AdvancedFeatureEngineer, CATEGORICAL_FEATURES
+
+
+def _require_pyarrow():
+    """Import pyarrow or explain how to install it."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError as e:
+        raise ImportError("The Arrow backend needs 'pyarrow'. Install it with: pip install pyarrow") from e
+    return pyarrow
+
+
+def to_arrow_table(data: Any) -> Any:
+    """
+    Normalise Arrow input to a ``pyarrow.Table``.
+
+    Args:
+        data (Any): ``pyarrow.Table``, ``pyarrow.RecordBatch`` (e.g. a Parquet chunk) or
+            DataFrame (Arrow-backed columns convert zero-copy).
+
+    Returns:
+        pyarrow.Table: Table view of the data.
+    """
+    pa = _require_pyarrow()
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    raise TypeError(f"Expected a pyarrow.Table, RecordBatch or pandas DataFrame, got {type(data).__name__}")
+
+
+def to_feature_frame(data: Any, columns: Sequence[str],
+                     categorical_columns: Sequence[str] = CATEGORICAL_FEATURES) -> pd.DataFrame:
+    """
+    Build the working frame for the feature engineer from Arrow data.
+
+    Args:
+        data (Any): ``pyarrow.Table`` or Arrow-dtype DataFrame.
+        columns (Sequence[str]): Columns to materialise; absent ones are skipped so the
+            engineer can report them.
+        categorical_columns (Sequence[str]): Columns to dictionary-encode.
+
+    Returns:
+        pd.DataFrame: NumPy-backed numeric columns and ``pd.Categorical`` categoricals.
+    """
+    pa = _require_pyarrow()
+    table = to_arrow_table(data)
+    present = [col for col in columns if col in table.column_names]
+    table = table.select(present)
+    for col in categorical_columns:
+        if col in present and not pa.types.is_dictionary(table.schema.field(col).type):
+            index = table.column_names.index(col)
+            table = table.set_column(index, col, pa.compute.dictionary_encode(table.column(col)))
+    # Dictionary columns become pd.Categorical, numeric columns plain NumPy dtypes
+    return table.to_pandas()
+
+
+def transform_arrow(engineer: AdvancedFeatureEngineer, data: Any) -> Union[np.ndarray, sparse.csr_matrix]:
+    """
+    Transform Arrow data with a fitted engineer.
+
+    Args:
+        engineer (AdvancedFeatureEngineer): Fitted feature engineer.
+        data (Any): ``pyarrow.Table`` or Arrow-dtype DataFrame.
+
+    Returns:
+        Union[np.ndarray, sparse.csr_matrix]: Same matrix as ``engineer.transform`` on pandas data.
+    """
+    frame = to_feature_frame(data, engineer.required_inputs(), engineer.categorical_features)
+    return engineer.transform(frame)
+
+
+def fit_transform_arrow(engineer: AdvancedFeatureEngineer, data: Any,
+                        target_col: str = 'annual_rent') -> Tuple[Any, np.ndarray, List[str]]:
+    """
+    Fit an engineer on Arrow data and transform it.
+
+    Args:
+        engineer (AdvancedFeatureEngineer): Unfitted feature engineer.
+        data (Any): ``pyarrow.Table`` or Arrow-dtype DataFrame.
+        target_col (str): Target variable name.
+
+    Returns:
+        Tuple[Any, np.ndarray, List[str]]: X, y and feature names, as ``fit_transform``.
+    """
+    table = to_arrow_table(data)
+    frame = to_feature_frame(table, table.column_names)
+    return engineer.fit_transform(frame, target_col)
+
+
+def read_parquet(path: Union[str, Path], engineer: Optional[AdvancedFeatureEngineer] = None,
+                 target_col: Optional[str] = 'annual_rent') -> Any:
+    """
+    Read a Parquet file as an Arrow table, projecting to the columns the engineer reads.
+
+    Args:
+        path (Union[str, Path]): Parquet file or dataset directory.
+        engineer (Optional[AdvancedFeatureEngineer]): Fitted engineer; all columns are read if None.
+        target_col (Optional[str]): Target column to read alongside the inputs.
+
+    Returns:
+        pyarrow.Table: Loaded table.
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+    columns = None
+    if engineer is not None:
+        columns = engineer.required_inputs() + ([target_col] if target_col else [])
+    return pq.read_table(path, columns=columns)
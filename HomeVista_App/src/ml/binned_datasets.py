@@ -0,0 +1,184 @@
+"""
+Pre-Binned Training Datasets for XGBoost and LightGBM.
+
+Both boosters quantize the raw float matrix into histogram bins before they
+grow a single tree, and the sklearn wrappers redo that on every ``fit`` - once
+per Optuna trial. This module builds the binned datasets once per data
+fingerprint and hands the same objects to every trial:
+
+- LightGBM: the constructed ``lgb.Dataset`` pair (train + validation binned
+  with the training bin mappers) is saved with ``save_binary`` and reloaded in
+  later runs, so histogram construction is skipped across runs as well.
+- XGBoost: ``QuantileDMatrix`` pairs are kept in memory for the process,
+  up to ``config.BINNED_DMATRIX_CACHE_ENTRIES`` least recently used pairs.
+  XGBoost cannot serialize quantized matrices (``save_binary`` only supports
+  plain DMatrix), so they are rebuilt once per run.
+
+Layout of one LightGBM cache entry::
+
+    <cache_dir>/lgbm-<key>/train.bin
+    <cache_dir>/lgbm-<key>/val.bin
+
+Every data fingerprint (e.g. each halving subsample) adds an entry, so the
+cache is kept under ``config.BINNED_DATASET_CACHE_MAX_MB`` by evicting the
+least recently used entries whenever a new one is written.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import lightgbm as lgb
+import xgboost as xgb
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from ml.model_cache import array_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Binning parameters shared by every trial (LGBMRegressor defaults). Dataset
+# construction pre-filters features using min_child_samples, so trials must
+# keep that at its default of 20.
+LGBM_DATASET_PARAMS = {'max_bin': 255, 'min_child_samples': 20, 'verbose': -1}
+XGB_MAX_BIN = 256
+
+_dmatrix_cache: 'OrderedDict[str, Tuple[xgb.QuantileDMatrix, xgb.QuantileDMatrix]]' = OrderedDict()
+
+
+def _dataset_key(data_fingerprint: str, library: Any, params: Dict[str, Any]) -> str:
+    """Key of one binned dataset pair: data, binning parameters and library version."""
+    payload = json.dumps({'data': data_fingerprint, 'library': library.__version__, 'params': params},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def xgboost_dmatrices(X_train, y_train, X_val, y_val,
+                      max_bin: int = XGB_MAX_BIN) -> Tuple[xgb.QuantileDMatrix, xgb.QuantileDMatrix]:
+    """
+    Quantized XGBoost training and validation matrices, built once per process.
+
+    The validation matrix reuses the training cut points (``ref``). Train with
+    ``xgb.train(..., {'max_bin': max_bin, 'tree_method': 'hist'})``. At most
+    ``config.BINNED_DMATRIX_CACHE_ENTRIES`` pairs are kept; the least recently
+    used pair is dropped when a new one is built.
+    """
+    key = _dataset_key(array_fingerprint(X_train, y_train, X_val, y_val), xgb, {'max_bin': max_bin})
+    if key in _dmatrix_cache:
+        _dmatrix_cache.move_to_end(key)
+        return _dmatrix_cache[key]
+    dtrain = xgb.QuantileDMatrix(X_train, y_train, max_bin=max_bin)
+    dval = xgb.QuantileDMatrix(X_val, y_val, ref=dtrain, max_bin=max_bin)
+    _dmatrix_cache[key] = (dtrain, dval)
+    while len(_dmatrix_cache) > max(1, config.BINNED_DMATRIX_CACHE_ENTRIES):
+        _dmatrix_cache.popitem(last=False)
+    return _dmatrix_cache[key]
+
+
+def lightgbm_datasets(X_train, y_train, X_val, y_val,
+                      categorical_feature: Union[Sequence[int], str] = 'auto',
+                      params: Optional[Dict[str, Any]] = None,
+                      cache_dir: Union[str, Path, None] = None) -> Tuple[lgb.Dataset, lgb.Dataset]:
+    """
+    Binned LightGBM training and validation datasets, loaded from disk when cached.
+
+    Args:
+        X_train, y_train, X_val, y_val: Training and validation data.
+        categorical_feature (Union[Sequence[int], str]): Native categorical columns.
+        params (Optional[Dict[str, Any]]): Dataset parameters (default ``LGBM_DATASET_PARAMS``).
+        cache_dir (Union[str, Path, None]): Cache root. Defaults to ``config.BINNED_DATASET_CACHE_DIR``.
+
+    Returns:
+        Tuple[lgb.Dataset, lgb.Dataset]: Constructed datasets for ``lgb.train``.
+    """
+    params = dict(params if params is not None else LGBM_DATASET_PARAMS)
+    key = _dataset_key(array_fingerprint(X_train, y_train, X_val, y_val), lgb,
+                       {**params, 'categorical_feature': categorical_feature})
+    entry_dir = Path(cache_dir if cache_dir is not None else config.BINNED_DATASET_CACHE_DIR) / f"lgbm-{key}"
+
+    if not (entry_dir / 'val.bin').exists():
+        logger.info(f"Building binned LightGBM datasets {key}")
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{entry_dir.name}-", dir=entry_dir.parent))
+        try:
+            train_set = lgb.Dataset(X_train, y_train, params=params,
+                                    categorical_feature=categorical_feature, free_raw_data=False).construct()
+            lgb.Dataset(X_val, y_val, reference=train_set, params=params,
+                        categorical_feature=categorical_feature).construct().save_binary(str(tmp_dir / 'val.bin'))
+            train_set.save_binary(str(tmp_dir / 'train.bin'))
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Another process published the same entry first; keep theirs
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not (entry_dir / 'val.bin').exists():
+                raise
+        evict_cache(cache_dir=entry_dir.parent, keep=entry_dir)
+    else:
+        # Mark as recently used for eviction
+        os.utime(entry_dir)
+
+    train_set = lgb.Dataset(str(entry_dir / 'train.bin'), params=params).construct()
+    val_set = lgb.Dataset(str(entry_dir / 'val.bin'), reference=train_set, params=params).construct()
+    return train_set, val_set
+
+
+def _entry_size(entry_dir: Path) -> int:
+    """Bytes held by one cache entry (0 if another process removed it meanwhile)."""
+    try:
+        return sum(path.stat().st_size for path in entry_dir.iterdir())
+    except FileNotFoundError:
+        return 0
+
+
+def evict_cache(max_mb: Optional[float] = None, cache_dir: Union[str, Path, None] = None,
+                keep: Union[str, Path, None] = None) -> int:
+    """
+    Delete the least recently used LightGBM entries until the cache fits in ``max_mb``.
+
+    Args:
+        max_mb (Optional[float]): Size cap. Defaults to ``config.BINNED_DATASET_CACHE_MAX_MB``
+            (None = unbounded).
+        cache_dir (Union[str, Path, None]): Cache root. Defaults to ``config.BINNED_DATASET_CACHE_DIR``.
+        keep (Union[str, Path, None]): Entry that is never evicted (the one just written).
+
+    Returns:
+        int: Number of entries deleted.
+    """
+    max_mb = config.BINNED_DATASET_CACHE_MAX_MB if max_mb is None else max_mb
+    cache_dir = Path(cache_dir if cache_dir is not None else config.BINNED_DATASET_CACHE_DIR)
+    if max_mb is None or not cache_dir.exists():
+        return 0
+    entries = []
+    for entry_dir in cache_dir.glob('lgbm-*'):
+        try:
+            entries.append((entry_dir.stat().st_mtime, entry_dir, _entry_size(entry_dir)))
+        except FileNotFoundError:
+            continue
+    total = sum(size for _, _, size in entries)
+    limit = max_mb * 1024 ** 2
+    evicted = 0
+    for _, entry_dir, size in sorted(entries, key=lambda entry: entry[0]):
+        if total <= limit:
+            break
+        if keep is not None and entry_dir == Path(keep):
+            continue
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+        evicted += 1
+    if evicted:
+        logger.info(f"Evicted {evicted} binned LightGBM datasets ({total / 1024 ** 2:.0f} MB kept)")
+    return evicted
+
+
+def clear_cache(cache_dir: Union[str, Path, None] = None) -> None:
+    """Delete every cached binned dataset and drop the in-memory matrices."""
+    _dmatrix_cache.clear()
+    shutil.rmtree(cache_dir if cache_dir is not None else config.BINNED_DATASET_CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,147 @@
+"""
+Parallel K-Fold Cross-Validation of the Ensemble Members.
+
+Every (model, fold) pair is an independent task on a process pool, so wall time
+scales with the number of cores rather than folds x models. The feature matrix
+and target are placed in shared memory once (see ``ml.parallel_training``);
+tasks only receive fold indices. Each task early-stops on a slice of its
+training fold and predicts the held-out fold, giving out-of-fold (OOF)
+predictions for every row that the ensemble weights are fitted on.
+"""
+
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sklearn.model_selection import KFold, train_test_split
+from threadpoolctl import threadpool_limits
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from ml.model_training import MODEL_NAMES, inverse_mape_weights, model_inputs, regression_scores, train_member
+from ml.parallel_training import SharedArrays, _attach
+from ml.thread_budget import apply_process_limits, core_budget
+
+# Share of each training fold held back for early stopping
+EARLY_STOPPING_FRACTION = 0.1
+
+
+def _fit_fold_worker(name: str, fold: int, train_idx: np.ndarray, test_idx: np.ndarray,
+                     descriptors: tuple, engineer: Any, n_threads: int,
+                     params: Optional[Dict[str, Any]] = None) -> tuple:
+    """Process pool task: train one member on one fold and predict the held-out rows."""
+    blocks: List = []
+    X, y = (_attach(d, blocks) for d in descriptors)
+    fit_idx, stop_idx = train_test_split(train_idx, test_size=EARLY_STOPPING_FRACTION, random_state=42)
+    with threadpool_limits(limits=n_threads):
+        model, _ = train_member(name, X[fit_idx], y[fit_idx], X[stop_idx], y[stop_idx],
+                                engineer, n_jobs=n_threads, params=params)
+        X_test, = model_inputs(engineer, name, X[test_idx])
+        pred = model.predict(X_test)
+    del X, y, X_test, model
+    for block in blocks:
+        block.close()
+    return name, fold, pred
+
+
+def cross_validate_suite(X, y, engineer=None, n_folds: Optional[int] = None,
+                         n_cores: Optional[int] = None,
+                         names: Sequence[str] = MODEL_NAMES,
+                         tuned_params: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    K-fold cross-validate every member in parallel.
+
+    Args:
+        X, y: Feature matrix (dense or CSR) and target.
+        engineer: Fitted feature engineer used to adapt inputs per member.
+        n_folds (Optional[int]): Number of folds (default ``config.CROSS_VALIDATION_FOLDS``).
+        n_cores (Optional[int]): Cores to use (default: all).
+        names (Sequence[str]): Members to validate.
+        tuned_params (Optional[Dict[str, Dict[str, Any]]]): Hyperparameter overrides per member.
+
+    Returns:
+        Dict[str, Any]: ``oof_predictions`` (name -> array aligned with y),
+            ``fold_scores`` (name -> per-fold metric dicts), ``summary``
+            (name -> mean/std per metric, including the OOF ensemble),
+            ``weights`` fitted on the OOF predictions and ``wall_seconds``.
+    """
+    n_folds = n_folds or config.CROSS_VALIDATION_FOLDS
+    n_cores = core_budget(n_cores)
+    names = list(names)
+    tuned_params = tuned_params or {}
+    y = np.asarray(y)
+    folds = list(KFold(n_splits=n_folds, shuffle=True, random_state=config.RANDOM_SEED).split(y))
+    n_tasks = len(names) * n_folds
+    workers = min(n_tasks, n_cores)
+    n_threads = max(1, n_cores // workers)
+
+    print("\n" + "="*60)
+    print(f"CROSS-VALIDATION ({n_folds} folds x {len(names)} models, {workers} workers)")
+    print("="*60)
+
+    oof = {name: np.zeros(len(y)) for name in names}
+    start = time.perf_counter()
+    with SharedArrays() as shared:
+        descriptors = (shared.share(X), shared.share(y))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+            futures = [pool.submit(_fit_fold_worker, name, fold, train_idx, test_idx,
+                                   descriptors, engineer, n_threads, tuned_params.get(name))
+                       for name in names for fold, (train_idx, test_idx) in enumerate(folds)]
+            for future in as_completed(futures):
+                name, fold, pred = future.result()
+                oof[name][folds[fold][1]] = pred
+    wall = time.perf_counter() - start
+
+    fold_scores = {name: [regression_scores(y[test_idx], oof[name][test_idx]) for _, test_idx in folds]
+                   for name in names}
+    weights = inverse_mape_weights(oof, y)
+    ensemble_oof = sum(weights[name] * oof[name] for name in names)
+    fold_scores['Ensemble'] = [regression_scores(y[test_idx], ensemble_oof[test_idx]) for _, test_idx in folds]
+
+    summary = {}
+    for name, scores in fold_scores.items():
+        summary[name] = {metric: {'mean': float(np.mean([s[metric] for s in scores])),
+                                  'std': float(np.std([s[metric] for s in scores]))}
+                         for metric in scores[0]}
+        print(f"  {name}: MAE {summary[name]['MAE']['mean']:,.0f} ± {summary[name]['MAE']['std']:,.0f}, "
+              f"MAPE {summary[name]['MAPE']['mean']:.2f}% ± {summary[name]['MAPE']['std']:.2f}%")
+    print(f"\nCross-validation wall time: {wall:.1f}s")
+
+    return {
+        'oof_predictions': oof,
+        'fold_scores': fold_scores,
+        'summary': summary,
+        'weights': weights,
+        'wall_seconds': wall,
+    }
+
+
+def save_cv_report(results: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    """Write the CV summary and OOF ensemble weights as JSON (default models/cv_report.json)."""
+    path = Path(path) if path is not None else config.MODELS_DIR / 'cv_report.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({key: results[key] for key in ('summary', 'weights', 'wall_seconds')}, f, indent=2)
+    return path
+
+
+if __name__ == "__main__":
+    from ml.feature_cache import load_features
+    from ml.feature_engineering import AdvancedFeatureEngineer
+    from ml.model_training import load_data
+    from ml.split_manifest import split_indices
+
+    apply_process_limits(core_budget(config.TRAINING_CORES))
+    # Folds cover the training split only, as in model training; held-out rows stay unseen
+    df = load_data()
+    train_idx = split_indices(len(df))['train']
+    X, y, _, engineer = load_features(df=df, engineer=AdvancedFeatureEngineer(encoding=config.CATEGORICAL_ENCODING),
+                                      fit_index=train_idx)
+    results = cross_validate_suite(X[train_idx], y[train_idx], engineer, n_cores=config.TRAINING_CORES)
+    print(f"[SUCCESS] CV report saved to {save_cv_report(results)}")
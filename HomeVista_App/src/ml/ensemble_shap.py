@@ -0,0 +1,251 @@
+"""
+Ensemble SHAP Values.
+
+SHAP values are additive, so the values of the weighted ensemble are the
+ensemble-weighted sum of each member's values. Every (member, row chunk) pair
+is an independent TreeExplainer task on a process pool: the feature matrix is
+placed in shared memory once (see ``ml.parallel_training``) and the members and
+engineer are sent to each worker once, when it starts. Members fed a one-hot
+expansion of 'native' codes are folded back onto the engineer's output columns
+(``AdvancedFeatureEngineer.model_input_sources``) before weighting.
+
+The result for the whole analytical dataset (or a held-out split saved by
+model training, ``config.SHAP_SPLIT``) is stored as a float32 matrix that
+the SHAP plots and the dashboard read instead of recomputing::
+
+    <SHAP_DIR>/shap_values.npy   (float32, rows x feature_names)
+    <SHAP_DIR>/features.npy      (float32 feature matrix the values explain)
+    <SHAP_DIR>/meta.json         (feature names, base value, weights, fingerprints)
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+from threadpoolctl import threadpool_limits
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from ml.parallel_training import SharedArrays, _attach
+from ml.thread_budget import apply_process_limits, core_budget, limit_model_threads
+
+# Set in each pool worker by _init_worker
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(models: Dict[str, Any], engineer: Any, descriptor: Tuple, n_threads: int) -> None:
+    """Pool initializer: attach the shared matrix and keep the members for every task of this worker."""
+    apply_process_limits(n_threads)
+    limit_model_threads(models, n_threads)
+    blocks: List = []
+    _WORKER.update(models=models, engineer=engineer, X=_attach(descriptor, blocks), blocks=blocks,
+                   n_threads=n_threads, explainers={})
+
+
+def _explainer(name: str) -> Any:
+    """TreeExplainer of one member, built once per worker."""
+    import shap
+
+    explainers = _WORKER['explainers']
+    if name not in explainers:
+        explainers[name] = shap.TreeExplainer(_WORKER['models'][name])
+    return explainers[name]
+
+
+def _explain_chunk_worker(name: str, start: int, stop: int) -> Tuple[str, int, np.ndarray, float]:
+    """Process pool task: SHAP values of one member on rows [start, stop), folded onto feature_names."""
+    engineer = _WORKER['engineer']
+    X_chunk = _WORKER['X'][start:stop]
+    if sparse.issparse(X_chunk):
+        X_chunk = X_chunk.toarray()
+    with threadpool_limits(limits=_WORKER['n_threads']):
+        explainer = _explainer(name)
+        X_model = engineer.model_input(X_chunk, name) if engineer is not None else X_chunk
+        values = np.asarray(explainer.shap_values(X_model, check_additivity=False), dtype=np.float64)
+    n_features = len(engineer.feature_names) if engineer is not None else values.shape[1]
+    sources = engineer.model_input_sources(name) if engineer is not None else np.arange(n_features)
+    folded = np.zeros((values.shape[0], n_features))
+    np.add.at(folded, (slice(None), sources), values)
+    return name, start, folded.astype(np.float32), float(np.ravel(explainer.expected_value)[0])
+
+
+def ensemble_shap_values(models: Dict[str, Any], weights: Dict[str, float], X, engineer=None,
+                         chunk_rows: Optional[int] = None,
+                         n_cores: Optional[int] = None) -> Tuple[np.ndarray, float]:
+    """
+    SHAP values of the weighted ensemble, computed per member and row chunk in parallel.
+
+    Args:
+        models (Dict[str, Any]): Fitted members keyed by name.
+        weights (Dict[str, float]): Ensemble weights (members without a weight are skipped).
+        X: Transformed feature matrix (dense or CSR) in ``engineer.feature_names`` order.
+        engineer: Fitted feature engineer used to adapt inputs per member.
+        chunk_rows (Optional[int]): Rows per task (default ``config.SHAP_CHUNK_ROWS``).
+        n_cores (Optional[int]): Cores to use (default: the core budget).
+
+    Returns:
+        Tuple[np.ndarray, float]: float32 SHAP matrix (rows x features) and the
+            ensemble base value; each row sums with the base value to the
+            ensemble prediction.
+    """
+    chunk_rows = chunk_rows or config.SHAP_CHUNK_ROWS
+    n_cores = core_budget(n_cores)
+    names = [name for name in models if weights.get(name)]
+    n_rows = X.shape[0]
+    chunks = [(start, min(start + chunk_rows, n_rows)) for start in range(0, n_rows, chunk_rows)]
+    n_tasks = len(names) * len(chunks)
+    workers = max(1, min(n_tasks, n_cores))
+    n_threads = max(1, n_cores // workers)
+
+    print("\n" + "="*60)
+    print(f"ENSEMBLE SHAP ({len(names)} models x {len(chunks)} chunks, {workers} workers)")
+    print("="*60)
+
+    n_features = len(engineer.feature_names) if engineer is not None else X.shape[1]
+    total = np.zeros((n_rows, n_features))
+    base_value = 0.0
+    base_seen = set()
+    start_time = time.perf_counter()
+    with SharedArrays() as shared:
+        descriptor = shared.share(X)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                 initializer=_init_worker,
+                                 initargs=({name: models[name] for name in names}, engineer, descriptor,
+                                           n_threads)) as pool:
+            futures = [pool.submit(_explain_chunk_worker, name, start, stop)
+                       for name in names for start, stop in chunks]
+            for future in as_completed(futures):
+                name, start, values, expected = future.result()
+                total[start:start + len(values)] += weights[name] * values
+                if name not in base_seen:
+                    base_seen.add(name)
+                    base_value += weights[name] * expected
+    print(f"Ensemble SHAP wall time: {time.perf_counter() - start_time:.1f}s")
+    return total.astype(np.float32), float(base_value)
+
+
+def _fingerprints() -> Dict[str, str]:
+    """Fingerprints of the dataset and trained artifacts a stored SHAP matrix was computed from."""
+    from ml.feature_cache import file_fingerprint
+
+    paths = {
+        'data': config.FILE_ANALYTICAL_DATASET,
+        'models': config.MODELS_DIR / 'model_suite.pkl',
+        'weights': config.MODELS_DIR / 'ensemble_weights.pkl',
+        'engineer': config.MODELS_DIR / 'feature_engineer.pkl',
+    }
+    return {key: file_fingerprint(path) for key, path in paths.items()}
+
+
+def save_ensemble_shap(shap_values: np.ndarray, X, feature_names: List[str], base_value: float,
+                       meta: Optional[Dict[str, Any]] = None,
+                       output_dir: Union[str, Path, None] = None) -> Path:
+    """Write the SHAP matrix, the matrix it explains and its metadata atomically (default ``config.SHAP_DIR``)."""
+    output_dir = Path(output_dir) if output_dir is not None else config.SHAP_DIR
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    X = X.toarray() if sparse.issparse(X) else np.asarray(X)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{output_dir.name}-", dir=output_dir.parent))
+    try:
+        np.save(tmp_dir / 'shap_values.npy', np.ascontiguousarray(shap_values, dtype=np.float32))
+        np.save(tmp_dir / 'features.npy', np.ascontiguousarray(X, dtype=np.float32))
+        with open(tmp_dir / 'meta.json', 'w') as f:
+            json.dump({**(meta or {}), 'feature_names': list(feature_names), 'base_value': base_value,
+                       'shape': list(shap_values.shape),
+                       'created': datetime.now().isoformat(timespec='seconds')}, f, indent=2)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(tmp_dir, output_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return output_dir
+
+
+def load_ensemble_shap(output_dir: Union[str, Path, None] = None,
+                       mmap: bool = True) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Read a stored ensemble SHAP matrix.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, Dict[str, Any]]: SHAP values, the feature
+            matrix they explain (both float32, memory-mapped read-only when
+            ``mmap`` is set) and the metadata (``feature_names``, ``base_value``, ...).
+
+    Raises:
+        FileNotFoundError: If no matrix has been computed yet.
+    """
+    output_dir = Path(output_dir) if output_dir is not None else config.SHAP_DIR
+    mmap_mode = 'r' if mmap else None
+    with open(output_dir / 'meta.json') as f:
+        meta = json.load(f)
+    shap_values = np.load(output_dir / 'shap_values.npy', mmap_mode=mmap_mode)
+    X = np.load(output_dir / 'features.npy', mmap_mode=mmap_mode)
+    return shap_values, X, meta
+
+
+def mean_abs_shap(output_dir: Union[str, Path, None] = None) -> Dict[str, float]:
+    """Global importance per feature (mean |SHAP| over the stored rows), highest first."""
+    shap_values, _, meta = load_ensemble_shap(output_dir)
+    importance = np.abs(shap_values).mean(axis=0, dtype=np.float64)
+    order = np.argsort(importance)[::-1]
+    return {meta['feature_names'][i]: float(importance[i]) for i in order}
+
+
+def compute_ensemble_shap(force: bool = False, n_cores: Optional[int] = None,
+                          split: Optional[str] = None) -> Path:
+    """
+    Compute and store the ensemble SHAP matrix of the analytical dataset.
+
+    The trained suite, weights and engineer are loaded from ``config.MODELS_DIR``.
+    A stored matrix computed from the same dataset, artifacts and rows is kept
+    unless ``force`` is set.
+
+    Args:
+        split (Optional[str]): Explain only a held-out split saved by model training
+            (e.g. 'test', see ml.split_manifest) instead of every row
+            (default ``config.SHAP_SPLIT``).
+
+    Returns:
+        Path: Directory holding the stored matrix.
+    """
+    import joblib
+    import pandas as pd
+    from ml.split_manifest import load_holdout, load_manifest
+
+    split = config.SHAP_SPLIT if split is None else split
+    fingerprints = _fingerprints()
+    if split:
+        fingerprints['split'] = f"{split}@{load_manifest()['created']}"
+    meta_path = config.SHAP_DIR / 'meta.json'
+    if not force and meta_path.exists():
+        with open(meta_path) as f:
+            if json.load(f).get('fingerprints') == fingerprints:
+                print(f"[INFO] Ensemble SHAP values are up to date in {config.SHAP_DIR}")
+                return config.SHAP_DIR
+
+    models = joblib.load(config.MODELS_DIR / 'model_suite.pkl')
+    weights = joblib.load(config.MODELS_DIR / 'ensemble_weights.pkl')
+    engineer = joblib.load(config.MODELS_DIR / 'feature_engineer.pkl')
+    if split:
+        X, _ = load_holdout(split, engineer=engineer, mmap=False)
+    else:
+        X = engineer.transform(pd.read_csv(config.FILE_ANALYTICAL_DATASET))
+    shap_values, base_value = ensemble_shap_values(models, weights, X, engineer, n_cores=n_cores)
+    return save_ensemble_shap(shap_values, X, engineer.feature_names, base_value,
+                              meta={'weights': weights, 'fingerprints': fingerprints, 'split': split or 'all'})
+
+
+if __name__ == "__main__":
+    apply_process_limits(core_budget())
+    output_dir = compute_ensemble_shap(force='--force' in sys.argv)
+    print(f"[SUCCESS] Ensemble SHAP values saved to {output_dir}")
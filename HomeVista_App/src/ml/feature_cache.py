@@ -0,0 +1,272 @@
+"""
+Content-Addressed Feature Matrix Cache.
+
+Training, tuning and evaluation all need the engineered feature matrix of the
+analytical dataset. This module stores the output of
+``AdvancedFeatureEngineer.fit_transform`` on disk under a key derived from the
+input data and the engineer configuration, so repeated runs load X/y as
+memory-mapped ``.npy`` files instead of rebuilding them.
+
+Layout of one cache entry::
+
+    <cache_dir>/<key>/X.npy          (X.npz for 'sparse' encoding)
+    <cache_dir>/<key>/y.npy
+    <cache_dir>/<key>/engineer.pkl
+    <cache_dir>/<key>/meta.json
+
+Every dataset, engineer configuration and set of fit rows adds an entry, so the
+cache is kept under ``config.FEATURE_CACHE_MAX_MB`` by evicting the least
+recently used entries whenever a new one is written.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from ml import feature_engineering
+from ml.feature_engineering import AdvancedFeatureEngineer
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every existing entry when the on-disk layout changes
+CACHE_FORMAT_VERSION = 1
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_fingerprint(path: Union[str, Path]) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """SHA-256 of a dataframe's column names, dtypes and row values."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def engineer_fingerprint(engineer: AdvancedFeatureEngineer, target_col: str = 'annual_rent') -> str:
+    """
+    Fingerprint of everything that determines the engineer's output.
+
+    Covers the requested feature subset, the target column and the source of the
+    feature engineering module, so editing a formula invalidates cached matrices.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        'format': CACHE_FORMAT_VERSION,
+        'features': engineer.features,
+        'encoding': engineer.encoding,
+        'target_col': target_col,
+    }, sort_keys=True).encode())
+    digest.update(inspect.getsource(feature_engineering).encode())
+    return digest.hexdigest()
+
+
+def index_fingerprint(index: Optional[np.ndarray]) -> Optional[str]:
+    """SHA-256 of a row index array (None when the engineer is fit on every row)."""
+    if index is None:
+        return None
+    return hashlib.sha256(np.ascontiguousarray(index, dtype=np.int64).tobytes()).hexdigest()
+
+
+def cache_key(data_fingerprint: str, engineer: AdvancedFeatureEngineer, target_col: str = 'annual_rent',
+              fit_fingerprint: Optional[str] = None) -> str:
+    """Cache entry key combining data, engineer and fit-row fingerprints."""
+    combined = f"{data_fingerprint}:{engineer_fingerprint(engineer, target_col)}"
+    if fit_fingerprint is not None:
+        combined += f":{fit_fingerprint}"
+    return hashlib.sha256(combined.encode()).hexdigest()[:24]
+
+
+def _read_entry(entry_dir: Path, mmap: bool) -> Tuple[np.ndarray, np.ndarray, List[str], AdvancedFeatureEngineer]:
+    """Load one cache entry; arrays are memory-mapped read-only when ``mmap`` is set."""
+    mmap_mode = 'r' if mmap else None
+    if (entry_dir / 'X.npz').exists():
+        X = sparse.load_npz(entry_dir / 'X.npz').tocsr()
+    else:
+        X = np.load(entry_dir / 'X.npy', mmap_mode=mmap_mode)
+    y = np.load(entry_dir / 'y.npy', mmap_mode=mmap_mode)
+    engineer = joblib.load(entry_dir / 'engineer.pkl')
+    with open(entry_dir / 'meta.json') as f:
+        feature_names = json.load(f)['feature_names']
+    return X, y, feature_names, engineer
+
+
+def _write_entry(entry_dir: Path, X: np.ndarray, y: np.ndarray, feature_names: List[str],
+                 engineer: AdvancedFeatureEngineer, meta: dict) -> None:
+    """Write one cache entry atomically (build in a temp dir, then rename)."""
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{entry_dir.name}-", dir=entry_dir.parent))
+    try:
+        if sparse.issparse(X):
+            sparse.save_npz(tmp_dir / 'X.npz', X)
+        else:
+            np.save(tmp_dir / 'X.npy', np.ascontiguousarray(X))
+        np.save(tmp_dir / 'y.npy', np.ascontiguousarray(y))
+        joblib.dump(engineer, tmp_dir / 'engineer.pkl')
+        with open(tmp_dir / 'meta.json', 'w') as f:
+            json.dump({**meta, 'feature_names': feature_names}, f, indent=2)
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # Another process published the same entry first; keep theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (entry_dir / 'meta.json').exists():
+            raise
+
+
+def _fit_transform(engineer: AdvancedFeatureEngineer, df: pd.DataFrame, target_col: str,
+                   fit_index: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Fit on ``fit_index`` rows (all rows when None) and transform every row."""
+    if fit_index is None:
+        return engineer.fit_transform(df, target_col)
+    _, _, feature_names = engineer.fit_transform(df.iloc[fit_index], target_col)
+    return engineer.transform(df), df[target_col].values, feature_names
+
+
+def load_features(df: Optional[pd.DataFrame] = None,
+                  dataset_path: Union[str, Path, None] = None,
+                  engineer: Optional[AdvancedFeatureEngineer] = None,
+                  target_col: str = 'annual_rent',
+                  cache_dir: Union[str, Path, None] = None,
+                  use_cache: bool = True,
+                  mmap: bool = True,
+                  fit_index: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, List[str], AdvancedFeatureEngineer]:
+    """
+    Return the engineered feature matrix, building and caching it on a miss.
+
+    When only a path is given the key is computed from the file bytes, so a cache
+    hit never parses the CSV.
+
+    With ``fit_index`` the engineer (encoder, target statistics, medians) is fit on
+    those rows only, typically the training split, and every row is then
+    transformed with it, so held-out targets never leak into the features.
+
+    Args:
+        df (Optional[pd.DataFrame]): In-memory dataset. Takes precedence over ``dataset_path``.
+        dataset_path (Union[str, Path, None]): CSV to load. Defaults to the analytical dataset.
+        engineer (Optional[AdvancedFeatureEngineer]): Unfitted engineer carrying the configuration.
+        target_col (str): Target variable name.
+        cache_dir (Union[str, Path, None]): Cache root. Defaults to ``config.FEATURE_CACHE_DIR``.
+        use_cache (bool): Set False to always rebuild (nothing is read or written).
+        mmap (bool): Memory-map cached dense arrays instead of reading them into RAM.
+        fit_index (Optional[np.ndarray]): Rows to fit the engineer on (default: all rows).
+            Part of the cache key.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, List[str], AdvancedFeatureEngineer]:
+            X, y, feature names and the fitted engineer.
+    """
+    engineer = engineer if engineer is not None else AdvancedFeatureEngineer()
+    dataset_path = Path(dataset_path) if dataset_path is not None else config.FILE_ANALYTICAL_DATASET
+
+    if not use_cache:
+        df = df if df is not None else pd.read_csv(dataset_path)
+        X, y, feature_names = _fit_transform(engineer, df, target_col, fit_index)
+        return X, y, feature_names, engineer
+
+    source = 'dataframe' if df is not None else str(dataset_path)
+    data_fp = dataframe_fingerprint(df) if df is not None else file_fingerprint(dataset_path)
+    fit_fp = index_fingerprint(fit_index)
+    key = cache_key(data_fp, engineer, target_col, fit_fp)
+    entry_dir = Path(cache_dir if cache_dir is not None else config.FEATURE_CACHE_DIR) / key
+
+    if (entry_dir / 'meta.json').exists():
+        logger.info(f"Loading cached feature matrix {key}")
+        # Mark as recently used for eviction
+        os.utime(entry_dir)
+        return _read_entry(entry_dir, mmap)
+
+    logger.info(f"Feature cache miss ({key}); running feature engineering")
+    df = df if df is not None else pd.read_csv(dataset_path)
+    X, y, feature_names = _fit_transform(engineer, df, target_col, fit_index)
+    _write_entry(entry_dir, X, y, feature_names, engineer, {
+        'key': key,
+        'data_fingerprint': data_fp,
+        'fit_fingerprint': fit_fp,
+        'source': source,
+        'target_col': target_col,
+        'shape': list(X.shape),
+        'created': datetime.now().isoformat(timespec='seconds'),
+    })
+    evict_cache(cache_dir=entry_dir.parent, keep=entry_dir)
+    if mmap:
+        return _read_entry(entry_dir, mmap)
+    return X, y, feature_names, engineer
+
+
+def _entry_size(entry_dir: Path) -> int:
+    """Bytes held by one cache entry (0 if another process removed it meanwhile)."""
+    try:
+        return sum(path.stat().st_size for path in entry_dir.iterdir())
+    except FileNotFoundError:
+        return 0
+
+
+def evict_cache(max_mb: Optional[float] = None, cache_dir: Union[str, Path, None] = None,
+                keep: Union[str, Path, None] = None) -> int:
+    """
+    Delete the least recently used entries until the cache fits in ``max_mb``.
+
+    Args:
+        max_mb (Optional[float]): Size cap. Defaults to ``config.FEATURE_CACHE_MAX_MB`` (None = unbounded).
+        cache_dir (Union[str, Path, None]): Cache root. Defaults to ``config.FEATURE_CACHE_DIR``.
+        keep (Union[str, Path, None]): Entry that is never evicted (the one just written).
+
+    Returns:
+        int: Number of entries deleted.
+    """
+    max_mb = config.FEATURE_CACHE_MAX_MB if max_mb is None else max_mb
+    cache_dir = Path(cache_dir if cache_dir is not None else config.FEATURE_CACHE_DIR)
+    if max_mb is None or not cache_dir.exists():
+        return 0
+    entries = []
+    for entry_dir in cache_dir.iterdir():
+        # Skip in-progress writes (temp dirs start with a dot)
+        if entry_dir.name.startswith('.') or not entry_dir.is_dir():
+            continue
+        try:
+            entries.append((entry_dir.stat().st_mtime, entry_dir, _entry_size(entry_dir)))
+        except FileNotFoundError:
+            continue
+    total = sum(size for _, _, size in entries)
+    limit = max_mb * 1024 ** 2
+    evicted = 0
+    for _, entry_dir, size in sorted(entries, key=lambda entry: entry[0]):
+        if total <= limit:
+            break
+        if keep is not None and entry_dir == Path(keep):
+            continue
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+        evicted += 1
+    if evicted:
+        logger.info(f"Evicted {evicted} cached feature matrices ({total / 1024 ** 2:.0f} MB kept)")
+    return evicted
+
+
+def clear_cache(cache_dir: Union[str, Path, None] = None) -> None:
+    """Delete every cached feature matrix."""
+    shutil.rmtree(cache_dir if cache_dir is not None else config.FEATURE_CACHE_DIR, ignore_errors=True)
@@ -9,14 +9,360 @@ target encoding.
 
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict, Optional, Union
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from typing import Any, Callable, Iterable, List, NamedTuple, Tuple, Dict, Optional, Sequence, Union
+from scipy import sparse
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bayesian smoothing strength for target encoding (minimum sample size for confidence)
+TARGET_ENCODING_SMOOTHING = 30
+
+# Categorical columns that are encoded after the numeric block
+CATEGORICAL_FEATURES = ['neighborhood', 'property_type']
+
+# Categorical encodings: dense one-hot, CSR one-hot, or integer codes for native handling
+ENCODINGS = ('onehot', 'sparse', 'native')
+
+# Models that consume integer category codes directly in 'native' mode;
+# every other model gets the codes expanded to one-hot columns
+NATIVE_CATEGORICAL_MODELS = ('LightGBM', 'CatBoost')
+
+# Models whose one-hot expansion stays dense: scikit-learn trees fit several
+# times slower on CSR input than on a dense array of the same width
+DENSE_ONEHOT_MODELS = ('Random Forest',)
+
+
+class FeatureSpec(NamedTuple):
+    """
+    Declarative definition of a single numeric feature.
+    
+    Attributes:
+        name (str): Output column name.
+        inputs (Tuple[str, ...]): Columns (raw or registered features) the formula reads.
+        dtype (str): NumPy dtype of the computed column.
+        group (str): One of 'base', 'interaction', 'polynomial', 'domain', 'target'.
+        formula (Optional[Callable]): ``formula(df, engineer)`` returning the column values.
+            ``None`` marks a passthrough of a raw input column.
+        fallback (Optional[float]): Constant used when an input column is missing.
+            ``None`` means the inputs are mandatory.
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    dtype: str
+    group: str
+    formula: Optional[Callable[[pd.DataFrame, Any], Any]] = None
+    fallback: Optional[float] = None
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error (log-bucketed histogram).
+    
+    Positive values fall into buckets ``ceil(log_gamma(x))`` so any quantile is
+    returned within ``relative_accuracy`` of a true sample value. Non-positive values
+    are counted in a single zero bucket. Updates are O(batch) and two sketches merge
+    by adding bucket counts.
+    
+    Attributes:
+        relative_accuracy (float): Maximum relative error of returned quantiles.
+        bins (Dict[int, int]): Bucket index to count.
+        zero_count (int): Number of values <= 0.
+        count (int): Total number of values seen.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """Initialize an empty sketch."""
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values: Any) -> 'QuantileSketch':
+        """Add a batch of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        self.count += len(values)
+        buckets, counts = np.unique(np.ceil(np.log(positive) / np.log(self.gamma)).astype(np.int64),
+                                    return_counts=True)
+        for bucket, n in zip(buckets.tolist(), counts.tolist()):
+            self.bins[bucket] = self.bins.get(bucket, 0) + n
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Fold another sketch with the same accuracy into this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for bucket, n in other.bins.items():
+            self.bins[bucket] = self.bins.get(bucket, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximate ``q``-quantile, NaN for an empty sketch."""
+        if self.count == 0:
+            return float('nan')
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for bucket in sorted(self.bins):
+            seen += self.bins[bucket]
+            if seen > rank:
+                return float(2 * self.gamma ** bucket / (self.gamma + 1))
+        return float(2 * self.gamma ** max(self.bins) / (self.gamma + 1))
+
+
+def _batch_moments(values: pd.Series, keys: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Per-key count, mean and sum of squared deviations (m2) of one batch."""
+    grouped = values.groupby(keys if keys is not None else np.zeros(len(values), dtype=np.int64), observed=True)
+    moments = grouped.agg(['count', 'mean', 'var'])
+    moments['m2'] = moments.pop('var').fillna(0.0) * (moments['count'] - 1)
+    return moments[moments['count'] > 0]
+
+
+def _merge_moments(current: Optional[pd.DataFrame], batch: pd.DataFrame) -> pd.DataFrame:
+    """Combine running and batch moments per key (Chan et al. parallel Welford update)."""
+    if current is None:
+        return batch.copy()
+    index = current.index.union(batch.index)
+    a = current.reindex(index).fillna({'count': 0, 'mean': 0.0, 'm2': 0.0})
+    b = batch.reindex(index).fillna({'count': 0, 'mean': 0.0, 'm2': 0.0})
+    count = a['count'] + b['count']
+    delta = b['mean'] - a['mean']
+    merged = pd.DataFrame(index=index)
+    merged['count'] = count.astype(np.int64)
+    merged['mean'] = a['mean'] + delta * b['count'] / count
+    merged['m2'] = a['m2'] + b['m2'] + delta ** 2 * a['count'] * b['count'] / count
+    return merged
+
+
+def _moments_std(moments: pd.DataFrame) -> pd.Series:
+    """Sample standard deviation (ddof=1) from running moments, NaN for single values."""
+    return np.sqrt(moments['m2'] / (moments['count'] - 1).where(moments['count'] > 1))
+
+
+def _codes_to_onehot(codes: np.ndarray, categories: Sequence[Sequence[Any]]) -> sparse.csr_matrix:
+    """One-hot CSR matrix from an (n_rows, n_columns) array of category codes (-1 = unseen)."""
+    blocks = []
+    for j, column_categories in enumerate(categories):
+        rows = np.flatnonzero(codes[:, j] >= 0)
+        blocks.append(sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, codes[rows, j])), shape=(codes.shape[0], len(column_categories))
+        ))
+    return sparse.hstack(blocks, format='csr')
+
+
+def _lookup(keys: pd.Series, mapping: pd.Series) -> pd.Series:
+    """
+    Map keys through a fitted per-category Series as floats (NaN when absent).
+    
+    Categorical keys are resolved on their dictionary and gathered by code, so the
+    cost does not depend on string length or row count per category.
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        values = np.append(mapping.reindex(keys.cat.categories).to_numpy(dtype=np.float64), np.nan)
+        return pd.Series(values[keys.cat.codes.to_numpy()], index=keys.index)
+    return keys.map(mapping).astype(np.float64)
+
+
+def _safe_bedrooms(df: pd.DataFrame) -> pd.Series:
+    """Bedroom count with studios (0 bedrooms) treated as 1 to avoid division by zero."""
+    return df['bedrooms'].replace(0, 1)
+
+
+def _price_per_sqft_median(df: pd.DataFrame, engineer: Any) -> float:
+    """Fitted price-per-sqft median, or the batch median when the engineer is unfitted."""
+    fitted = getattr(engineer, 'price_per_sqft_median', None)
+    return fitted if fitted is not None else df['price_per_sqft'].median()
+
+
+def _spacious(df: pd.DataFrame, engineer: Any) -> pd.Series:
+    """Size above 1.2x the median size of the property's type."""
+    batch_medians = df.groupby('property_type', observed=True)['size_sqft'].transform('median')
+    fitted = getattr(engineer, 'size_medians', None)
+    if fitted is not None:
+        medians = _lookup(df['property_type'], fitted).fillna(batch_medians)
+    else:
+        medians = batch_medians
+    return df['size_sqft'] > medians * 1.2
+
+
+def _neighborhood_rent_avg(df: pd.DataFrame, engineer: Any) -> pd.Series:
+    """Bayesian-smoothed neighborhood mean rent, global mean for unseen areas."""
+    stats = engineer._require_target_stats()
+    m = TARGET_ENCODING_SMOOTHING
+    counts = _lookup(df['neighborhood'], stats['count'])
+    means = _lookup(df['neighborhood'], stats['mean'])
+    smoothed = (counts * means + m * engineer.global_mean) / (counts + m)
+    return smoothed.fillna(engineer.global_mean)
+
+
+def _neighborhood_rent_std(df: pd.DataFrame, engineer: Any) -> pd.Series:
+    """Neighborhood rent volatility, global std for unseen or single-listing areas."""
+    stats = engineer._require_target_stats()
+    return _lookup(df['neighborhood'], stats['std']).fillna(engineer.global_std)
+
+
+def _base(name: str, dtype: str = 'float64') -> FeatureSpec:
+    """Passthrough spec for a raw analytical-dataset column."""
+    return FeatureSpec(name, (name,), dtype, 'base')
+
+
+_FEATURE_SPECS = [
+    # Original features
+    _base('size_sqft'), _base('bedrooms', 'int64'), _base('bathrooms', 'int64'),
+    _base('amenity_count', 'int64'), _base('tier_numeric'), _base('furnished_numeric', 'int64'),
+    _base('has_metro_numeric', 'int64'), _base('beach_accessible_numeric', 'int64'),
+    _base('price_per_sqft'),
+    # Individual amenities
+    _base('has_pool', 'int64'), _base('has_gym', 'int64'),
+    _base('has_parking', 'int64'), _base('has_balcony', 'int64'),
+    # Interaction features
+    FeatureSpec('size_per_bedroom', ('size_sqft', 'bedrooms'), 'float64', 'interaction',
+                lambda df, fe: df['size_sqft'] / _safe_bedrooms(df)),
+    FeatureSpec('tier_metro_interaction', ('tier_numeric', 'has_metro_numeric'), 'float64', 'interaction',
+                lambda df, fe: df['tier_numeric'] * df['has_metro_numeric']),
+    FeatureSpec('tier_beach_interaction', ('tier_numeric', 'beach_accessible_numeric'), 'float64', 'interaction',
+                lambda df, fe: df['tier_numeric'] * df['beach_accessible_numeric']),
+    FeatureSpec('amenity_density', ('amenity_count', 'size_sqft'), 'float64', 'interaction',
+                lambda df, fe: df['amenity_count'] / (df['size_sqft'] / 1000)),
+    FeatureSpec('furnished_tier', ('furnished_numeric', 'tier_numeric'), 'float64', 'interaction',
+                lambda df, fe: df['furnished_numeric'] * df['tier_numeric']),
+    FeatureSpec('bath_bed_ratio', ('bathrooms', 'bedrooms'), 'float64', 'interaction',
+                lambda df, fe: df['bathrooms'] / _safe_bedrooms(df)),
+    FeatureSpec('premium_location', ('has_metro_numeric', 'beach_accessible_numeric'), 'int64', 'interaction',
+                lambda df, fe: (df['has_metro_numeric'] == 1) & (df['beach_accessible_numeric'] == 1)),
+    # Polynomial features
+    FeatureSpec('size_sqft_squared', ('size_sqft',), 'float64', 'polynomial',
+                lambda df, fe: df['size_sqft'] ** 2),
+    FeatureSpec('amenity_count_squared', ('amenity_count',), 'float64', 'polynomial',
+                lambda df, fe: df['amenity_count'] ** 2),
+    FeatureSpec('size_sqft_sqrt', ('size_sqft',), 'float64', 'polynomial',
+                lambda df, fe: np.sqrt(df['size_sqft'])),
+    # Domain features
+    FeatureSpec('is_luxury', ('tier_numeric', 'amenity_count'), 'int64', 'domain',
+                lambda df, fe: (df['tier_numeric'] >= 3) & (df['amenity_count'] >= 6)),
+    FeatureSpec('is_value_property', ('price_per_sqft',), 'int64', 'domain',
+                lambda df, fe: df['price_per_sqft'] < _price_per_sqft_median(df, fe) * 0.8, fallback=0),
+    FeatureSpec('is_premium_property', ('price_per_sqft',), 'int64', 'domain',
+                lambda df, fe: df['price_per_sqft'] > _price_per_sqft_median(df, fe) * 1.2, fallback=0),
+    FeatureSpec('is_spacious', ('size_sqft', 'property_type'), 'int64', 'domain', _spacious),
+    FeatureSpec('has_complete_amenities', ('has_pool', 'has_gym', 'has_parking', 'has_balcony'), 'int64', 'domain',
+                lambda df, fe: (df['has_pool'] == 1) & (df['has_gym'] == 1) &
+                               (df['has_parking'] == 1) & (df['has_balcony'] == 1), fallback=0),
+    # Target encoded
+    FeatureSpec('neighborhood_rent_avg', ('neighborhood',), 'float64', 'target', _neighborhood_rent_avg),
+    FeatureSpec('neighborhood_rent_std', ('neighborhood',), 'float64', 'target', _neighborhood_rent_std),
+]
+
+# Registry of all numeric features, in output column order
+FEATURE_REGISTRY: Dict[str, FeatureSpec] = {spec.name: spec for spec in _FEATURE_SPECS}
+
+
+class PlanStep(NamedTuple):
+    """One derived-feature operation of a compiled transform plan."""
+    name: str
+    formula: Optional[Callable[[pd.DataFrame, Any], Any]]
+    slot: int                   # output column in the numeric block, -1 for intermediates
+    keep: bool                  # later steps read this column from the working frame
+    constant: Optional[float]   # fitted without its inputs: emit the fallback constant
+
+
+class TransformPlan(NamedTuple):
+    """
+    Transform plan compiled at fit time.
+    
+    Attributes:
+        raw_inputs (Tuple[str, ...]): Input columns read by ``transform``, in working-frame order.
+        passthrough_sources (np.ndarray): Working-frame positions of passthrough features.
+        passthrough_slots (np.ndarray): Numeric-block output columns of those features.
+        steps (Tuple[PlanStep, ...]): Derived features in dependency order.
+        categorical_sources (Tuple[str, ...]): Columns handed to the categorical encoder.
+        n_numeric (int): Width of the numeric block.
+    """
+    raw_inputs: Tuple[str, ...]
+    passthrough_sources: np.ndarray
+    passthrough_slots: np.ndarray
+    steps: Tuple[PlanStep, ...]
+    categorical_sources: Tuple[str, ...]
+    n_numeric: int
+
+
+def resolve_feature_dependencies(feature_names: Sequence[str]) -> List[FeatureSpec]:
+    """
+    Resolve the dependency DAG of the requested features.
+    
+    Args:
+        feature_names (Sequence[str]): Registered feature names that must be produced.
+        
+    Returns:
+        List[FeatureSpec]: Specs of the requested features and every registered feature
+            they depend on, in an order where inputs are computed before their consumers.
+            
+    Raises:
+        KeyError: If a requested feature is not registered.
+        ValueError: If the registry contains a dependency cycle.
+    """
+    ordered: List[FeatureSpec] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str) -> None:
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Dependency cycle in feature registry at '{name}'")
+        state[name] = 'visiting'
+        spec = FEATURE_REGISTRY[name]
+        for dep in spec.inputs:
+            if dep in FEATURE_REGISTRY and dep != name:
+                visit(dep)
+        state[name] = 'done'
+        ordered.append(spec)
+
+    for name in feature_names:
+        if name not in FEATURE_REGISTRY:
+            raise KeyError(f"Unknown feature '{name}'")
+        visit(name)
+    return ordered
+
+
+def required_raw_inputs(feature_names: Sequence[str]) -> List[str]:
+    """
+    Raw columns that must be present to compute the given features, sorted.
+    
+    Inputs of features with a fallback constant are optional and not reported.
+    """
+    raw = set()
+    seen = set()
+
+    def visit(name: str) -> None:
+        if name in seen:
+            return
+        seen.add(name)
+        spec = FEATURE_REGISTRY[name]
+        if spec.fallback is not None:
+            return
+        if spec.formula is None:
+            raw.add(name)
+            return
+        for col in spec.inputs:
+            if col in FEATURE_REGISTRY:
+                visit(col)
+            else:
+                raw.add(col)
+
+    for name in feature_names:
+        visit(name)
+    return sorted(raw)
+
 
 class AdvancedFeatureEngineer:
     """
@@ -28,64 +374,286 @@ class AdvancedFeatureEngineer:
     - Domain-specific features (e.g., luxury indicators)
     - Target-encoded features (e.g., neighborhood average rent)
     
+    Feature definitions live in ``FEATURE_REGISTRY``; the engineer only computes the
+    registered features (and their dependencies) that its output schema consumes.
+    
     Attributes:
         scaler (StandardScaler): Scaler for numeric features (unused in current implementation but reserved).
-        encoder (OneHotEncoder): Encoder for categorical variables.
+        encoding (str): Categorical encoding, one of ``ENCODINGS``.
+        encoder (Union[OneHotEncoder, OrdinalEncoder]): Encoder for categorical variables.
         feature_names (List[str]): List of all output feature names.
+        numeric_features (List[str]): Registered numeric features in output order.
+        categorical_features (List[str]): Categorical columns encoded after the numeric block.
+        features (Optional[List[str]]): Requested numeric feature subset (None = all registered).
         neighborhood_stats (pd.DataFrame): Stored statistics for target encoding during inference.
         global_mean (float): Global mean rent for fallback target encoding.
         global_std (float): Global rent standard deviation for fallback.
+        price_per_sqft_median (float): Fitted median used by the value/premium indicators.
+        size_medians (pd.Series): Fitted median size per property type used by ``is_spacious``.
+        target_moments (pd.DataFrame): Running count/mean/m2 of the target per neighborhood.
+        global_moments (pd.DataFrame): Running count/mean/m2 of the target over all rows.
+        price_per_sqft_sketch (QuantileSketch): Running sketch behind ``price_per_sqft_median``.
+        size_sketches (Dict[str, QuantileSketch]): Running size sketches per property type.
+        constant_features (List[str]): Features fitted without their inputs (fallback constant).
     """
     
-    def __init__(self):
-        """Initialize the feature engineer."""
+    def __init__(self, features: Optional[List[str]] = None, encoding: str = 'onehot'):
+        """
+        Initialize the feature engineer.
+        
+        Args:
+            features (Optional[List[str]]): Numeric features to produce. Defaults to every
+                registered feature; unknown names raise ``KeyError``.
+            encoding (str): 'onehot' (dense, default), 'sparse' (CSR one-hot output) or
+                'native' (one integer code column per categorical, -1 for unseen values).
+        """
+        if features is not None:
+            resolve_feature_dependencies(features)
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding '{encoding}'; expected one of {ENCODINGS}")
         self.scaler = StandardScaler()
-        self.encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+        self.encoding = encoding
+        self.encoder = self._make_encoder(encoding)
+        self.features: Optional[List[str]] = list(features) if features is not None else None
         self.feature_names: List[str] = []
+        self.numeric_features: List[str] = []
+        self.categorical_features: List[str] = list(CATEGORICAL_FEATURES)
         self.neighborhood_stats: Optional[pd.DataFrame] = None
         self.global_mean: Optional[float] = None
         self.global_std: Optional[float] = None
-        
-    def create_interaction_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.price_per_sqft_median: Optional[float] = None
+        self.size_medians: Optional[pd.Series] = None
+        self.constant_features: List[str] = []
+        self._plan: Optional[TransformPlan] = None
+        self._reset_running_statistics()
+
+    def _reset_running_statistics(self) -> None:
+        """Clear the mergeable statistics maintained for ``partial_fit``."""
+        self.target_moments: Optional[pd.DataFrame] = None
+        self.global_moments: Optional[pd.DataFrame] = None
+        self.price_per_sqft_sketch: Optional[QuantileSketch] = None
+        self.size_sketches: Dict[str, QuantileSketch] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the compiled plan (it holds registry callables); it is rebuilt on load."""
+        state = self.__dict__.copy()
+        state.pop('_plan', None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore pickled engineers, back-filling attributes added after they were saved."""
+        self.__dict__.update(state)
+        self.__dict__.setdefault('features', None)
+        self.__dict__.setdefault('encoding', 'onehot')
+        self._plan = None
+        self.__dict__.setdefault('categorical_features', list(CATEGORICAL_FEATURES))
+        self.__dict__.setdefault('price_per_sqft_median', None)
+        self.__dict__.setdefault('size_medians', None)
+        self.__dict__.setdefault('constant_features', [])
+        if 'target_moments' not in state:
+            self._reset_running_statistics()
+            self._seed_moments_from_stats()
+        if 'numeric_features' not in state:
+            self.numeric_features = [f for f in self.feature_names if f in FEATURE_REGISTRY]
+
+    @staticmethod
+    def _make_encoder(encoding: str) -> Union[OneHotEncoder, OrdinalEncoder]:
+        """Build the unfitted categorical encoder for an encoding mode."""
+        if encoding == 'native':
+            return OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1)
+        return OneHotEncoder(sparse_output=(encoding == 'sparse'), handle_unknown='ignore')
+
+    @property
+    def categorical_indices(self) -> List[int]:
+        """Column positions of integer category codes ('native' encoding only)."""
+        if self.encoding != 'native':
+            return []
+        start = len(self.numeric_features)
+        return list(range(start, start + len(self.categorical_features)))
+
+    def _combine(self, X_numeric: np.ndarray, X_categorical: Any) -> Union[np.ndarray, sparse.csr_matrix]:
+        """Join the numeric and categorical blocks in the configured output format."""
+        if self.encoding == 'sparse':
+            return sparse.hstack([sparse.csr_matrix(X_numeric), X_categorical], format='csr')
+        return np.hstack([X_numeric, X_categorical])
+
+    def expand_onehot(self, X: np.ndarray, dense: bool = False) -> Union[np.ndarray, sparse.csr_matrix]:
         """
-        Create interaction features between key variables.
+        Expand the integer code columns of a 'native' matrix into one-hot columns.
+        
+        Unseen categories (code -1) become all-zero rows, matching ``handle_unknown='ignore'``.
         
         Args:
-            df (pd.DataFrame): Input dataframe containing raw features.
+            X (np.ndarray): Matrix produced with ``encoding='native'``.
+            dense (bool): Return a dense array instead of a CSR matrix.
             
         Returns:
-            pd.DataFrame: Dataframe with added interaction columns.
+            Union[np.ndarray, sparse.csr_matrix]: Numeric block followed by one-hot blocks,
+                identical to the 'onehot' / 'sparse' encodings.
         """
-        logger.info("Creating interaction features...")
-        
-        df_new = df.copy()
-        
-        # Size × Bedrooms interaction (size per bedroom)
-        # Handle division by zero for studios (0 bedrooms)
-        df_new['size_per_bedroom'] = df_new['size_sqft'] / df_new['bedrooms'].replace(0, 1)
-        
-        # Tier × Metro interaction (premium locations with metro)
-        df_new['tier_metro_interaction'] = df_new['tier_numeric'] * df_new['has_metro_numeric']
+        n_numeric = len(self.numeric_features)
+        codes = np.asarray(X[:, n_numeric:]).astype(np.int64)
+        X_onehot = sparse.hstack([
+            sparse.csr_matrix(np.asarray(X[:, :n_numeric], dtype=np.float64)),
+            _codes_to_onehot(codes, self.encoder.categories_)
+        ], format='csr')
+        return X_onehot.toarray() if dense else X_onehot
+
+    def _encode_categorical(self, frame: pd.DataFrame) -> Any:
+        """
+        Encode the categorical block of a working frame.
         
-        # Tier × Beach interaction
-        df_new['tier_beach_interaction'] = df_new['tier_numeric'] * df_new['beach_accessible_numeric']
+        Columns that are already ``pd.Categorical`` (e.g. dictionary-encoded Arrow data)
+        are encoded by mapping their small category dictionary onto the fitted categories
+        and gathering codes, instead of hashing every row's string.
+        """
+        if not all(isinstance(frame[col].dtype, pd.CategoricalDtype) for col in frame.columns):
+            return self.encoder.transform(frame)
+        codes = np.empty((len(frame), len(frame.columns)), dtype=np.int64)
+        for j, (col, categories) in enumerate(zip(frame.columns, self.encoder.categories_)):
+            lookup = pd.Index(categories).get_indexer(frame[col].cat.categories)
+            batch_codes = frame[col].cat.codes.to_numpy()
+            codes[:, j] = np.where(batch_codes >= 0, lookup[batch_codes], -1)
+        if self.encoding == 'native':
+            return codes.astype(np.float64)
+        X_categorical = _codes_to_onehot(codes, self.encoder.categories_)
+        return X_categorical if self.encoding == 'sparse' else X_categorical.toarray()
+
+    def model_input_width(self, model_name: str) -> int:
+        """Number of columns ``model_input`` produces for one ensemble member."""
+        if self.encoding == 'native' and model_name not in NATIVE_CATEGORICAL_MODELS:
+            return len(self.numeric_features) + sum(len(c) for c in self.encoder.categories_)
+        return len(self.feature_names)
+
+    def model_input(self, X: Any, model_name: str) -> Any:
+        """
+        Adapt a transformed matrix to what a given ensemble member was trained on.
         
-        # Amenity density (amenities per sqft)
-        df_new['amenity_density'] = df_new['amenity_count'] / (df_new['size_sqft'] / 1000)
+        Only 'native' encoding needs adapting: LightGBM gets the codes as-is, CatBoost a
+        DataFrame with integer code columns, Random Forest a dense one-hot expansion and
+        every other model (XGBoost) a CSR one-hot expansion.
         
-        # Furnished × Tier (furnished premium varies by tier)
-        df_new['furnished_tier'] = df_new['furnished_numeric'] * df_new['tier_numeric']
+        Args:
+            X (Any): Output of ``transform`` / ``fit_transform``.
+            model_name (str): Ensemble member name (e.g. 'Random Forest').
+            
+        Returns:
+            Any: Model-ready input.
+        """
+        if self.encoding != 'native':
+            return X
+        if model_name not in NATIVE_CATEGORICAL_MODELS:
+            return self.expand_onehot(X, dense=model_name in DENSE_ONEHOT_MODELS)
+        if model_name == 'CatBoost':
+            X_df = pd.DataFrame(np.asarray(X), columns=self.feature_names)
+            categorical = [self.feature_names[i] for i in self.categorical_indices]
+            X_df[categorical] = X_df[categorical].astype(np.int64)
+            return X_df
+        return X
+
+    def model_input_sources(self, model_name: str) -> np.ndarray:
+        """
+        Output column (index into ``feature_names``) behind each column of ``model_input``.
+
+        Identity except for members fed a one-hot expansion of a 'native' matrix, whose
+        one-hot columns all map to the code column they were expanded from. Per-column
+        attributions (e.g. SHAP values) are folded onto ``feature_names`` by summing over
+        equal sources.
+
+        Args:
+            model_name (str): Ensemble member name (e.g. 'Random Forest').
+
+        Returns:
+            np.ndarray: Integer array of length ``model_input_width(model_name)``.
+        """
+        n_numeric = len(self.numeric_features)
+        if self.encoding != 'native' or model_name in NATIVE_CATEGORICAL_MODELS:
+            return np.arange(len(self.feature_names))
+        categorical = [np.full(len(categories), n_numeric + j)
+                       for j, categories in enumerate(self.encoder.categories_)]
+        return np.concatenate([np.arange(n_numeric)] + categorical).astype(np.int64)
+
+    def raw_feature_attribution(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Share of each output column owed to the raw input columns it is computed from.
+
+        Derived features split their share equally between their registry inputs
+        (recursively); categorical columns, including one-hot columns, belong to their
+        source column. Multiplying per-column attributions by the matrix gives them per
+        raw input (e.g. 'size_sqft', 'neighborhood'), preserving their row sums.
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Raw input names (in order of first use) and a
+                ``(len(feature_names), len(names))`` matrix whose rows sum to 1.
+        """
+        def resolve(name: str) -> Dict[str, float]:
+            spec = FEATURE_REGISTRY[name]
+            if spec.formula is None:
+                return {name: 1.0}
+            shares: Dict[str, float] = {}
+            for col in spec.inputs:
+                for raw, share in (resolve(col) if col in FEATURE_REGISTRY else {col: 1.0}).items():
+                    shares[raw] = shares.get(raw, 0.0) + share / len(spec.inputs)
+            return shares
+
+        rows = [resolve(name) for name in self.numeric_features]
+        rows += [{source: 1.0} for _, source in self._categorical_columns()]
+        names = list(dict.fromkeys(raw for row in rows for raw in row))
+        index = {raw: j for j, raw in enumerate(names)}
+        matrix = np.zeros((len(rows), len(names)))
+        for i, row in enumerate(rows):
+            for raw, share in row.items():
+                matrix[i, index[raw]] = share
+        return names, matrix
+
+    def _require_target_stats(self) -> pd.DataFrame:
+        """Return fitted neighborhood statistics or fail if the engineer is unfitted."""
+        if self.neighborhood_stats is None:
+            raise ValueError("Target encoding statistics are not fitted; call fit_transform first")
+        return self.neighborhood_stats
+
+    def _compute_features(self, df: pd.DataFrame, feature_names: Sequence[str],
+                          df_new: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Compute the requested registered features and their dependencies.
         
-        # Bathrooms × Bedrooms ratio
-        df_new['bath_bed_ratio'] = df_new['bathrooms'] / df_new['bedrooms'].replace(0, 1)
+        Args:
+            df (pd.DataFrame): Input dataframe (not modified).
+            feature_names (Sequence[str]): Registered features to compute.
+            df_new (Optional[pd.DataFrame]): Frame to write into; a copy of ``df`` by default.
+            
+        Returns:
+            pd.DataFrame: Dataframe with the computed feature columns added.
+        """
+        df_new = df.copy() if df_new is None else df_new
+        for spec in resolve_feature_dependencies(feature_names):
+            if spec.formula is None:
+                continue
+            if spec.fallback is not None and any(col not in df_new.columns for col in spec.inputs):
+                df_new[spec.name] = spec.fallback
+                continue
+            values = spec.formula(df_new, self)
+            df_new[spec.name] = np.asarray(values).astype(spec.dtype)
+        return df_new
+
+    def _group_features(self, group: str) -> List[str]:
+        """Registered feature names belonging to one group."""
+        return [name for name, spec in FEATURE_REGISTRY.items() if spec.group == group]
         
-        # Metro + Beach combined (best locations)
-        df_new['premium_location'] = (
-            (df_new['has_metro_numeric'] == 1) & 
-            (df_new['beach_accessible_numeric'] == 1)
-        ).astype(int)
+    def create_interaction_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Create interaction features between key variables.
         
-        logger.info(f"Created 7 interaction features")
+        Args:
+            df (pd.DataFrame): Input dataframe containing raw features.
+            
+        Returns:
+            pd.DataFrame: Dataframe with added interaction columns.
+        """
+        logger.info("Creating interaction features...")
+        names = self._group_features('interaction')
+        df_new = self._compute_features(df, names)
+        logger.info(f"Created {len(names)} interaction features")
         return df_new
     
     def create_polynomial_features(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -99,25 +667,18 @@ class AdvancedFeatureEngineer:
             pd.DataFrame: Dataframe with added polynomial columns.
         """
         logger.info("Creating polynomial features...")
-        
-        df_new = df.copy()
-        
-        # Quadratic size (diminishing returns for very large properties)
-        df_new['size_sqft_squared'] = df_new['size_sqft'] ** 2
-        
-        # Quadratic amenity count (luxury amenity premium)
-        df_new['amenity_count_squared'] = df_new['amenity_count'] ** 2
-        
-        # Square root of size (larger relative impact for smaller properties)
-        df_new['size_sqft_sqrt'] = np.sqrt(df_new['size_sqft'])
-        
-        logger.info(f"Created 3 polynomial features")
+        names = self._group_features('polynomial')
+        df_new = self._compute_features(df, names)
+        logger.info(f"Created {len(names)} polynomial features")
         return df_new
     
     def create_domain_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Create domain-specific features based on real estate knowledge.
         
+        Medians used by the value/premium/spacious indicators come from the fitted
+        statistics when available, otherwise from the input batch.
+        
         Args:
             df (pd.DataFrame): Input dataframe.
             
@@ -125,51 +686,179 @@ class AdvancedFeatureEngineer:
             pd.DataFrame: Dataframe with added domain-specific columns.
         """
         logger.info("Creating domain-specific features...")
+        names = self._group_features('domain')
+        df_new = self._compute_features(df, names)
+        logger.info(f"Created {len(names)} domain-specific features")
+        return df_new
+
+    def _fit_target_statistics(self, df: pd.DataFrame, target_col: str) -> None:
+        """Store neighborhood and global target statistics for later use in transform()."""
+        self.neighborhood_stats = df.groupby('neighborhood', observed=True)[target_col].agg(['mean', 'std', 'count'])
+        self.global_mean = df[target_col].mean()
+        self.global_std = df[target_col].std()
+
+    def _seed_moments_from_stats(self) -> None:
+        """Rebuild running target moments from stored summary statistics (older pickles)."""
+        if self.neighborhood_stats is None:
+            return
+        stats = self.neighborhood_stats
+        self.target_moments = pd.DataFrame({
+            'count': stats['count'].astype(np.int64),
+            'mean': stats['mean'],
+            'm2': stats['std'].fillna(0.0) ** 2 * (stats['count'] - 1),
+        })
+        total = int(stats['count'].sum())
+        self.global_moments = pd.DataFrame(
+            {'count': [total], 'mean': [self.global_mean], 'm2': [self.global_std ** 2 * (total - 1)]}
+        )
+
+    def _update_running_statistics(self, df: pd.DataFrame, target_col: str) -> None:
+        """Fold one batch into the running moments and median sketches."""
+        target = df[target_col].astype(np.float64)
+        self.target_moments = _merge_moments(self.target_moments, _batch_moments(target, df['neighborhood']))
+        self.global_moments = _merge_moments(self.global_moments, _batch_moments(target))
+        if 'price_per_sqft' in df.columns:
+            if self.price_per_sqft_sketch is None:
+                self.price_per_sqft_sketch = QuantileSketch()
+            self.price_per_sqft_sketch.update(df['price_per_sqft'].values)
+        for prop_type, sizes in df.groupby('property_type', observed=True)['size_sqft']:
+            self.size_sketches.setdefault(prop_type, QuantileSketch()).update(sizes.values)
+
+    def _refresh_from_running_statistics(self) -> None:
+        """Derive the statistics used by transform() from the running state."""
+        moments = self.target_moments
+        self.neighborhood_stats = pd.DataFrame({
+            'mean': moments['mean'], 'std': _moments_std(moments), 'count': moments['count']
+        })
+        self.neighborhood_stats.index.name = 'neighborhood'
+        self.global_mean = float(self.global_moments['mean'].iloc[0])
+        self.global_std = float(_moments_std(self.global_moments).iloc[0])
+        if self.price_per_sqft_sketch is not None:
+            self.price_per_sqft_median = self.price_per_sqft_sketch.quantile(0.5)
+        self.size_medians = pd.Series(
+            {prop_type: sketch.quantile(0.5) for prop_type, sketch in self.size_sketches.items()},
+            dtype=np.float64
+        )
+
+    def _extend_encoder(self, df: pd.DataFrame) -> None:
+        """
+        Append categories not seen before to the fitted encoder.
         
-        df_new = df.copy()
+        Existing categories keep their positions (and native codes); only the new
+        categories are added at the end of each block.
+        """
+        categories = [list(c) for c in self.encoder.categories_]
+        added = 0
+        for known, col in zip(categories, self.categorical_features):
+            seen = set(known)
+            new_values = [v for v in pd.unique(df[col].dropna()) if v not in seen]
+            known.extend(new_values)
+            added += len(new_values)
+        if not added:
+            return
+        self._fit_encoder_categories(categories)
+        logger.info(f"Extended encoder with {added} new categories")
+
+    def _fit_encoder_categories(self, categories: List[List[Any]]) -> None:
+        """Fit a fresh encoder on explicit per-column categories and recompile the plan."""
+        encoder = self._make_encoder(self.encoding)
+        encoder.set_params(categories=[np.array(c, dtype=object) for c in categories])
+        encoder.fit(pd.DataFrame({col: [c[0]] for col, c in zip(self.categorical_features, categories)}))
+        self.encoder = encoder
+        self.feature_names = self.numeric_features + [name for name, _ in self._categorical_columns()]
+        self._plan = self._compile_plan()
+
+    def partial_fit(self, df: pd.DataFrame, target_col: str = 'annual_rent') -> 'AdvancedFeatureEngineer':
+        """
+        Update the fitted statistics with a new batch of listings.
         
-        # Luxury property indicator (top tier + high amenities)
-        df_new['is_luxury'] = (
-            (df_new['tier_numeric'] >= 3) & 
-            (df_new['amenity_count'] >= 6)
-        ).astype(int)
+        Target moments are merged with a parallel Welford update and medians come from
+        mergeable sketches, so the cost is O(batch) rather than a refit on the full
+        history. New neighborhoods/property types extend the encoder in place; with
+        one-hot encodings that widens the output, native codes keep the width fixed.
         
-        # Value property (low price per sqft)
-        # Using a safe fallback if price_per_sqft is not yet calculated
-        if 'price_per_sqft' in df_new.columns:
-            median_ppsf = df_new['price_per_sqft'].median()
-            df_new['is_value_property'] = (df_new['price_per_sqft'] < median_ppsf * 0.8).astype(int)
+        Args:
+            df (pd.DataFrame): New listings including the target column.
+            target_col (str): Name of the target variable column.
             
-            # Premium property (high price per sqft)
-            df_new['is_premium_property'] = (df_new['price_per_sqft'] > median_ppsf * 1.2).astype(int)
-        else:
-            df_new['is_value_property'] = 0
-            df_new['is_premium_property'] = 0
-        
-        # Spacious property (size above median for property type)
-        df_new['is_spacious'] = 0
-        for prop_type in df_new['property_type'].unique():
-            mask = df_new['property_type'] == prop_type
-            if mask.any():
-                median_size = df_new.loc[mask, 'size_sqft'].median()
-                df_new.loc[mask, 'is_spacious'] = (
-                    df_new.loc[mask, 'size_sqft'] > median_size * 1.2
-                ).astype(int)
-        
-        # Complete amenity package (has pool, gym, parking, balcony)
-        required_amenities = ['has_pool', 'has_gym', 'has_parking', 'has_balcony']
-        if all(col in df_new.columns for col in required_amenities):
-            df_new['has_complete_amenities'] = (
-                (df_new['has_pool'] == 1) &
-                (df_new['has_gym'] == 1) &
-                (df_new['has_parking'] == 1) &
-                (df_new['has_balcony'] == 1)
-            ).astype(int)
+        Returns:
+            AdvancedFeatureEngineer: self
+        """
+        if self.target_moments is None and self.neighborhood_stats is None:
+            # First batch defines the output schema
+            self.numeric_features = self._available_features(df.columns)
+            self.categorical_features = [f for f in CATEGORICAL_FEATURES if f in df.columns]
+            self.constant_features = self._constant_features(df.columns)
+            self.encoder.fit(df[self.categorical_features])
+            self.feature_names = self.numeric_features + [name for name, _ in self._categorical_columns()]
+            self._plan = self._compile_plan()
         else:
-             df_new['has_complete_amenities'] = 0
+            self._extend_encoder(df)
+        self._update_running_statistics(df, target_col)
+        self._refresh_from_running_statistics()
+        return self
+
+    def fit_chunks(self, chunks: Iterable[pd.DataFrame], target_col: str = 'annual_rent') -> int:
+        """
+        Fit the engineer from a stream of chunks without holding the dataset in memory.
         
-        logger.info(f"Created 5 domain-specific features")
-        return df_new
+        This is pass one of an out-of-core ``fit_transform``: category vocabularies,
+        target moments and median sketches are accumulated chunk by chunk, then the
+        encoder is fitted on the sorted vocabularies (same category order as a full
+        fit). Target statistics are exact; medians carry the sketch's 1% relative error.
+        
+        Args:
+            chunks (Iterable[pd.DataFrame]): Dataset chunks, each including the target column.
+            target_col (str): Name of the target variable column.
+            
+        Returns:
+            int: Total number of rows seen.
+            
+        Raises:
+            ValueError: If ``chunks`` is empty.
+        """
+        self._reset_running_statistics()
+        vocabularies: Optional[Dict[str, set]] = None
+        n_rows = 0
+        for chunk in chunks:
+            if vocabularies is None:
+                # First chunk defines the output schema
+                self.numeric_features = self._available_features(chunk.columns)
+                self.categorical_features = [f for f in CATEGORICAL_FEATURES if f in chunk.columns]
+                self.constant_features = self._constant_features(chunk.columns)
+                vocabularies = {col: set() for col in self.categorical_features}
+            for col in self.categorical_features:
+                vocabularies[col].update(chunk[col].dropna().unique())
+            self._update_running_statistics(chunk, target_col)
+            n_rows += len(chunk)
+        if vocabularies is None:
+            raise ValueError("fit_chunks received no data")
+        self._refresh_from_running_statistics()
+        self._fit_encoder_categories([sorted(vocabularies[col]) for col in self.categorical_features])
+        logger.info(f"Fitted on {n_rows:,} rows from chunks")
+        return n_rows
+
+    def fit_statistics(self, df: pd.DataFrame, target_col: str = 'annual_rent') -> 'AdvancedFeatureEngineer':
+        """
+        Fit the data-dependent statistics used by stateful features.
+        
+        Exact statistics are computed from ``df``; the running state used by
+        ``partial_fit`` is reset and seeded with the same data.
+        
+        Args:
+            df (pd.DataFrame): Training dataframe.
+            target_col (str): Name of the target variable column.
+            
+        Returns:
+            AdvancedFeatureEngineer: self
+        """
+        self._reset_running_statistics()
+        self._update_running_statistics(df, target_col)
+        self._fit_target_statistics(df, target_col)
+        if 'price_per_sqft' in df.columns:
+            self.price_per_sqft_median = float(df['price_per_sqft'].median())
+        self.size_medians = df.groupby('property_type', observed=True)['size_sqft'].median()
+        return self
     
     def create_target_encoding(self, df: pd.DataFrame, target_col: str = 'annual_rent') -> pd.DataFrame:
         """
@@ -184,35 +873,165 @@ class AdvancedFeatureEngineer:
         """
         logger.info("Creating target-encoded features...")
         
-        df_new = df.copy()
-        
-        # Neighborhood average rent (with smoothing)
-        # Store stats for later use in transform()
-        self.neighborhood_stats = df_new.groupby('neighborhood')[target_col].agg(['mean', 'std', 'count'])
-        self.global_mean = df_new[target_col].mean()
-        self.global_std = df_new[target_col].std()
+        # Neighborhood average rent (Bayesian smoothing) and rent volatility
+        self._fit_target_statistics(df, target_col)
         
-        # Bayesian smoothing
-        m = 30  # Minimum sample size for confidence
+        names = self._group_features('target')
+        df_new = self._compute_features(df, names)
+        logger.info(f"Created {len(names)} target-encoded features")
+        return df_new
+
+    def _available_features(self, columns: Sequence[str]) -> List[str]:
+        """Requested registered features whose mandatory inputs are present in ``columns``."""
+        requested = self.features if self.features is not None else list(FEATURE_REGISTRY)
+        columns = set(columns)
+        available = []
+        for name in requested:
+            missing = [col for col in required_raw_inputs([name]) if col not in columns]
+            if missing:
+                logger.warning(f"Skipping feature '{name}': missing inputs {missing}")
+            else:
+                available.append(name)
+        return available
+
+    def _constant_features(self, columns: Sequence[str]) -> List[str]:
+        """Output features whose optional inputs are absent, so they fit as a fallback constant."""
+        columns = set(columns)
+        return [name for name in self.numeric_features
+                if FEATURE_REGISTRY[name].fallback is not None
+                and any(col not in columns for col in FEATURE_REGISTRY[name].inputs)]
+
+    def required_inputs(self) -> List[str]:
+        """Raw input columns ``transform`` needs for the fitted feature schema."""
+        return sorted(self._get_plan().raw_inputs)
+
+    def _compile_plan(self) -> TransformPlan:
+        """
+        Compile the fitted schema into a transform plan.
         
-        # Calculate smoothed mean
-        df_new['neighborhood_rent_avg'] = df_new['neighborhood'].map(
-            lambda x: (
-                self.neighborhood_stats.loc[x, 'count'] * self.neighborhood_stats.loc[x, 'mean'] +
-                m * self.global_mean
-            ) / (self.neighborhood_stats.loc[x, 'count'] + m)
-            if x in self.neighborhood_stats.index else self.global_mean
+        Resolves dependencies, output slots and input positions once so ``transform``
+        only executes operations.
+        """
+        slots = {name: i for i, name in enumerate(self.numeric_features)}
+        constants = [name for name in self.numeric_features if name in self.constant_features]
+        specs = resolve_feature_dependencies([name for name in self.numeric_features if name not in constants])
+        consumed = {col for spec in specs for col in spec.inputs}
+
+        raw_inputs: List[str] = []
+        for spec in specs:
+            for col in (spec.inputs if spec.formula is not None else (spec.name,)):
+                if (col not in FEATURE_REGISTRY or spec.formula is None) and col not in raw_inputs:
+                    raw_inputs.append(col)
+        for col in self.categorical_features:
+            if col not in raw_inputs:
+                raw_inputs.append(col)
+
+        passthrough = [(raw_inputs.index(spec.name), slots[spec.name]) for spec in specs
+                       if spec.formula is None and spec.name in slots]
+        steps = tuple(
+            PlanStep(spec.name, spec.formula, slots.get(spec.name, -1), spec.name in consumed, None)
+            for spec in specs if spec.formula is not None
+        ) + tuple(
+            PlanStep(name, None, slots[name], False, FEATURE_REGISTRY[name].fallback) for name in constants
+        )
+        return TransformPlan(
+            raw_inputs=tuple(raw_inputs),
+            passthrough_sources=np.array([src for src, _ in passthrough], dtype=np.intp),
+            passthrough_slots=np.array([slot for _, slot in passthrough], dtype=np.intp),
+            steps=steps,
+            categorical_sources=tuple(self.categorical_features),
+            n_numeric=len(self.numeric_features),
         )
+
+    def _get_plan(self) -> TransformPlan:
+        """Compiled plan, compiling it on first use (e.g. after unpickling)."""
+        if self._plan is None:
+            self._plan = self._compile_plan()
+        return self._plan
+
+    def _execute_plan(self, df: pd.DataFrame) -> Union[np.ndarray, sparse.csr_matrix]:
+        """
+        Run the compiled plan on ``df``.
         
-        # Neighborhood rent volatility
-        df_new['neighborhood_rent_std'] = df_new['neighborhood'].map(
-            self.neighborhood_stats['std']
-        ).fillna(self.global_std)
+        Raises:
+            ValueError: If ``df`` lacks a column the plan reads.
+        """
+        plan = self._get_plan()
+        positions = df.columns.get_indexer(plan.raw_inputs)
+        if (positions < 0).any():
+            missing = [col for col, pos in zip(plan.raw_inputs, positions) if pos < 0]
+            raise ValueError(f"Missing required input columns for transform: {missing}")
+        frame = df.iloc[:, positions].copy(deep=False)
+
+        X_numeric = np.empty((len(df), plan.n_numeric), dtype=np.float64)
+        X_numeric[:, plan.passthrough_slots] = frame.iloc[:, plan.passthrough_sources].to_numpy(dtype=np.float64)
+        for step in plan.steps:
+            if step.constant is not None:
+                X_numeric[:, step.slot] = step.constant
+                continue
+            values = step.formula(frame, self)
+            if step.slot >= 0:
+                X_numeric[:, step.slot] = values
+            if step.keep:
+                frame[step.name] = values
+
+        X_categorical = self._encode_categorical(frame[list(plan.categorical_sources)])
+        return self._combine(X_numeric, X_categorical)
+
+    def select_features(self, feature_names: Sequence[str]) -> 'AdvancedFeatureEngineer':
+        """
+        Restrict the fitted output schema to the numeric features a model consumes.
         
-        logger.info(f"Created 2 target-encoded features")
-        return df_new
+        Only the selected features and their dependencies are computed by ``transform``.
+        The categorical one-hot block is kept unchanged.
+        
+        Args:
+            feature_names (Sequence[str]): Subset of the fitted numeric features.
+            
+        Returns:
+            AdvancedFeatureEngineer: self
+            
+        Raises:
+            ValueError: If a name is not one of the fitted numeric features.
+        """
+        unknown = [f for f in feature_names if f not in self.numeric_features]
+        if unknown:
+            raise ValueError(f"Features not produced by this engineer: {unknown}")
+        keep = set(feature_names)
+        self.numeric_features = [f for f in self.numeric_features if f in keep]
+        self.features = list(self.numeric_features)
+        self._plan = self._compile_plan()
+        self.feature_names = self.numeric_features + [name for name, _ in self._categorical_columns()]
+        return self
+
+    def _categorical_columns(self) -> List[Tuple[str, str]]:
+        """(output name, source column) pairs of the fitted categorical block."""
+        if not hasattr(self.encoder, 'categories_'):
+            return []
+        if self.encoding == 'native':
+            return [(col, col) for col in self.categorical_features]
+        names = self.encoder.get_feature_names_out(self.categorical_features).tolist()
+        sources = [col for col, categories in zip(self.categorical_features, self.encoder.categories_)
+                   for _ in categories]
+        return list(zip(names, sources))
+
+    def get_feature_schema(self) -> List[Dict[str, Any]]:
+        """
+        Machine-checkable description of the output columns, in order.
+        
+        Returns:
+            List[Dict[str, Any]]: One entry per output column with name, dtype, group and inputs.
+        """
+        schema = []
+        for name in self.numeric_features:
+            spec = FEATURE_REGISTRY[name]
+            schema.append({'name': name, 'dtype': spec.dtype, 'group': spec.group, 'inputs': list(spec.inputs)})
+        cat_dtype = 'int64' if self.encoding == 'native' else 'float64'
+        for name, source in self._categorical_columns():
+            schema.append({'name': name, 'dtype': cat_dtype, 'group': 'categorical', 'inputs': [source]})
+        return schema
     
-    def fit_transform(self, df: pd.DataFrame, target_col: str = 'annual_rent') -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    def fit_transform(self, df: pd.DataFrame, target_col: str = 'annual_rent') -> Tuple[Union[np.ndarray, sparse.csr_matrix], np.ndarray, List[str]]:
         """
         Complete feature engineering pipeline: Fit encoders and transform data.
         
@@ -222,101 +1041,55 @@ class AdvancedFeatureEngineer:
             
         Returns:
             Tuple[np.ndarray, np.ndarray, List[str]]: 
-                - X: Feature matrix (numpy array)
+                - X: Feature matrix (numpy array, CSR matrix for 'sparse' encoding)
                 - y: Target vector (numpy array)
                 - feature_names: List of feature names
         """
         logger.info("Starting complete feature engineering pipeline...")
         
-        # Create all feature types
-        df_features = self.create_interaction_features(df)
-        df_features = self.create_polynomial_features(df_features)
-        df_features = self.create_domain_features(df_features)
-        df_features = self.create_target_encoding(df_features, target_col)
-        
-        # Define feature columns
-        numeric_features = [
-            # Original features
-            'size_sqft', 'bedrooms', 'bathrooms', 'amenity_count',
-            'tier_numeric', 'furnished_numeric', 'has_metro_numeric', 
-            'beach_accessible_numeric', 'price_per_sqft',
-            # Individual amenities
-            'has_pool', 'has_gym', 'has_parking', 'has_balcony',
-            # Interaction features
-            'size_per_bedroom', 'tier_metro_interaction', 'tier_beach_interaction',
-            'amenity_density', 'furnished_tier', 'bath_bed_ratio', 'premium_location',
-            # Polynomial features
-            'size_sqft_squared', 'amenity_count_squared', 'size_sqft_sqrt',
-            # Domain features
-            'is_luxury', 'is_value_property', 'is_premium_property', 
-            'is_spacious', 'has_complete_amenities',
-            # Target encoded
-            'neighborhood_rent_avg', 'neighborhood_rent_std'
-        ]
-        
-        categorical_features = ['neighborhood', 'property_type']
-        
-        # Filter to existing columns
-        numeric_features = [f for f in numeric_features if f in df_features.columns]
-        categorical_features = [f for f in categorical_features if f in df_features.columns]
-        
-        logger.info(f"Using {len(numeric_features)} numeric and {len(categorical_features)} categorical features")
-        
-        # Extract numeric features
-        X_numeric = df_features[numeric_features].values
-        
-        # Encode categorical features
-        X_categorical = self.encoder.fit_transform(df_features[categorical_features])
-        
-        # Combine features
-        X = np.hstack([X_numeric, X_categorical])
+        self.fit_statistics(df, target_col)
+        
+        # Resolve the output schema from the registry, filtered to available inputs
+        self.numeric_features = self._available_features(df.columns)
+        self.categorical_features = [f for f in CATEGORICAL_FEATURES if f in df.columns]
+        self.constant_features = self._constant_features(df.columns)
+        
+        logger.info(f"Using {len(self.numeric_features)} numeric and {len(self.categorical_features)} categorical features")
+        
+        # Fit categorical encoder
+        self.encoder.fit(df[self.categorical_features])
         
         # Get feature names
-        cat_feature_names = self.encoder.get_feature_names_out(categorical_features).tolist()
-        self.feature_names = numeric_features + cat_feature_names
+        self.feature_names = self.numeric_features + [name for name, _ in self._categorical_columns()]
+        
+        # Compile the transform plan and run it on the training data
+        self._plan = self._compile_plan()
+        X = self._execute_plan(df)
         
         # Extract target
-        y = df_features[target_col].values
+        y = df[target_col].values
         
         logger.info(f"Feature engineering complete. Final shape: {X.shape}")
         logger.info(f"Total features: {len(self.feature_names)}")
         
         return X, y, self.feature_names
 
-    def transform(self, df: pd.DataFrame) -> np.ndarray:
+    def transform(self, df: pd.DataFrame) -> Union[np.ndarray, sparse.csr_matrix]:
         """
-        Transform new data using fitted encoder.
+        Transform new data using the fitted encoder and statistics.
+        
+        Executes the plan compiled at fit time: only the features in the fitted schema
+        (and their dependencies) are computed, each written to its fixed output column.
+        Target-encoded columns are looked up from the fitted neighborhood statistics.
         
         Args:
-            df (pd.DataFrame): Input dataframe.
+            df (pd.DataFrame): Input dataframe containing ``required_inputs()``.
             
         Returns:
-            np.ndarray: Transformed feature matrix.
+            Union[np.ndarray, sparse.csr_matrix]: Transformed feature matrix with columns in
+                ``feature_names`` order.
+                
+        Raises:
+            ValueError: If a required input column is missing.
         """
-        # Create all feature types (without target encoding fit)
-        df_features = self.create_interaction_features(df)
-        df_features = self.create_polynomial_features(df_features)
-        df_features = self.create_domain_features(df_features)
-        
-        # For prediction, we expect target encoded columns to be present in input
-        # (added by predictor.prepare_input) or we could implement lookup here.
-        # Current implementation relies on predictor providing placeholders.
-        
-        numeric_features = [f for f in self.feature_names if f in df_features.columns or '_' not in f]
-        # Ensure 'neighborhood_rent_avg' and 'neighborhood_rent_std' are included if in feature_names
-        for target_feat in ['neighborhood_rent_avg', 'neighborhood_rent_std']:
-            if target_feat in self.feature_names and target_feat not in numeric_features:
-                 if target_feat in df_features.columns:
-                    numeric_features.append(target_feat)
-
-        categorical_features = ['neighborhood', 'property_type']
-        
-        # Sort numeric features to match training order (best effort)
-        # In a stricter implementation, we would enforce exact column order
-        
-        X_numeric = df_features[numeric_features].values
-        X_categorical = self.encoder.transform(df_features[categorical_features])
-        
-        X = np.hstack([X_numeric, X_categorical])
-        
-        return X
+        return self._execute_plan(df)
@@ -0,0 +1,186 @@
+"""
+Importance-Driven Feature Pruning.
+
+Ranks the engineered numeric features by ensemble-wide permutation importance
+(increase in validation MAE of the weighted ensemble when a column is
+shuffled), retrains the suite on shrinking top-k subsets in parallel and picks
+the smallest subset whose ensemble MAE stays within a tolerance of the full
+feature set.
+
+The chosen subset is applied with ``AdvancedFeatureEngineer.select_features``,
+so the saved engineer (and therefore ``RentPredictor``) computes only the
+surviving features and their dependencies. The categorical block is always
+kept.
+"""
+
+import copy
+import json
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+from threadpoolctl import threadpool_limits
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from ml.model_training import MODEL_NAMES, inverse_mape_weights, model_inputs, train_member
+from ml.parallel_training import SharedArrays, _attach
+from ml.thread_budget import core_budget
+
+# Shares of the ranked numeric features tried as candidate subsets
+PRUNING_FRACTIONS = (1.0, 0.8, 0.65, 0.5, 0.4, 0.3, 0.2)
+
+
+def ensemble_predict(models: Dict[str, Any], weights: Dict[str, float], X, engineer=None) -> np.ndarray:
+    """Weighted ensemble prediction on an engineered feature matrix."""
+    return sum(weights[name] * model.predict(model_inputs(engineer, name, X)[0])
+               for name, model in models.items())
+
+
+def permutation_importance(models: Dict[str, Any], weights: Dict[str, float], X_val, y_val,
+                           engineer, n_repeats: int = 3, random_state: int = 42) -> pd.Series:
+    """
+    Ensemble-wide permutation importance of the engineer's numeric features.
+
+    Args:
+        models (Dict[str, Any]): Fitted ensemble members.
+        weights (Dict[str, float]): Ensemble weights.
+        X_val, y_val: Validation data in the engineer's output layout.
+        engineer: Fitted feature engineer.
+        n_repeats (int): Shuffles per feature (importance is the mean).
+        random_state (int): Seed for the shuffles.
+
+    Returns:
+        pd.Series: Mean validation MAE increase per numeric feature, descending.
+    """
+    rng = np.random.default_rng(random_state)
+    X_val = X_val.toarray() if hasattr(X_val, 'toarray') else np.array(X_val)
+    baseline = mean_absolute_error(y_val, ensemble_predict(models, weights, X_val, engineer))
+    importance = {}
+    for i, feature in enumerate(engineer.numeric_features):
+        original = X_val[:, i].copy()
+        increases = []
+        for _ in range(n_repeats):
+            X_val[:, i] = rng.permutation(original)
+            increases.append(mean_absolute_error(y_val, ensemble_predict(models, weights, X_val, engineer))
+                             - baseline)
+        X_val[:, i] = original
+        importance[feature] = float(np.mean(increases))
+    return pd.Series(importance).sort_values(ascending=False)
+
+
+def subset_columns(engineer, features: Sequence[str]) -> List[int]:
+    """Column indices of ``features`` plus the categorical block in the engineer's output."""
+    keep = set(features)
+    n_numeric = len(engineer.numeric_features)
+    return ([i for i, name in enumerate(engineer.numeric_features) if name in keep]
+            + list(range(n_numeric, len(engineer.feature_names))))
+
+
+def pruned_engineer(engineer, features: Sequence[str]):
+    """Copy of a fitted engineer restricted to ``features``."""
+    return copy.deepcopy(engineer).select_features(features)
+
+
+def _evaluate_subset_worker(features: List[str], descriptors: tuple, engineer: Any, n_threads: int,
+                            tuned_params: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[int, float]:
+    """Process pool task: train the suite on one feature subset and score the ensemble."""
+    blocks: List = []
+    X_train, y_train, X_val, y_val = (_attach(d, blocks) for d in descriptors)
+    columns = subset_columns(engineer, features)
+    subset = pruned_engineer(engineer, features)
+    X_tr, X_va = X_train[:, columns], X_val[:, columns]
+    tuned_params = tuned_params or {}
+    with threadpool_limits(limits=n_threads):
+        models = {name: train_member(name, X_tr, y_train, X_va, y_val, subset, n_jobs=n_threads,
+                                     params=tuned_params.get(name))[0]
+                  for name in MODEL_NAMES}
+        predictions = {name: model.predict(model_inputs(subset, name, X_va)[0]) for name, model in models.items()}
+    weights = inverse_mape_weights(predictions, y_val)
+    mae = mean_absolute_error(y_val, sum(weights[name] * predictions[name] for name in predictions))
+    del X_train, y_train, X_val, y_val, X_tr, X_va
+    for block in blocks:
+        block.close()
+    return len(features), float(mae)
+
+
+def prune_features(X_train, y_train, X_val, y_val, engineer, models: Dict[str, Any],
+                   weights: Dict[str, float], tolerance: Optional[float] = None,
+                   n_cores: Optional[int] = None,
+                   fractions: Sequence[float] = PRUNING_FRACTIONS,
+                   tuned_params: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Find the smallest top-k feature subset whose ensemble MAE is within tolerance.
+
+    Args:
+        X_train, y_train, X_val, y_val: Training and validation data (engineer layout).
+        engineer: Fitted feature engineer.
+        models (Dict[str, Any]): Suite trained on all features (used for the ranking).
+        weights (Dict[str, float]): Its ensemble weights.
+        tolerance (Optional[float]): Allowed relative MAE increase over the full
+            feature set (default ``config.FEATURE_PRUNING_TOLERANCE``).
+        n_cores (Optional[int]): Cores shared by the candidate retrains (default: all).
+        fractions (Sequence[float]): Shares of the ranked features to try.
+        tuned_params (Optional[Dict[str, Dict[str, Any]]]): Hyperparameter overrides per member.
+
+    Returns:
+        Tuple[List[str], Dict[str, Any]]: Selected numeric features (in engineer
+            order) and a report with the importance ranking and candidate scores.
+    """
+    tolerance = config.FEATURE_PRUNING_TOLERANCE if tolerance is None else tolerance
+    n_cores = core_budget(n_cores)
+
+    print("\n" + "="*60)
+    print("FEATURE PRUNING")
+    print("="*60)
+
+    ranking = permutation_importance(models, weights, X_val, y_val, engineer)
+    ranked = ranking.index.tolist()
+    sizes = sorted({max(1, math.ceil(len(ranked) * f)) for f in fractions}, reverse=True)
+    candidates = {k: ranked[:k] for k in sizes}
+    workers = min(len(candidates), n_cores)
+    n_threads = max(1, n_cores // workers)
+
+    maes = {}
+    with SharedArrays() as shared:
+        descriptors = tuple(shared.share(a) for a in (X_train, y_train, X_val, y_val))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+            futures = [pool.submit(_evaluate_subset_worker, features, descriptors, engineer, n_threads,
+                                   tuned_params)
+                       for features in candidates.values()]
+            for future in as_completed(futures):
+                k, mae = future.result()
+                maes[k] = mae
+
+    full_mae = maes[len(ranked)]
+    within = [k for k in sizes if maes[k] <= full_mae * (1 + tolerance)]
+    best_k = min(within)
+    selected = [f for f in engineer.numeric_features if f in set(candidates[best_k])]
+    for k in sizes:
+        marker = " <- selected" if k == best_k else ""
+        print(f"  {k:>3} features: ensemble MAE {maes[k]:,.0f} ({maes[k] / full_mae - 1:+.2%}){marker}")
+
+    report = {
+        'tolerance': tolerance,
+        'importance': ranking.to_dict(),
+        'candidates': {str(k): {'mae': maes[k], 'features': candidates[k]} for k in sizes},
+        'selected': selected,
+        'dropped': [f for f in engineer.numeric_features if f not in selected],
+    }
+    return selected, report
+
+
+def save_pruning_report(report: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    """Write the pruning report as JSON (default models/feature_pruning.json)."""
+    path = Path(path) if path is not None else config.MODELS_DIR / 'feature_pruning.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
@@ -0,0 +1,197 @@
+"""
+Per-Model Training Cache.
+
+Each trained ensemble member is stored under a key derived from the training
+and validation matrices, the feature schema and the member's hyperparameters.
+Rebuilding the suite reuses every member whose key is unchanged and trains only
+the rest; ensemble weights are recomputed from the cached validation
+predictions, so no cached member has to predict again.
+
+Layout of one cache entry::
+
+    <cache_dir>/<key>/model.pkl
+    <cache_dir>/<key>/val_pred.npy
+    <cache_dir>/<key>/meta.json
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import joblib
+import numpy as np
+from scipy import sparse
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from ml import model_training
+from ml.model_training import MODEL_NAMES, build_model, model_inputs, train_model_suite
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every existing entry when the on-disk layout changes
+MODEL_CACHE_FORMAT_VERSION = 1
+
+# Parameters that change how fast a model trains, not what it learns
+RUNTIME_PARAMS = ('n_jobs', 'thread_count', 'verbose', 'verbosity')
+
+
+def array_fingerprint(*arrays: Any) -> str:
+    """SHA-256 of the shapes, dtypes and values of dense arrays or sparse matrices."""
+    digest = hashlib.sha256()
+    for X in arrays:
+        if sparse.issparse(X):
+            X = X.tocsr()
+            digest.update(f"csr{X.shape}".encode())
+            parts = (X.data, X.indices, X.indptr)
+        else:
+            parts = (np.asarray(X),)
+        for part in parts:
+            part = np.ascontiguousarray(part)
+            digest.update(f"{part.dtype.str}{part.shape}".encode())
+            digest.update(memoryview(part).cast('B'))
+    return digest.hexdigest()
+
+
+def hyperparameters(model: Any) -> Dict[str, Any]:
+    """Hyperparameters that determine what a model learns (runtime-only settings removed)."""
+    return {k: v for k, v in sorted(model.get_params().items()) if k not in RUNTIME_PARAMS}
+
+
+def member_key(name: str, data_fingerprint: str, engineer: Any = None,
+               params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Cache key of one member.
+
+    Covers the data, the feature schema, the hyperparameters, config-driven fit
+    options, the library version of the model class and the source of
+    ``fit_model`` and ``grow_random_forest`` (early stopping and categorical
+    handling live there).
+    """
+    if params is None:
+        categorical_indices = engineer.categorical_indices if engineer is not None else []
+        params = hyperparameters(build_model(name, categorical_indices=categorical_indices))
+    model_module = build_model(name).__class__.__module__.split('.')[0]
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        'format': MODEL_CACHE_FORMAT_VERSION,
+        'name': name,
+        'data': data_fingerprint,
+        'schema': engineer.get_feature_schema() if engineer is not None else None,
+        'encoding': getattr(engineer, 'encoding', None),
+        'params': params,
+        'fit_options': model_training.fit_options(name),
+        'library': f"{model_module}=={getattr(sys.modules[model_module], '__version__', '?')}",
+    }, sort_keys=True, default=str).encode())
+    digest.update(inspect.getsource(model_training.fit_model).encode())
+    digest.update(inspect.getsource(model_training.grow_random_forest).encode())
+    return digest.hexdigest()[:24]
+
+
+def _read_member(entry_dir: Path) -> Tuple[Any, Dict[str, float], np.ndarray, Optional[Dict[str, Any]]]:
+    """Load one cached member: model, validation scores, validation predictions and training profile."""
+    model = joblib.load(entry_dir / 'model.pkl')
+    with open(entry_dir / 'meta.json') as f:
+        meta = json.load(f)
+    return model, meta['scores'], np.load(entry_dir / 'val_pred.npy'), meta.get('profile')
+
+
+def _write_member(entry_dir: Path, model: Any, scores: Dict[str, float], val_pred: np.ndarray,
+                  meta: dict) -> None:
+    """Write one cache entry atomically (build in a temp dir, then rename)."""
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{entry_dir.name}-", dir=entry_dir.parent))
+    try:
+        joblib.dump(model, tmp_dir / 'model.pkl')
+        np.save(tmp_dir / 'val_pred.npy', np.asarray(val_pred))
+        with open(tmp_dir / 'meta.json', 'w') as f:
+            json.dump({**meta, 'scores': {k: float(v) for k, v in scores.items()}}, f, indent=2, default=str)
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # Another process published the same entry first; keep theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (entry_dir / 'meta.json').exists():
+            raise
+
+
+def train_model_suite_cached(X_train, y_train, X_val, y_val, engineer=None,
+                             parallel: bool = False, n_cores: Optional[int] = None,
+                             names: Sequence[str] = MODEL_NAMES,
+                             cache_dir: Union[str, Path, None] = None,
+                             profile: bool = False,
+                             tuned_params: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[Dict, Dict, Dict, Dict]:
+    """
+    Train the suite, reusing every member whose data, schema and hyperparameters are unchanged.
+
+    Args:
+        X_train, y_train, X_val, y_val: Training and validation data.
+        engineer: Fitted feature engineer (see ``model_training.train_model_suite``).
+        parallel (bool): Train the missing members concurrently.
+        n_cores (Optional[int]): Cores to partition between members.
+        names (Sequence[str]): Members to build.
+        cache_dir (Union[str, Path, None]): Cache root. Defaults to ``config.MODEL_CACHE_DIR``.
+        profile (bool): Profile newly trained members. Cached members return the
+            profile recorded when they were trained (marked ``cached``), if any.
+        tuned_params (Optional[Dict[str, Dict[str, Any]]]): Hyperparameter overrides per
+            member (part of the cache key).
+
+    Returns:
+        Tuple[Dict, Dict, Dict, Dict]: Models, validation scores, validation
+            predictions and resource profiles keyed by member name.
+    """
+    cache_dir = Path(cache_dir if cache_dir is not None else config.MODEL_CACHE_DIR)
+    data_fp = array_fingerprint(X_train, y_train, X_val, y_val)
+    tuned_params = tuned_params or {}
+    categorical_indices = engineer.categorical_indices if engineer is not None else []
+    keys = {name: member_key(name, data_fp, engineer,
+                             hyperparameters(build_model(name, categorical_indices=categorical_indices,
+                                                         params=tuned_params.get(name))))
+            for name in names}
+
+    models, scores, predictions, profiles = {}, {}, {}, {}
+    for name in names:
+        if (cache_dir / keys[name] / 'meta.json').exists():
+            models[name], scores[name], predictions[name], cached_profile = _read_member(cache_dir / keys[name])
+            if profile and cached_profile:
+                profiles[name] = {**cached_profile, 'cached': True}
+            print(f"  {name}: reusing cached model {keys[name]}")
+
+    missing = [name for name in names if name not in models]
+    if missing:
+        results = train_model_suite(X_train, y_train, X_val, y_val, engineer, parallel=parallel,
+                                    n_cores=n_cores, names=missing, profile=profile, tuned_params=tuned_params)
+        trained, trained_scores = results[:2]
+        if profile:
+            profiles.update(results[2])
+        for name in missing:
+            X_va, = model_inputs(engineer, name, X_val)
+            models[name], scores[name] = trained[name], trained_scores[name]
+            predictions[name] = models[name].predict(X_va)
+            _write_member(cache_dir / keys[name], models[name], scores[name], predictions[name], {
+                'key': keys[name],
+                'name': name,
+                'data_fingerprint': data_fp,
+                'params': hyperparameters(models[name]),
+                'profile': profiles.get(name),
+                'created': datetime.now().isoformat(timespec='seconds'),
+            })
+    logger.info(f"Model cache: {len(names) - len(missing)} reused, {len(missing)} trained")
+
+    return ({name: models[name] for name in names},
+            {name: scores[name] for name in names},
+            {name: predictions[name] for name in names},
+            {name: profiles[name] for name in names if name in profiles})
+
+
+def clear_cache(cache_dir: Union[str, Path, None] = None) -> None:
+    """Delete every cached model."""
+    shutil.rmtree(cache_dir if cache_dir is not None else config.MODEL_CACHE_DIR, ignore_errors=True)
@@ -13,6 +13,9 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 import config
+from ml.model_training import model_inputs
+from ml.split_manifest import load_holdout
+from ml.thread_budget import apply_process_limits, core_budget
 
 
 def load_model_suite():
@@ -56,8 +59,14 @@ def plot_shap_summary(shap_values, X_sample, title="SHAP Summary Plot"):
 
 
 def plot_shap_waterfall(explainer, shap_values, X_sample, index=0):
-    """Generate waterfall plot for a single prediction"""
+    """
+    Generate waterfall plot for a single prediction
+    
+    Args:
+        explainer: TreeExplainer, or the base value itself (e.g. from the ensemble SHAP store)
+    """
     plt.figure(figsize=(10, 6))
+    base_value = getattr(explainer, 'expected_value', explainer)
     
     # For some models shap_values is a list, handle that
     if isinstance(shap_values, list):
@@ -66,7 +75,7 @@ def plot_shap_waterfall(explainer, shap_values, X_sample, index=0):
         sv = shap_values[index]
         
     shap.plots.waterfall(shap.Explanation(values=sv, 
-                                         base_values=explainer.expected_value, 
+                                         base_values=base_value, 
                                          data=X_sample.iloc[index], 
                                          feature_names=X_sample.columns),
                         show=False)
@@ -77,15 +86,21 @@ def plot_shap_waterfall(explainer, shap_values, X_sample, index=0):
     plt.close()
 
 
-def evaluate_ensemble(models, weights, X_test, y_test):
-    """Evaluate ensemble performance on test set"""
+def evaluate_ensemble(models, weights, X_test, y_test, engineer=None):
+    """
+    Evaluate ensemble performance on test set
+    
+    Args:
+        engineer: Fitted feature engineer used to adapt inputs per member
+    """
     print("\n" + "="*60)
     print("ENSEMBLE EVALUATION")
     print("="*60)
     
     predictions = {}
     for name, model in models.items():
-        predictions[name] = model.predict(X_test)
+        X_te, = model_inputs(engineer, name, X_test)
+        predictions[name] = model.predict(X_te)
         
     ensemble_pred = sum(weights[name] * predictions[name] for name in predictions)
     
@@ -107,23 +122,20 @@ def evaluate_ensemble(models, weights, X_test, y_test):
 
 
 if __name__ == "__main__":
-    # Example usage
+    from ml.ensemble_shap import compute_ensemble_shap, load_ensemble_shap
+
+    apply_process_limits(core_budget())
     models, weights, engineer = load_model_suite()
     
-    # Load data (simplified for example)
-    df = pd.read_csv(config.FILE_ANALYTICAL_DATASET)
-    X, y, feature_names = engineer.fit_transform(df)
-    
-    # Convert to DataFrame for SHAP
-    X_df = pd.DataFrame(X, columns=feature_names)
-    
-    # Use a sample for SHAP (it's slow on full dataset)
-    X_sample = X_df.sample(1000, random_state=42)
+    # Held-out test rows saved by model training (never seen by the models)
+    X_test, y_test = load_holdout('test', engineer=engineer)
+    evaluate_ensemble(models, weights, X_test, y_test, engineer)
     
-    # Generate SHAP for best model (highest weight)
-    best_model_name = max(weights, key=weights.get)
-    best_model = models[best_model_name]
+    # Ensemble SHAP values (config.SHAP_SPLIT rows, computed in parallel, reused while
+    # the dataset and trained artifacts are unchanged)
+    compute_ensemble_shap()
+    shap_values, X, meta = load_ensemble_shap()
+    X_df = pd.DataFrame(X, columns=meta['feature_names'])
     
-    explainer, shap_values = generate_shap_values(best_model, X_sample)
-    plot_shap_summary(shap_values, X_sample)
-    plot_shap_waterfall(explainer, shap_values, X_sample)
+    plot_shap_summary(np.asarray(shap_values), X_df, title="Ensemble SHAP Summary")
+    plot_shap_waterfall(meta['base_value'], shap_values, X_df)
@@ -5,20 +5,25 @@ Trains XGBoost, LightGBM, Random Forest, and CatBoost models
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from xgboost import XGBRegressor
 from lightgbm import LGBMRegressor
 from catboost import CatBoostRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score, mean_absolute_percentage_error
 import joblib
+import json
 import sys
+import time
+import warnings
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 import config
 from ml.feature_engineering import AdvancedFeatureEngineer
+from ml.feature_cache import dataframe_fingerprint, file_fingerprint, load_features
+from ml.split_manifest import SPLITS, load_split_indices, save_split, split_indices
+from ml.thread_budget import apply_process_limits, core_budget
 
 
 def load_data():
@@ -26,122 +31,267 @@ def load_data():
     return pd.read_csv(config.FILE_ANALYTICAL_DATASET)
 
 
-def train_model_suite(X_train, y_train, X_val, y_val):
+def model_inputs(engineer, name, *matrices):
+    """Adapt feature matrices to the input format of one ensemble member"""
+    if engineer is None:
+        return matrices
+    return tuple(engineer.model_input(X, name) for X in matrices)
+
+
+MODEL_NAMES = ['Random Forest', 'XGBoost', 'LightGBM', 'CatBoost']
+
+
+def build_model(name, n_jobs=None, categorical_indices=None, params=None):
+    """
+    Create an unfitted ensemble member with the suite's hyperparameters
+    
+    Args:
+        name: One of MODEL_NAMES
+        n_jobs: Thread budget for the model (default: the process core budget, see ml.thread_budget)
+        categorical_indices: Columns holding native category codes (CatBoost)
+        params: Hyperparameters overriding the defaults (e.g. tuned by ml.optimization)
+    """
+    model = _default_model(name, core_budget(n_jobs), categorical_indices)
+    if params:
+        model.set_params(**params)
+    return model
+
+
+def load_tuned_params(path=None):
+    """
+    Tuned hyperparameters per member from best_hyperparameters.pkl
+    
+    Returns:
+        Dict of name -> parameter overrides (empty when nothing has been tuned yet)
+    """
+    path = Path(path) if path is not None else config.MODELS_DIR / 'best_hyperparameters.pkl'
+    if not path.exists():
+        print(f"[WARNING] No tuned hyperparameters at {path}; using the defaults")
+        return {}
+    return joblib.load(path)
+
+
+def _default_model(name, n_jobs, categorical_indices):
+    """Unfitted member with the suite's default hyperparameters"""
+    if name == 'Random Forest':
+        return RandomForestRegressor(
+            n_estimators=100,  # Reduced from 200; upper bound when grown on OOB error
+            max_depth=15,      # Reduced from 30
+            min_samples_split=5,
+            min_samples_leaf=2,
+            oob_score=config.RF_OOB_EARLY_STOPPING,
+            random_state=42,
+            n_jobs=n_jobs,
+            verbose=0
+        )
+    if name == 'XGBoost':
+        return XGBRegressor(
+            n_estimators=150,  # Reduced from 200
+            learning_rate=0.05,
+            max_depth=6,       # Reduced from 10
+            subsample=0.8,
+            colsample_bytree=0.8,
+            random_state=42,
+            n_jobs=n_jobs,
+            verbosity=0,
+            early_stopping_rounds=20
+        )
+    if name == 'LightGBM':
+        return LGBMRegressor(
+            n_estimators=150,  # Reduced from 200
+            learning_rate=0.05,
+            max_depth=6,       # Reduced from 10
+            subsample=0.8,
+            colsample_bytree=0.8,
+            random_state=42,
+            n_jobs=n_jobs,
+            verbose=-1
+        )
+    if name == 'CatBoost':
+        return CatBoostRegressor(
+            iterations=150,    # Reduced from 200
+            learning_rate=0.05,
+            depth=6,           # Reduced from 10
+            random_state=42,
+            verbose=0,
+            allow_writing_files=False,
+            thread_count=n_jobs,
+            cat_features=categorical_indices or None
+        )
+    raise ValueError(f"Unknown model: {name}")
+
+
+def fit_options(name):
+    """Config-driven fit settings that change what a member learns (part of the model cache key)"""
+    if name == 'Random Forest' and config.RF_OOB_EARLY_STOPPING:
+        return {'oob_tree_step': config.RF_OOB_TREE_STEP, 'oob_tolerance': config.RF_OOB_TOLERANCE}
+    return {}
+
+
+def grow_random_forest(model, X_train, y_train, step=None, tolerance=None):
+    """
+    Grow a Random Forest in steps until the out-of-bag error stops improving
+    
+    Trees are added step at a time with warm_start, up to model.n_estimators.
+    Growth stops once the relative OOB MAE improvement of a step falls below
+    tolerance. The improvement is measured on the rows out-of-bag at both
+    steps, so rows that only gain coverage in the later step do not mask or fake
+    a plateau. The (n_trees, oob_mae) learning curve, over all covered rows,
+    is stored on the model as oob_learning_curve_.
+    """
+    step = step or config.RF_OOB_TREE_STEP
+    tolerance = config.RF_OOB_TOLERANCE if tolerance is None else tolerance
+    max_trees = model.n_estimators
+    y_train = np.asarray(y_train)
+    curve = []
+    previous = None
+    model.set_params(warm_start=True, oob_score=True)
+    for n_trees in range(min(step, max_trees), max_trees + step, step):
+        model.set_params(n_estimators=min(n_trees, max_trees))
+        with warnings.catch_warnings():
+            # The first steps leave a few rows without any out-of-bag tree
+            warnings.simplefilter('ignore', UserWarning)
+            model.fit(X_train, y_train)
+        # Rows never out-of-bag have a prediction of exactly 0
+        oob_pred = model.oob_prediction_.copy()
+        covered = oob_pred != 0
+        curve.append((model.n_estimators, mean_absolute_error(y_train[covered], oob_pred[covered])))
+        if previous is not None:
+            common = covered & (previous != 0)
+            previous_mae = mean_absolute_error(y_train[common], previous[common])
+            if (previous_mae - mean_absolute_error(y_train[common], oob_pred[common])) / previous_mae < tolerance:
+                break
+        previous = oob_pred
+        if model.n_estimators >= max_trees:
+            break
+    model.set_params(warm_start=False)
+    model.oob_learning_curve_ = curve
+    return model
+
+
+def fit_model(name, model, X_train, y_train, X_val, y_val, categorical_indices=None):
+    """Fit one member on inputs already adapted by model_inputs"""
+    if name == 'Random Forest':
+        if model.oob_score:
+            grow_random_forest(model, X_train, y_train)
+        else:
+            model.fit(X_train, y_train)
+    elif name == 'XGBoost':
+        model.fit(X_train, y_train,
+                  eval_set=[(X_val, y_val)],
+                  verbose=False)
+    elif name == 'LightGBM':
+        model.fit(X_train, y_train,
+                  eval_set=[(X_val, y_val)],
+                  categorical_feature=categorical_indices or 'auto',
+                  callbacks=[])
+    elif name == 'CatBoost':
+        model.fit(X_train, y_train, eval_set=(X_val, y_val), early_stopping_rounds=20)
+    else:
+        raise ValueError(f"Unknown model: {name}")
+    return model
+
+
+def regression_scores(y_true, y_pred):
+    """Validation metrics reported for every member"""
+    return {
+        'MAE': mean_absolute_error(y_true, y_pred),
+        'RMSE': np.sqrt(mean_squared_error(y_true, y_pred)),
+        'R2': r2_score(y_true, y_pred),
+        'MAPE': mean_absolute_percentage_error(y_true, y_pred) * 100
+    }
+
+
+def train_member(name, X_train, y_train, X_val, y_val, engineer=None, n_jobs=None, params=None):
+    """
+    Build, fit and score one ensemble member
+    
+    Args:
+        params: Hyperparameter overrides (see build_model)
+    
+    Returns:
+        model: Fitted model
+        scores: Validation scores
+    """
+    categorical_indices = engineer.categorical_indices if engineer is not None else []
+    model = build_model(name, n_jobs, categorical_indices, params)
+    X_tr, X_va = model_inputs(engineer, name, X_train, X_val)
+    fit_model(name, model, X_tr, y_train, X_va, y_val, categorical_indices)
+    return model, regression_scores(y_val, model.predict(X_va))
+
+
+def train_model_suite(X_train, y_train, X_val, y_val, engineer=None, parallel=False, n_cores=None, names=None,
+                      profile=False, tuned_params=None):
     """
     Train 4 different models and compare performance
     
+    Args:
+        engineer: Fitted feature engineer; with 'native' encoding LightGBM and CatBoost
+            get integer category codes and RF/XGBoost one-hot columns (see model_input)
+        parallel: Train the members concurrently in separate processes
+            (see ml.parallel_training); ignored on a single core
+        n_cores: Cores to partition between members, or to give each member in turn when
+            training sequentially (default: the core budget)
+        names: Members to train (default: MODEL_NAMES)
+        profile: Also measure each member's resources (see ml.training_profiler)
+        tuned_params: Hyperparameter overrides per member (see load_tuned_params)
+    
     Returns:
         models: Dict of trained models
         scores: Dict of validation scores
+        profiles: Dict of resource profiles (only when profile=True)
     """
+    names = list(names) if names is not None else MODEL_NAMES
+    n_cores = core_budget(n_cores)
+    tuned_params = tuned_params or {}
+    if parallel and n_cores > 1 and len(names) > 1:
+        from ml.parallel_training import train_suite_parallel
+        models, scores, report = train_suite_parallel(X_train, y_train, X_val, y_val, engineer, n_cores, names,
+                                                      profile=profile, tuned_params=tuned_params)
+        return (models, scores, report['profiles']) if profile else (models, scores)
+    
     models = {}
     scores = {}
+    profiles = {}
     
     print("\n" + "="*60)
     print("TRAINING MODEL SUITE")
     print("="*60)
     
-    # 1. Random Forest
-    print("\n[1/4] Training Random Forest...")
-    rf = RandomForestRegressor(
-        n_estimators=100,  # Reduced from 200
-        max_depth=15,      # Reduced from 30
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=42,
-        n_jobs=-1,
-        verbose=0
-    )
-    rf.fit(X_train, y_train)
-    rf_pred = rf.predict(X_val)
-    scores['Random Forest'] = {
-        'MAE': mean_absolute_error(y_val, rf_pred),
-        'RMSE': np.sqrt(mean_squared_error(y_val, rf_pred)),
-        'R2': r2_score(y_val, rf_pred),
-        'MAPE': mean_absolute_percentage_error(y_val, rf_pred) * 100
-    }
-    models['Random Forest'] = rf
-    print(f"  R²: {scores['Random Forest']['R2']:.4f}, MAPE: {scores['Random Forest']['MAPE']:.2f}%")
-    
-    # 2. XGBoost
-    print("\n[2/4] Training XGBoost...")
-    xgb = XGBRegressor(
-        n_estimators=150,  # Reduced from 200
-        learning_rate=0.05,
-        max_depth=6,       # Reduced from 10
-        subsample=0.8,
-        colsample_bytree=0.8,
-        random_state=42,
-        n_jobs=-1,
-        verbosity=0,
-        early_stopping_rounds=20
-    )
-    xgb.fit(X_train, y_train, 
-            eval_set=[(X_val, y_val)],
-            verbose=False)
-    xgb_pred = xgb.predict(X_val)
-    scores['XGBoost'] = {
-        'MAE': mean_absolute_error(y_val, xgb_pred),
-        'RMSE': np.sqrt(mean_squared_error(y_val, xgb_pred)),
-        'R2': r2_score(y_val, xgb_pred),
-        'MAPE': mean_absolute_percentage_error(y_val, xgb_pred) * 100
-    }
-    models['XGBoost'] = xgb
-    print(f"  R²: {scores['XGBoost']['R2']:.4f}, MAPE: {scores['XGBoost']['MAPE']:.2f}%")
-    
-    # 3. LightGBM
-    print("\n[3/4] Training LightGBM...")
-    lgbm = LGBMRegressor(
-        n_estimators=150,  # Reduced from 200
-        learning_rate=0.05,
-        max_depth=6,       # Reduced from 10
-        subsample=0.8,
-        colsample_bytree=0.8,
-        random_state=42,
-        n_jobs=-1,
-        verbose=-1
-    )
-    lgbm.fit(X_train, y_train,
-             eval_set=[(X_val, y_val)],
-             callbacks=[])
-    lgbm_pred = lgbm.predict(X_val)
-    scores['LightGBM'] = {
-        'MAE': mean_absolute_error(y_val, lgbm_pred),
-        'RMSE': np.sqrt(mean_squared_error(y_val, lgbm_pred)),
-        'R2': r2_score(y_val, lgbm_pred),
-        'MAPE': mean_absolute_percentage_error(y_val, lgbm_pred) * 100
-    }
-    models['LightGBM'] = lgbm
-    print(f"  R²: {scores['LightGBM']['R2']:.4f}, MAPE: {scores['LightGBM']['MAPE']:.2f}%")
-    
-    # 4. CatBoost
-    print("\n[4/4] Training CatBoost...")
-    cat = CatBoostRegressor(
-        iterations=150,    # Reduced from 200
-        learning_rate=0.05,
-        depth=6,           # Reduced from 10
-        random_state=42,
-        verbose=0,
-        allow_writing_files=False
-    )
-    cat.fit(X_train, y_train, eval_set=(X_val, y_val), early_stopping_rounds=20)
-    cat_pred = cat.predict(X_val)
-    scores['CatBoost'] = {
-        'MAE': mean_absolute_error(y_val, cat_pred),
-        'RMSE': np.sqrt(mean_squared_error(y_val, cat_pred)),
-        'R2': r2_score(y_val, cat_pred),
-        'MAPE': mean_absolute_percentage_error(y_val, cat_pred) * 100
-    }
-    models['CatBoost'] = cat
-    print(f"  R²: {scores['CatBoost']['R2']:.4f}, MAPE: {scores['CatBoost']['MAPE']:.2f}%")
+    for i, name in enumerate(names, 1):
+        print(f"\n[{i}/{len(names)}] Training {name}...")
+        if profile:
+            from ml.training_profiler import profile_member, format_profile
+            models[name], scores[name], profiles[name] = profile_member(
+                name, X_train, y_train, X_val, y_val, engineer, n_jobs=n_cores, params=tuned_params.get(name)
+            )
+        else:
+            models[name], scores[name] = train_member(name, X_train, y_train, X_val, y_val, engineer,
+                                                      n_jobs=n_cores, params=tuned_params.get(name))
+        print(f"  R²: {scores[name]['R2']:.4f}, MAPE: {scores[name]['MAPE']:.2f}%")
+        if profile:
+            print(f"  {format_profile(profiles[name])}")
     
-    return models, scores
+    return (models, scores, profiles) if profile else (models, scores)
+
+
+def inverse_mape_weights(predictions, y_true):
+    """Ensemble weights proportional to each model's inverse MAPE (lower error = higher weight)"""
+    mapes = {name: mean_absolute_percentage_error(y_true, pred) 
+             for name, pred in predictions.items()}
+    inv_mape = {name: 1/mape for name, mape in mapes.items()}
+    total = sum(inv_mape.values())
+    return {name: w/total for name, w in inv_mape.items()}
 
 
-def create_ensemble(models, X_val, y_val):
+def create_ensemble(models, X_val, y_val, engineer=None, predictions=None):
     """
     Create weighted ensemble based on validation performance
     
+    Args:
+        predictions: Validation predictions per model (e.g. from the model cache);
+            models missing here are predicted on X_val
+    
     Returns:
         weights: Optimal model weights
         ensemble_pred: Ensemble predictions
@@ -151,18 +301,14 @@ def create_ensemble(models, X_val, y_val):
     print("="*60)
     
     # Get individual predictions
-    predictions = {}
+    predictions = dict(predictions or {})
     for name, model in models.items():
-        predictions[name] = model.predict(X_val)
+        if name not in predictions:
+            X_va, = model_inputs(engineer, name, X_val)
+            predictions[name] = model.predict(X_va)
     
     # Calculate optimal weights (inverse of MAPE)
-    mapes = {name: mean_absolute_percentage_error(y_val, pred) 
-             for name, pred in predictions.items()}
-    
-    # Inverse MAPE as weights (lower error = higher weight)
-    inv_mape = {name: 1/mape for name, mape in mapes.items()}
-    total = sum(inv_mape.values())
-    weights = {name: w/total for name, w in inv_mape.items()}
+    weights = inverse_mape_weights(predictions, y_val)
     
     print("\nOptimal Weights:")
     for name, weight in weights.items():
@@ -182,45 +328,286 @@ def create_ensemble(models, X_val, y_val):
     return weights, ensemble_pred
 
 
-def main():
-    """Main training pipeline"""
-    # Load data
+def main(use_cache=True, cv_weights=None, prune=None, tuned=None):
+    """
+    Main training pipeline
+    
+    Args:
+        use_cache: Reuse cached feature matrices and unchanged models
+        cv_weights: Fit ensemble weights on K-fold out-of-fold predictions over the
+            training split instead of the single validation split
+            (default config.CV_ENSEMBLE_WEIGHTS)
+        prune: Drop low-importance features and retrain on the smallest subset within
+            config.FEATURE_PRUNING_TOLERANCE (default config.FEATURE_PRUNING)
+        tuned: Build the members with the hyperparameters selected by ml.optimization
+            (best_hyperparameters.pkl) instead of the defaults
+            (default config.USE_TUNED_HYPERPARAMETERS)
+    """
+    cv_weights = config.CV_ENSEMBLE_WEIGHTS if cv_weights is None else cv_weights
+    prune = config.FEATURE_PRUNING if prune is None else prune
+    tuned = config.USE_TUNED_HYPERPARAMETERS if tuned is None else tuned
+    tuned_params = load_tuned_params() if tuned else {}
+    apply_process_limits(core_budget(config.TRAINING_CORES))
+    # Split rows first (indices are persisted with the held-out matrices)
+    print("\n[INFO] Splitting data...")
     df = load_data()
+    split = split_indices(len(df))
     
-    # Feature engineering
+    # Engineer features, fitting encoder and target statistics on the training rows only
+    # (cached per dataset + engineer config + training rows)
     print("\n[INFO] Engineering features...")
-    engineer = AdvancedFeatureEngineer()
-    X, y, feature_names = engineer.fit_transform(df)
-    
-    # Split data
-    print("\n[INFO] Splitting data...")
-    X_train, X_temp, y_train, y_temp = train_test_split(
-        X, y, test_size=0.3, random_state=42
-    )
-    X_val, X_test, y_val, y_test = train_test_split(
-        X_temp, y_temp, test_size=0.5, random_state=42
-    )
+    engineer = AdvancedFeatureEngineer(encoding=config.CATEGORICAL_ENCODING)
+    X, y, feature_names, engineer = load_features(df=df, engineer=engineer, use_cache=use_cache,
+                                                  fit_index=split['train'])
+    X_train, X_val, X_test = (X[split[name]] for name in SPLITS)
+    y_train, y_val, y_test = (y[split[name]] for name in SPLITS)
     
     print(f"  Training: {len(X_train):,} samples")
     print(f"  Validation: {len(X_val):,} samples")
     print(f"  Test: {len(X_test):,} samples")
     
-    # Train models
-    models, scores = train_model_suite(X_train, y_train, X_val, y_val)
+    # Train models (members with unchanged data, schema and hyperparameters come from the model cache)
+    models, profiles, predictions = _train_suite(X_train, y_train, X_val, y_val, engineer, use_cache,
+                                                 tuned_params)
     
     # Create ensemble
-    weights, ensemble_pred = create_ensemble(models, X_val, y_val)
+    weights, ensemble_pred = create_ensemble(models, X_val, y_val, engineer, predictions)
+    
+    if prune:
+        from ml.feature_selection import prune_features, save_pruning_report, subset_columns
+        selected, report = prune_features(X_train, y_train, X_val, y_val, engineer, models, weights,
+                                          n_cores=config.TRAINING_CORES, tuned_params=tuned_params)
+        save_pruning_report(report)
+        if len(selected) < len(engineer.numeric_features):
+            columns = subset_columns(engineer, selected)
+            X_train, X_val, X_test = X_train[:, columns], X_val[:, columns], X_test[:, columns]
+            engineer.select_features(selected)
+            print(f"\n[INFO] Retraining on {len(engineer.feature_names)} features...")
+            models, profiles, predictions = _train_suite(X_train, y_train, X_val, y_val, engineer, use_cache,
+                                                         tuned_params)
+            weights, ensemble_pred = create_ensemble(models, X_val, y_val, engineer, predictions)
+    
+    if cv_weights:
+        from ml.cross_validation import cross_validate_suite, save_cv_report
+        cv_results = cross_validate_suite(X_train, y_train, engineer, n_cores=config.TRAINING_CORES,
+                                          tuned_params=tuned_params)
+        save_cv_report(cv_results)
+        weights = cv_results['weights']
+        print("\nOut-of-fold Weights:")
+        for name, weight in weights.items():
+            print(f"  {name}: {weight:.3f}")
     
-    # Save models
+    save_artifacts(models, weights, engineer)
+    save_split(split, {'val': (X_val, y_val), 'test': (X_test, y_test)}, engineer.feature_names,
+               data_fingerprint=file_fingerprint(config.FILE_ANALYTICAL_DATASET))
+    print(f"[INFO] Split manifest and held-out matrices saved to {config.SPLIT_DIR}")
+    if profiles:
+        from ml.training_profiler import write_profile_report
+        print(f"[INFO] Training profile saved to {write_profile_report(profiles)}")
+
+
+def _train_suite(X_train, y_train, X_val, y_val, engineer, use_cache, tuned_params=None):
+    """Train the suite for main(), through the model cache when enabled"""
+    if use_cache:
+        from ml.model_cache import train_model_suite_cached
+        models, _, predictions, profiles = train_model_suite_cached(
+            X_train, y_train, X_val, y_val, engineer,
+            parallel=config.PARALLEL_TRAINING, n_cores=config.TRAINING_CORES, profile=config.PROFILE_TRAINING,
+            tuned_params=tuned_params
+        )
+        return models, profiles, predictions
+    results = train_model_suite(X_train, y_train, X_val, y_val, engineer,
+                                parallel=config.PARALLEL_TRAINING, n_cores=config.TRAINING_CORES,
+                                profile=config.PROFILE_TRAINING, tuned_params=tuned_params)
+    return results[0], (results[2] if config.PROFILE_TRAINING else {}), None
+
+
+def save_artifacts(models, weights, engineer):
+    """Save the model suite, ensemble weights, feature engineer and feature schema"""
     print("\n[INFO] Saving models...")
     config.MODELS_DIR.mkdir(exist_ok=True)
     
     joblib.dump(models, config.MODELS_DIR / 'model_suite.pkl')
     joblib.dump(weights, config.MODELS_DIR / 'ensemble_weights.pkl')
     joblib.dump(engineer, config.MODELS_DIR / 'feature_engineer.pkl')
+    with open(config.MODELS_DIR / 'feature_schema.json', 'w') as f:
+        json.dump(engineer.get_feature_schema(), f, indent=2)
     
     print(f"[SUCCESS] Models saved to {config.MODELS_DIR}")
 
 
+def continue_member(name, model, X_train, y_train, X_val, y_val, engineer=None,
+                    extra_rounds=None, extra_trees=None):
+    """
+    Warm-start one fitted member on new data instead of training from scratch
+    
+    Boosters continue from their existing trees with extra_rounds more rounds
+    (still early-stopped on X_val); the Random Forest keeps its trees and grows
+    extra_trees new ones on the new data via warm_start.
+    
+    Returns:
+        model: Updated model
+        scores: Validation scores
+    """
+    extra_rounds = extra_rounds or config.INCREMENTAL_EXTRA_ROUNDS
+    extra_trees = extra_trees or config.INCREMENTAL_EXTRA_TREES
+    categorical_indices = engineer.categorical_indices if engineer is not None else []
+    X_tr, X_va = model_inputs(engineer, name, X_train, X_val)
+    
+    if name == 'Random Forest':
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + extra_trees)
+        model.fit(X_tr, y_train)
+        model.set_params(warm_start=False)
+    elif name == 'XGBoost':
+        booster = model.get_booster()
+        model = XGBRegressor(**{**model.get_params(), 'n_estimators': extra_rounds})
+        model.fit(X_tr, y_train, eval_set=[(X_va, y_val)], verbose=False, xgb_model=booster)
+    elif name == 'LightGBM':
+        booster = model.booster_
+        model = LGBMRegressor(**{**model.get_params(), 'n_estimators': extra_rounds})
+        model.fit(X_tr, y_train, eval_set=[(X_va, y_val)],
+                  categorical_feature=categorical_indices or 'auto', init_model=booster)
+    elif name == 'CatBoost':
+        previous = model
+        model = CatBoostRegressor(**{**previous.get_params(), 'iterations': extra_rounds})
+        model.fit(X_tr, y_train, eval_set=(X_va, y_val), early_stopping_rounds=20, init_model=previous)
+    else:
+        raise ValueError(f"Unknown model: {name}")
+    
+    return model, regression_scores(y_val, model.predict(X_va))
+
+
+def input_layout(engineer):
+    """Output columns and per-member input widths that fitted members depend on"""
+    return {'feature_names': list(engineer.feature_names),
+            'widths': {name: engineer.model_input_width(name) for name in MODEL_NAMES}}
+
+
+def check_input_layout(engineer, layout):
+    """
+    Refuse to continue members whose inputs changed shape since layout was recorded
+    
+    With 'native' encoding a new category keeps feature_names but widens the
+    one-hot expansion fed to Random Forest and XGBoost.
+    
+    Raises:
+        ValueError: If the output columns or any member's input width changed
+    """
+    current = input_layout(engineer)
+    if current['feature_names'] != layout['feature_names']:
+        raise ValueError("New listings change the feature layout (new categories with one-hot "
+                         "encoding); run a full retrain instead")
+    changed = [name for name in MODEL_NAMES if current['widths'][name] != layout['widths'][name]]
+    if changed:
+        raise ValueError(f"New listings change the input width of {', '.join(changed)} (new categories "
+                         f"widen the one-hot expansion); run a full retrain instead")
+
+
+def ensemble_scores(models, weights, X, y, engineer=None):
+    """Scores of the weighted ensemble prediction"""
+    pred = sum(weights[name] * model.predict(model_inputs(engineer, name, X)[0])
+               for name, model in models.items())
+    return regression_scores(y, pred)
+
+
+def main_incremental(new_data_path, replay_fraction=None, compare_full=True):
+    """
+    Incremental training pipeline for newly ingested listings
+    
+    The new listings get their own 70/15/15 split; existing listings keep the
+    persisted one (see ml.split_manifest). The saved suite is continued on the
+    new training rows plus a replay sample of the existing training rows, the
+    ensemble weights are refit on the old and new validation rows, and test
+    rows never enter the update. The updated artifacts and a split manifest
+    covering the appended rows are saved. With compare_full, a full retrain on
+    all training rows is run on the same validation rows to report accuracy
+    drift and the time saved; the report is written to
+    models/incremental_report.json.
+    
+    Args:
+        new_data_path: CSV of new listings in the analytical dataset format
+        replay_fraction: Share of existing training listings replayed alongside the new ones
+        compare_full: Also run a full retrain to measure drift
+    """
+    replay_fraction = replay_fraction if replay_fraction is not None else config.INCREMENTAL_REPLAY_FRACTION
+    apply_process_limits(core_budget(config.TRAINING_CORES))
+    models = joblib.load(config.MODELS_DIR / 'model_suite.pkl')
+    engineer = joblib.load(config.MODELS_DIR / 'feature_engineer.pkl')
+    
+    print("\n[INFO] Loading new listings...")
+    old_df = load_data()
+    new_df = pd.read_csv(new_data_path)
+    all_df = pd.concat([old_df, new_df], ignore_index=True)
+    print(f"  Existing: {len(old_df):,}, new: {len(new_df):,}")
+    
+    # Existing rows keep their persisted split, appended rows are split on their own
+    old_split = load_split_indices()
+    if sum(len(old_split[name]) for name in SPLITS) != len(old_df):
+        raise ValueError("Split manifest does not match the analytical dataset; run a full retrain instead")
+    new_split = split_indices(len(new_df))
+    split = {name: np.concatenate([old_split[name], new_split[name] + len(old_df)]) for name in SPLITS}
+    
+    # Fold the new training listings into the feature statistics; the trees need the same layout
+    layout = input_layout(engineer)
+    engineer.partial_fit(new_df.iloc[new_split['train']])
+    check_input_layout(engineer, layout)
+    X_all = engineer.transform(all_df)
+    y_all = all_df['annual_rent'].values
+    
+    # New training rows plus a replay sample of old training rows; validated on old + new validation rows
+    rng = np.random.default_rng(config.RANDOM_SEED)
+    replay_idx = rng.choice(old_split['train'], size=int(len(old_split['train']) * replay_fraction),
+                            replace=False)
+    train_idx = np.concatenate([new_split['train'] + len(old_df), replay_idx])
+    X_val, y_val = X_all[split['val']], y_all[split['val']]
+    
+    print("\n" + "="*60)
+    print("INCREMENTAL UPDATE")
+    print("="*60)
+    start = time.perf_counter()
+    X_train, y_train = X_all[train_idx], y_all[train_idx]
+    scores = {}
+    for name in MODEL_NAMES:
+        models[name], scores[name] = continue_member(
+            name, models[name], X_train, y_train, X_val, y_val, engineer
+        )
+        print(f"  {name} - R²: {scores[name]['R2']:.4f}, MAPE: {scores[name]['MAPE']:.2f}%")
+    weights, _ = create_ensemble(models, X_val, y_val, engineer)
+    incremental_seconds = time.perf_counter() - start
+    report = {
+        'new_rows': len(new_df),
+        'replay_rows': len(replay_idx),
+        'incremental_seconds': incremental_seconds,
+        'incremental': ensemble_scores(models, weights, X_val, y_val, engineer),
+    }
+    
+    if compare_full:
+        print("\n[INFO] Full retrain for drift comparison...")
+        start = time.perf_counter()
+        full_models, _ = train_model_suite(X_all[split['train']], y_all[split['train']], X_val, y_val,
+                                           engineer, parallel=config.PARALLEL_TRAINING,
+                                           n_cores=config.TRAINING_CORES)
+        full_weights, _ = create_ensemble(full_models, X_val, y_val, engineer)
+        report['full_seconds'] = time.perf_counter() - start
+        report['full'] = ensemble_scores(full_models, full_weights, X_val, y_val, engineer)
+        report['drift'] = {metric: report['incremental'][metric] - report['full'][metric]
+                           for metric in report['full']}
+        report['time_fraction'] = incremental_seconds / report['full_seconds']
+        print(f"\nIncremental: {incremental_seconds:.1f}s, MAPE {report['incremental']['MAPE']:.2f}% | "
+              f"Full: {report['full_seconds']:.1f}s, MAPE {report['full']['MAPE']:.2f}%")
+    
+    save_artifacts(models, weights, engineer)
+    save_split(split, {name: (X_all[split[name]], y_all[split[name]]) for name in ('val', 'test')},
+               engineer.feature_names, data_fingerprint=dataframe_fingerprint(all_df),
+               sources=[config.FILE_ANALYTICAL_DATASET, new_data_path])
+    print(f"[INFO] Split manifest updated with the new listings in {config.SPLIT_DIR}")
+    with open(config.MODELS_DIR / 'incremental_report.json', 'w') as f:
+        json.dump(report, f, indent=2, default=float)
+    return report
+
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 2 and sys.argv[1] == '--incremental':
+        main_incremental(sys.argv[2])
+    else:
+        main(tuned=True if '--tuned' in sys.argv[1:] else None)
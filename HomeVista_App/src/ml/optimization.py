@@ -4,158 +4,658 @@ Optimizes XGBoost, LightGBM, Random Forest, and CatBoost models
 """
 
 import optuna
+from optuna.study import MaxTrialsCallback
+from optuna.storages import JournalStorage
+from optuna.trial import TrialState
+try:
+    from optuna.storages.journal import JournalFileBackend
+except ImportError:  # optuna < 4.0
+    from optuna.storages import JournalFileStorage as JournalFileBackend
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
 from sklearn.ensemble import RandomForestRegressor
-from xgboost import XGBRegressor
-from lightgbm import LGBMRegressor
+import xgboost as xgb
+import lightgbm as lgb
 from catboost import CatBoostRegressor
 import joblib
+import hashlib
+import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
+from threadpoolctl import threadpool_limits
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 import config
+from ml.feature_cache import load_features
 from ml.feature_engineering import AdvancedFeatureEngineer
+from ml.binned_datasets import XGB_MAX_BIN, lightgbm_datasets, xgboost_dmatrices
+from ml.model_cache import array_fingerprint
+from ml.split_manifest import split_indices
+from ml.thread_budget import apply_process_limits, core_budget
+from ml.model_training import load_data, model_inputs, train_member
+from ml.training_profiler import inference_latency, serialized_size
 
-def load_and_prep_data():
-    """Load and prepare data for optimization"""
-    df = pd.read_csv(config.FILE_ANALYTICAL_DATASET)
-    
-    engineer = AdvancedFeatureEngineer()
-    X, y, _ = engineer.fit_transform(df)
-    
-    # Split data
-    X_train, X_temp, y_train, y_temp = train_test_split(
-        X, y, test_size=0.3, random_state=42
-    )
-    X_val, X_test, y_val, y_test = train_test_split(
-        X_temp, y_temp, test_size=0.5, random_state=42
-    )
-    
-    return X_train, y_train, X_val, y_val
-
-def objective_xgb(trial, X_train, y_train, X_val, y_val):
-    """XGBoost objective function"""
-    params = {
-        'n_estimators': trial.suggest_int('n_estimators', 100, 1000),
-        'max_depth': trial.suggest_int('max_depth', 3, 15),
-        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
-        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
-        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
-        'min_child_weight': trial.suggest_int('min_child_weight', 1, 10),
-        'random_state': 42,
-        'n_jobs': -1,
-        'verbosity': 0,
-        'early_stopping_rounds': 20
-    }
+def load_and_prep_data(use_cache=True):
+    """
+    Load and prepare data for optimization
     
-    model = XGBRegressor(**params)
-    model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    Features are engineered exactly as in model training (config.CATEGORICAL_ENCODING,
+    fitted on the training rows of the same split); the test rows are never seen while tuning.
     
-    preds = model.predict(X_val)
+    Returns:
+        data: (X_train, y_train, X_val, y_val) in the engineer's output layout
+        engineer: Fitted feature engineer (see model_inputs)
+    """
+    df = load_data()
+    split = split_indices(len(df))
+    engineer = AdvancedFeatureEngineer(encoding=config.CATEGORICAL_ENCODING)
+    X, y, _, engineer = load_features(df=df, engineer=engineer, use_cache=use_cache, fit_index=split['train'])
+    
+    return (X[split['train']], y[split['train']], X[split['val']], y[split['val']]), engineer
+
+
+def categorical_indices(engineer):
+    """Native category code columns of the engineer's output (none without 'native' encoding)"""
+    return engineer.categorical_indices if engineer is not None else []
+
+# Trees added between Random Forest progress reports
+RF_REPORT_TREES = 50
+
+
+def make_pruner(kind=None):
+    """Trial pruner from config.OPTUNA_PRUNER ('median', 'hyperband' or None)"""
+    kind = config.OPTUNA_PRUNER if kind is None else kind
+    if kind == 'median':
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=config.OPTUNA_PRUNING_WARMUP,
+                                           interval_steps=config.OPTUNA_REPORT_INTERVAL)
+    if kind == 'hyperband':
+        return optuna.pruners.HyperbandPruner(min_resource=config.OPTUNA_PRUNING_WARMUP, reduction_factor=3)
+    if not kind:
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unknown pruner: {kind!r}")
+
+
+def report_progress(trial, step, mae):
+    """Report an intermediate validation MAE and stop the trial if the pruner says so"""
+    trial.report(mae, step)
+    if trial.should_prune():
+        raise optuna.TrialPruned(f"Pruned at step {step} (validation MAE {mae:.2f})")
+
+
+class XGBoostPruningCallback(xgb.callback.TrainingCallback):
+    """Reports validation MAE every config.OPTUNA_REPORT_INTERVAL boosting rounds"""
+    
+    def __init__(self, trial, data_name='validation', metric='mae'):
+        super().__init__()
+        self.trial = trial
+        self.data_name = data_name
+        self.metric = metric
+    
+    def after_iteration(self, model, epoch, evals_log):
+        step = epoch + 1
+        if step % config.OPTUNA_REPORT_INTERVAL == 0:
+            report_progress(self.trial, step, evals_log[self.data_name][self.metric][-1])
+        return False
+
+
+def lightgbm_pruning_callback(trial, metric='l1'):
+    """LightGBM callback reporting validation MAE every config.OPTUNA_REPORT_INTERVAL rounds"""
+    def _callback(env):
+        step = env.iteration + 1
+        if step % config.OPTUNA_REPORT_INTERVAL == 0:
+            mae = next(value for _, name, value, _ in env.evaluation_result_list if name == metric)
+            report_progress(trial, step, mae)
+    _callback.order = 30
+    return _callback
+
+
+class CatBoostPruningCallback:
+    """
+    Reports validation MAE every config.OPTUNA_REPORT_INTERVAL iterations
+    
+    CatBoost swallows exceptions raised in callbacks, so a pruned trial stops
+    training by returning False and is raised afterwards by check_pruned().
+    """
+    
+    def __init__(self, trial, metric='MAE'):
+        self.trial = trial
+        self.metric = metric
+        self.pruned_message = None
+    
+    def after_iteration(self, info):
+        step = info.iteration
+        if step % config.OPTUNA_REPORT_INTERVAL == 0:
+            mae = info.metrics['validation'][self.metric][-1]
+            try:
+                report_progress(self.trial, step, mae)
+            except optuna.TrialPruned as pruned:
+                self.pruned_message = str(pruned)
+                return False
+        return True
+    
+    def check_pruned(self):
+        if self.pruned_message is not None:
+            raise optuna.TrialPruned(self.pruned_message)
+
+
+# Tuned parameters per model: name -> (type, low, high)
+SEARCH_SPACES = {
+    'XGBoost': {
+        'n_estimators': (int, 100, 1000),
+        'max_depth': (int, 3, 15),
+        'learning_rate': (float, 0.01, 0.3),
+        'subsample': (float, 0.6, 1.0),
+        'colsample_bytree': (float, 0.6, 1.0),
+        'min_child_weight': (int, 1, 10),
+    },
+    'LightGBM': {
+        'n_estimators': (int, 100, 1000),
+        'max_depth': (int, 3, 15),
+        'learning_rate': (float, 0.01, 0.3),
+        'subsample': (float, 0.6, 1.0),
+        'colsample_bytree': (float, 0.6, 1.0),
+        'num_leaves': (int, 20, 100),
+    },
+    'Random Forest': {
+        'n_estimators': (int, 100, 500),
+        'max_depth': (int, 5, 30),
+        'min_samples_split': (int, 2, 20),
+        'min_samples_leaf': (int, 1, 10),
+    },
+    'CatBoost': {
+        'iterations': (int, 100, 1000),
+        'depth': (int, 4, 12),
+        'learning_rate': (float, 0.01, 0.3),
+        'l2_leaf_reg': (float, 1, 10),
+    },
+}
+
+def suggest_params(trial, model_name, space=None):
+    """Sample the tuned parameters of a model (space defaults to SEARCH_SPACES[model_name])"""
+    space = space or SEARCH_SPACES[model_name]
+    return {param: (trial.suggest_int if kind is int else trial.suggest_float)(param, low, high)
+            for param, (kind, low, high) in space.items()}
+
+def objective_xgb(trial, X_train, y_train, X_val, y_val, n_threads=-1, space=None, engineer=None):
+    """XGBoost objective function (trains on quantized matrices shared by all trials)"""
+    params = suggest_params(trial, 'XGBoost', space)
+    X_train, X_val = model_inputs(engineer, 'XGBoost', X_train, X_val)
+    n_estimators = params.pop('n_estimators')
+    params.update({
+        'objective': 'reg:squarederror',
+        # Early stopping uses the last metric (rmse, the default); mae is reported to the pruner
+        'eval_metric': ['mae', 'rmse'],
+        'tree_method': 'hist',
+        'max_bin': XGB_MAX_BIN,
+        'seed': 42,
+        'nthread': n_threads,
+        'verbosity': 0
+    })
+    
+    dtrain, dval = xgboost_dmatrices(X_train, y_train, X_val, y_val)
+    booster = xgb.train(params, dtrain, num_boost_round=n_estimators,
+                        evals=[(dval, 'validation')], early_stopping_rounds=20, verbose_eval=False,
+                        callbacks=[XGBoostPruningCallback(trial)])
+    
+    preds = booster.predict(dval, iteration_range=(0, booster.best_iteration + 1))
     return mean_absolute_error(y_val, preds)
 
-def objective_lgbm(trial, X_train, y_train, X_val, y_val):
-    """LightGBM objective function"""
-    params = {
-        'n_estimators': trial.suggest_int('n_estimators', 100, 1000),
-        'max_depth': trial.suggest_int('max_depth', 3, 15),
-        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
-        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
-        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
-        'num_leaves': trial.suggest_int('num_leaves', 20, 100),
+def objective_lgbm(trial, X_train, y_train, X_val, y_val, n_threads=-1, space=None, engineer=None):
+    """LightGBM objective function (trains on binned datasets cached on disk)"""
+    params = suggest_params(trial, 'LightGBM', space)
+    X_train, X_val = model_inputs(engineer, 'LightGBM', X_train, X_val)
+    n_estimators = params.pop('n_estimators')
+    params.update({
+        'objective': 'regression',
+        'metric': ['l1', 'l2'],
         'random_state': 42,
-        'n_jobs': -1,
+        'num_threads': n_threads,
         'verbose': -1
-    }
+    })
     
-    model = LGBMRegressor(**params)
-    model.fit(X_train, y_train, eval_set=[(X_val, y_val)], callbacks=[])
+    train_set, val_set = lightgbm_datasets(X_train, y_train, X_val, y_val,
+                                           categorical_feature=categorical_indices(engineer) or 'auto')
+    booster = lgb.train(params, train_set, num_boost_round=n_estimators, valid_sets=[val_set],
+                        callbacks=[lightgbm_pruning_callback(trial)])
     
-    preds = model.predict(X_val)
+    preds = booster.predict(X_val)
     return mean_absolute_error(y_val, preds)
 
-def objective_rf(trial, X_train, y_train, X_val, y_val):
-    """Random Forest objective function"""
-    params = {
-        'n_estimators': trial.suggest_int('n_estimators', 100, 500),
-        'max_depth': trial.suggest_int('max_depth', 5, 30),
-        'min_samples_split': trial.suggest_int('min_samples_split', 2, 20),
-        'min_samples_leaf': trial.suggest_int('min_samples_leaf', 1, 10),
+def objective_rf(trial, X_train, y_train, X_val, y_val, n_threads=-1, space=None, engineer=None):
+    """Random Forest objective function (grown with warm_start, reporting every RF_REPORT_TREES trees)"""
+    params = suggest_params(trial, 'Random Forest', space)
+    X_train, X_val = model_inputs(engineer, 'Random Forest', X_train, X_val)
+    n_estimators = params.pop('n_estimators')
+    params.update({
         'random_state': 42,
-        'n_jobs': -1,
+        'n_jobs': n_threads,
         'verbose': 0
-    }
+    })
     
-    model = RandomForestRegressor(**params)
-    model.fit(X_train, y_train)
-    
-    preds = model.predict(X_val)
-    return mean_absolute_error(y_val, preds)
+    # Same seed sequence as a single fit, so the final forest is unchanged
+    model = RandomForestRegressor(warm_start=True, **params)
+    for n_trees in range(RF_REPORT_TREES, n_estimators + RF_REPORT_TREES, RF_REPORT_TREES):
+        model.set_params(n_estimators=min(n_trees, n_estimators))
+        model.fit(X_train, y_train)
+        mae = mean_absolute_error(y_val, model.predict(X_val))
+        if model.n_estimators < n_estimators:
+            report_progress(trial, model.n_estimators, mae)
+    return mae
 
-def objective_cat(trial, X_train, y_train, X_val, y_val):
+def objective_cat(trial, X_train, y_train, X_val, y_val, n_threads=-1, space=None, engineer=None):
     """CatBoost objective function"""
-    params = {
-        'iterations': trial.suggest_int('iterations', 100, 1000),
-        'depth': trial.suggest_int('depth', 4, 12),
-        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
-        'l2_leaf_reg': trial.suggest_float('l2_leaf_reg', 1, 10),
+    params = suggest_params(trial, 'CatBoost', space)
+    X_train, X_val = model_inputs(engineer, 'CatBoost', X_train, X_val)
+    params.update({
         'random_state': 42,
+        'thread_count': n_threads,
+        'cat_features': categorical_indices(engineer) or None,
+        'custom_metric': ['MAE'],
         'verbose': 0,
         'allow_writing_files': False
-    }
+    })
     
+    pruning = CatBoostPruningCallback(trial)
     model = CatBoostRegressor(**params)
-    model.fit(X_train, y_train, eval_set=(X_val, y_val), early_stopping_rounds=20)
+    model.fit(X_train, y_train, eval_set=(X_val, y_val), early_stopping_rounds=20, callbacks=[pruning])
+    pruning.check_pruned()
     
     preds = model.predict(X_val)
     return mean_absolute_error(y_val, preds)
 
-def optimize_all():
-    """Run optimization for all models"""
-    X_train, y_train, X_val, y_val = load_and_prep_data()
+def objective_multi(trial, model_name, X_train, y_train, X_val, y_val, n_threads=-1, space=None,
+                    engineer=None):
+    """
+    Multi-objective function: accuracy and serving cost of the member as trained by the suite
+    
+    The sampled parameters are trained with train_member on the member's own
+    input format (see model_inputs), so latency and size are those of the
+    model that would be saved.
+    
+    Returns:
+        (validation MAE, single-row latency in ms, batch latency in us per row, pickled size in MB)
+    """
+    model, scores = train_member(model_name, X_train, y_train, X_val, y_val, engineer, n_threads,
+                                 params=suggest_params(trial, model_name, space))
+    latency = inference_latency(model, model_inputs(engineer, model_name, X_val)[0])
+    return scores['MAE'], latency['single_row_ms'], latency['batch_us_per_row'], serialized_size(model) / 1024 ** 2
+
+
+# Objective values of the multi-objective studies (in objective_multi order)
+MULTI_OBJECTIVES = ('mae', 'single_row_ms', 'batch_us_per_row', 'size_mb')
+
+OBJECTIVES = {
+    'XGBoost': objective_xgb,
+    'LightGBM': objective_lgbm,
+    'Random Forest': objective_rf,
+    'CatBoost': objective_cat,
+}
+
+# Trials per study (fewer for Random Forest and CatBoost as they're slower)
+N_TRIALS = {'XGBoost': 20, 'LightGBM': 20, 'Random Forest': 10, 'CatBoost': 10}
+
+# Bump when a search space changes so old trials are not resumed
+STUDY_VERSION = 1
+
+FINISHED_STATES = (TrialState.COMPLETE, TrialState.PRUNED)
+
+
+def _clip(kind, value, low, high):
+    value = min(max(value, low), high)
+    return int(round(value)) if kind is int else float(value)
+
+
+def narrow_space(space, center, spread=None):
+    """
+    Search space shrunk to +/- spread of each parameter's range around center
+    
+    Parameters missing from center keep their full range.
+    """
+    spread = config.WARM_START_SPREAD if spread is None else spread
+    narrowed = {}
+    for param, (kind, low, high) in space.items():
+        if param not in center:
+            narrowed[param] = (kind, low, high)
+            continue
+        width = spread * (high - low)
+        new_low = _clip(kind, center[param] - width, low, high)
+        new_high = _clip(kind, center[param] + width, low, high)
+        narrowed[param] = (kind, new_low, max(new_high, new_low))
+    return narrowed
+
+
+def warm_start_seeds(model_name, best_params, n_neighbors=None, spread=None, seed=42):
+    """
+    Previous best parameters plus random neighbors, clipped to the search space
+    
+    Each neighbor moves every parameter by up to spread of its range.
+    
+    Returns:
+        List of parameter dicts, the previous best first
+    """
+    n_neighbors = config.WARM_START_NEIGHBORS if n_neighbors is None else n_neighbors
+    spread = config.WARM_START_SPREAD if spread is None else spread
+    space = SEARCH_SPACES[model_name]
+    rng = np.random.default_rng(seed)
+    center = {param: _clip(kind, best_params[param], low, high)
+              for param, (kind, low, high) in space.items() if param in best_params}
+    seeds = [center]
+    for _ in range(n_neighbors):
+        seeds.append({param: _clip(kind, center[param] + rng.uniform(-spread, spread) * (high - low), low, high)
+                      for param, (kind, low, high) in space.items() if param in center})
+    return seeds
+
+
+def load_previous_best(path=None):
+    """Best parameters of the previous tuning run (empty before the first one)"""
+    path = Path(path) if path is not None else config.MODELS_DIR / 'best_hyperparameters.pkl'
+    return joblib.load(path) if path.exists() else {}
+
+
+def get_storage(path=None):
+    """Journal-file study storage shared by all worker processes (file-locked appends)"""
+    path = Path(path) if path is not None else config.OPTUNA_STORAGE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return JournalStorage(JournalFileBackend(str(path)))
+
+
+def search_fingerprint(model_name, space=None, seeds=None):
+    """Short hash of the search space a study samples and the seeds it was warm-started with"""
+    space = space or SEARCH_SPACES[model_name]
+    payload = json.dumps({'space': {param: [kind.__name__, low, high] for param, (kind, low, high) in space.items()},
+                          'seeds': seeds or []}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:8]
+
+
+def study_name(model_name, data_fingerprint, multi=False, space=None, seeds=None):
+    """
+    Deterministic study name: search-space version, model, objectives, training data,
+    search space and warm-start seeds
+    
+    A warm start from new previous-best parameters (or a narrowed space) gets a
+    fresh study instead of resuming one whose stored distributions differ.
+    """
+    slug = model_name.lower().replace(' ', '_') + ('-multi' if multi else '')
+    return (f"homevista-v{STUDY_VERSION}-{slug}-{data_fingerprint[:12]}"
+            f"-{search_fingerprint(model_name, space, seeds)}")
+
+
+def _run_trials(model_name, name, n_trials, n_threads, storage_path=None, data=None, multi=False, space=None,
+                engineer=None):
+    """
+    Attach to a stored study and run trials until it holds n_trials finished trials
+    
+    Used both in-process and as a process pool task; workers load the data
+    and engineer themselves (memory-mapped from the feature cache).
+    """
+    if data is None:
+        data, engineer = load_and_prep_data()
+    X_train, y_train, X_val, y_val = data
+    study = optuna.load_study(study_name=name, storage=get_storage(storage_path), pruner=make_pruner())
+    remaining = n_trials - len(study.get_trials(deepcopy=False, states=FINISHED_STATES))
+    if remaining <= 0:
+        return
+    if multi:
+        objective = lambda trial: objective_multi(trial, model_name, X_train, y_train, X_val, y_val,
+                                                  n_threads=n_threads, space=space, engineer=engineer)
+    else:
+        objective = lambda trial: OBJECTIVES[model_name](trial, X_train, y_train, X_val, y_val,
+                                                         n_threads=n_threads, space=space, engineer=engineer)
+    with threadpool_limits(limits=n_threads):
+        study.optimize(
+            objective,
+            n_trials=remaining,
+            callbacks=[MaxTrialsCallback(n_trials, states=FINISHED_STATES)]
+        )
+
+
+def optimize_study(model_name, data, n_trials, n_workers=1, n_cores=None, storage_path=None, multi=False,
+                   seeds=None, space=None, engineer=None):
+    """
+    Create or resume the model's study and run it with n_workers processes
+    
+    Interrupted runs resume from the trials already in storage; other processes
+    running the same study name attach to it and share the trial budget.
+    Each worker gets an equal share of n_cores as its per-trial thread cap.
+    With multi, the study minimizes all MULTI_OBJECTIVES (see objective_multi);
+    latencies measured by concurrent workers include their contention.
+    
+    Args:
+        seeds: Parameter sets enqueued as the first trials (see warm_start_seeds);
+            a resumed study only gets the seeds it does not hold yet
+        space: Search space overriding SEARCH_SPACES[model_name] (see narrow_space)
+        engineer: Fitted feature engineer of data (see load_and_prep_data)
+    
+    Returns:
+        study: The stored study
+    """
+    n_cores = core_budget(n_cores)
+    n_workers = max(1, min(n_workers, n_trials))
+    n_threads = max(1, n_cores // n_workers)
+    name = study_name(model_name, array_fingerprint(*data), multi, space, seeds)
+    study = optuna.create_study(study_name=name, storage=get_storage(storage_path),
+                                directions=['minimize'] * (len(MULTI_OBJECTIVES) if multi else 1),
+                                pruner=make_pruner(), load_if_exists=True)
+    if seeds:
+        n_before = len(study.get_trials(deepcopy=False))
+        for params in seeds:
+            study.enqueue_trial(params, skip_if_exists=True)
+        n_seeded = len(study.get_trials(deepcopy=False)) - n_before
+        print(f"  Warm start: {n_seeded} of {len(seeds)} seeded trials enqueued")
+    done = len(study.get_trials(deepcopy=False, states=FINISHED_STATES))
+    print(f"  Study {name}: {done}/{n_trials} trials done, {n_workers} workers x {n_threads} threads")
+    
+    if n_workers == 1:
+        _run_trials(model_name, name, n_trials, n_threads, storage_path, data, multi, space, engineer)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context('spawn')) as pool:
+            futures = [pool.submit(_run_trials, model_name, name, n_trials, n_threads, storage_path, None, multi,
+                                   space)
+                       for _ in range(n_workers)]
+            for future in futures:
+                future.result()
+    return optuna.load_study(study_name=name, storage=get_storage(storage_path))
+
+
+def stratified_subsample(X, y, fraction, seed=42, n_bins=10):
+    """
+    Rows of the training split stratified on rent deciles
+    
+    Returns:
+        X, y restricted to round(fraction * n) rows (the full split when fraction >= 1)
+    """
+    if fraction >= 1:
+        return X, y
+    y = np.asarray(y)
+    n_rows = max(n_bins, int(round(fraction * len(y))))
+    bins = pd.qcut(y, q=n_bins, labels=False, duplicates='drop')
+    idx, _ = train_test_split(np.arange(len(y)), train_size=n_rows, stratify=bins, random_state=seed)
+    idx.sort()
+    return X[idx], y[idx]
+
+
+def halving_fractions(min_fraction=None, eta=None):
+    """Training-set fractions of the successive-halving rungs, ending with the full split"""
+    min_fraction = config.HALVING_MIN_FRACTION if min_fraction is None else min_fraction
+    eta = eta or config.HALVING_ETA
+    fractions = []
+    fraction = min_fraction
+    while fraction < 1 - 1e-9:
+        fractions.append(fraction)
+        fraction *= eta
+    return fractions + [1.0]
+
+
+def _score_candidate(model_name, params, data, n_threads, space=None, engineer=None):
+    """Process pool task: score one fixed parameter set with the model's objective"""
+    with threadpool_limits(limits=n_threads):
+        return OBJECTIVES[model_name](optuna.trial.FixedTrial(params), *data, n_threads=n_threads, space=space,
+                                      engineer=engineer)
+
+
+def successive_halving(model_name, data, n_candidates, n_workers=1, n_cores=None,
+                       min_fraction=None, eta=None, seed=42, seeds=None, space=None, engineer=None):
+    """
+    Successive halving over training-set size
+    
+    Candidates are sampled from the objective's search space and scored on a
+    small stratified subsample of the training split (always against the full
+    validation split); the best 1/eta of each rung are promoted to an eta x
+    larger subsample until the survivors are scored on the full split. With
+    eta x more candidates than a plain study has trials, the search costs about
+    as many full-data fits as that study.
+    
+    Args:
+        model_name: Key of OBJECTIVES
+        data: (X_train, y_train, X_val, y_val)
+        n_candidates: Parameter sets scored on the first rung
+        n_workers: Worker processes scoring candidates of a rung concurrently
+        n_cores: Cores shared by the workers (default: all)
+        min_fraction: Training fraction of the first rung (default config.HALVING_MIN_FRACTION)
+        eta: Promotion factor (default config.HALVING_ETA)
+        seed: Seed of the candidate sampler and the subsamples
+        seeds: Parameter sets included as the first candidates (see warm_start_seeds)
+        space: Search space overriding SEARCH_SPACES[model_name] (see narrow_space)
+        engineer: Fitted feature engineer of data (see load_and_prep_data)
+    
+    Returns:
+        (best_params, best_value, rungs): rungs lists fraction, rows and
+        candidate scores per rung
+    """
+    eta = eta or config.HALVING_ETA
+    n_cores = core_budget(n_cores)
+    X_train, y_train, X_val, y_val = data
+    
+    # Draw candidates from the objective's own search space
+    sampler = optuna.create_study(direction='minimize', sampler=optuna.samplers.RandomSampler(seed=seed))
+    candidates = list(seeds or [])[:n_candidates]
+    candidates += [suggest_params(sampler.ask(), model_name, space)
+                   for _ in range(n_candidates - len(candidates))]
+    
+    rungs = []
+    for rung, fraction in enumerate(halving_fractions(min_fraction, eta)):
+        X_sub, y_sub = stratified_subsample(X_train, y_train, fraction, seed=seed + rung)
+        rung_data = (X_sub, y_sub, X_val, y_val)
+        workers = max(1, min(n_workers, len(candidates)))
+        n_threads = max(1, n_cores // workers)
+        if workers == 1:
+            scores = [_score_candidate(model_name, params, rung_data, n_threads, space, engineer)
+                      for params in candidates]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+                scores = list(pool.map(_score_candidate, [model_name] * len(candidates), candidates,
+                                       [rung_data] * len(candidates), [n_threads] * len(candidates),
+                                       [space] * len(candidates), [engineer] * len(candidates)))
+        order = np.argsort(scores)
+        rungs.append({'fraction': fraction, 'rows': len(y_sub),
+                      'candidates': [{'params': candidates[i], 'mae': float(scores[i])} for i in order]})
+        print(f"  Rung {rung}: {len(candidates)} candidates on {len(y_sub):,} rows, "
+              f"best MAE {scores[order[0]]:.2f}")
+        if fraction >= 1:
+            break
+        candidates = [candidates[i] for i in order[:max(1, len(candidates) // eta)]]
+    
+    best = rungs[-1]['candidates'][0]
+    return best['params'], best['mae'], rungs
+
+
+def pareto_front(study):
+    """Non-dominated trials of a multi-objective study as records of params and MULTI_OBJECTIVES"""
+    return [{'number': trial.number, 'params': trial.params, **dict(zip(MULTI_OBJECTIVES, trial.values))}
+            for trial in sorted(study.best_trials, key=lambda t: t.values[0])]
+
+
+def select_configuration(front, latency_budget_ms=None, batch_budget_us=None, size_budget_mb=None):
+    """
+    Most accurate Pareto configuration within the serving budgets
+    
+    Args:
+        front: Records from pareto_front
+        latency_budget_ms: Maximum single-row latency (None = unconstrained)
+        batch_budget_us: Maximum batch latency per row (None = unconstrained)
+        size_budget_mb: Maximum pickled size (None = unconstrained)
+    
+    Returns:
+        The selected record, or None when no configuration meets the budgets
+    """
+    budgets = {'single_row_ms': latency_budget_ms, 'batch_us_per_row': batch_budget_us,
+               'size_mb': size_budget_mb}
+    feasible = [record for record in front
+                if all(limit is None or record[key] <= limit for key, limit in budgets.items())]
+    return min(feasible, key=lambda record: record['mae']) if feasible else None
+
+
+def optimize_all(n_workers=None, storage_path=None, search=None, warm_start=None):
+    """
+    Run optimization for all models
+    
+    Args:
+        n_workers: Worker processes per study (default config.OPTUNA_WORKERS, or all cores)
+        storage_path: Journal file for the studies (default config.OPTUNA_STORAGE)
+        search: "study", "halving" or "multi" (default config.OPTUNA_SEARCH)
+        warm_start: Seed the search with the previous best_hyperparameters.pkl and
+            its neighbors, running config.WARM_START_TRIALS trials per model
+            (default config.OPTUNA_WARM_START)
+    """
+    n_workers = n_workers or config.OPTUNA_WORKERS or core_budget()
+    apply_process_limits(core_budget())
+    search = search or config.OPTUNA_SEARCH
+    if search not in ('study', 'halving', 'multi'):
+        raise ValueError(f"Unknown search mode: {search!r}")
+    warm_start = config.OPTUNA_WARM_START if warm_start is None else warm_start
+    previous = load_previous_best() if warm_start else {}
+    data, engineer = load_and_prep_data()
     
     print("="*60)
-    print("STARTING HYPERPARAMETER OPTIMIZATION")
+    print(f"STARTING HYPERPARAMETER OPTIMIZATION ({search}{', warm start' if previous else ''})")
     print("="*60)
     
-    studies = {}
-    
-    # 1. XGBoost
-    print("\n[1/4] Optimizing XGBoost...")
-    study_xgb = optuna.create_study(direction='minimize')
-    study_xgb.optimize(lambda trial: objective_xgb(trial, X_train, y_train, X_val, y_val), n_trials=20)
-    studies['XGBoost'] = study_xgb
-    print(f"  Best MAE: {study_xgb.best_value:.2f}")
-    
-    # 2. LightGBM
-    print("\n[2/4] Optimizing LightGBM...")
-    study_lgbm = optuna.create_study(direction='minimize')
-    study_lgbm.optimize(lambda trial: objective_lgbm(trial, X_train, y_train, X_val, y_val), n_trials=20)
-    studies['LightGBM'] = study_lgbm
-    print(f"  Best MAE: {study_lgbm.best_value:.2f}")
-    
-    # 3. Random Forest (fewer trials as it's slower)
-    print("\n[3/4] Optimizing Random Forest...")
-    study_rf = optuna.create_study(direction='minimize')
-    study_rf.optimize(lambda trial: objective_rf(trial, X_train, y_train, X_val, y_val), n_trials=10)
-    studies['Random Forest'] = study_rf
-    print(f"  Best MAE: {study_rf.best_value:.2f}")
-    
-    # 4. CatBoost
-    print("\n[4/4] Optimizing CatBoost...")
-    study_cat = optuna.create_study(direction='minimize')
-    study_cat.optimize(lambda trial: objective_cat(trial, X_train, y_train, X_val, y_val), n_trials=10)
-    studies['CatBoost'] = study_cat
-    print(f"  Best MAE: {study_cat.best_value:.2f}")
+    best_params = {}
+    halving_report = {}
+    front_report = {}
+    for i, (name, n_trials) in enumerate(N_TRIALS.items(), 1):
+        print(f"\n[{i}/{len(N_TRIALS)}] Optimizing {name}...")
+        seeds, space = None, None
+        if name in previous:
+            seeds = warm_start_seeds(name, previous[name])
+            n_trials = max(config.WARM_START_TRIALS, len(seeds))
+            if config.WARM_START_NARROW:
+                space = narrow_space(SEARCH_SPACES[name], seeds[0])
+        if search == 'halving':
+            best_params[name], best_value, halving_report[name] = successive_halving(
+                name, data, n_trials * config.HALVING_ETA, n_workers, seeds=seeds, space=space, engineer=engineer)
+        elif search == 'multi':
+            study = optimize_study(name, data, n_trials, n_workers, storage_path=storage_path, multi=True,
+                                   seeds=seeds, space=space, engineer=engineer)
+            front = pareto_front(study)
+            selected = select_configuration(front, config.LATENCY_BUDGET_MS, config.BATCH_LATENCY_BUDGET_US,
+                                            config.MODEL_SIZE_BUDGET_MB)
+            if selected is None:
+                selected = min(front, key=lambda record: record['single_row_ms'])
+                print("  [WARNING] No configuration within the serving budgets; using the fastest")
+            print(f"  Pareto front: {len(front)} configurations; selected trial {selected['number']} "
+                  f"({selected['single_row_ms']:.2f} ms/row, {selected['size_mb']:.1f} MB)")
+            front_report[name] = {'front': front, 'selected': selected['number']}
+            best_params[name], best_value = selected['params'], selected['mae']
+        else:
+            study = optimize_study(name, data, n_trials, n_workers, storage_path=storage_path,
+                                   seeds=seeds, space=space, engineer=engineer)
+            best_params[name], best_value = study.best_params, study.best_value
+        print(f"  Best MAE: {best_value:.2f}")
     
     # Save best parameters
     print("\n[INFO] Saving best parameters...")
-    best_params = {name: study.best_params for name, study in studies.items()}
+    if front_report:
+        with open(config.MODELS_DIR / 'pareto_front.json', 'w') as f:
+            json.dump(front_report, f, indent=2)
+    if halving_report:
+        with open(config.MODELS_DIR / 'halving_report.json', 'w') as f:
+            json.dump(halving_report, f, indent=2)
     joblib.dump(best_params, config.MODELS_DIR / 'best_hyperparameters.pkl')
     print(f"[SUCCESS] Parameters saved to {config.MODELS_DIR / 'best_hyperparameters.pkl'}")
 
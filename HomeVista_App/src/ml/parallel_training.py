@@ -0,0 +1,208 @@
+"""
+Parallel Training of the Ensemble Members.
+
+Trains Random Forest, XGBoost, LightGBM and CatBoost concurrently in separate
+processes. The machine's cores are partitioned between the members so the
+per-model thread budgets sum to the core count instead of four ``n_jobs=-1``
+pools oversubscribing the CPU. Training and validation matrices are placed in
+POSIX shared memory once and attached by every worker, rather than pickled
+into each task.
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from threadpoolctl import threadpool_limits
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from ml.model_training import MODEL_NAMES, train_member, train_model_suite
+from ml.thread_budget import apply_process_limits, core_budget
+from ml.training_profiler import format_profile, profile_member
+
+
+def thread_budgets(names: Sequence[str] = MODEL_NAMES, n_cores: Optional[int] = None) -> Dict[str, int]:
+    """
+    Partition cores between members; budgets of concurrently running members sum to ``n_cores``.
+
+    With fewer cores than members every member gets one thread and only
+    ``n_cores`` of them run at a time. Leftover cores go to the members listed
+    first (the suite lists the heaviest, Random Forest, first).
+    """
+    n_cores = core_budget(n_cores)
+    workers = min(len(names), n_cores)
+    budgets = {name: n_cores // workers for name in names}
+    for name in list(names)[:n_cores % workers]:
+        budgets[name] += 1
+    return budgets
+
+
+class SharedArrays:
+    """Owner of the shared memory blocks backing a set of arrays; unlinks them on exit."""
+
+    def __init__(self):
+        self.blocks: List[SharedMemory] = []
+
+    def share(self, X: Any) -> Tuple:
+        """Copy a dense array or CSR matrix into shared memory and return its descriptor."""
+        if sparse.issparse(X):
+            X = X.tocsr()
+            return ('csr', X.shape, self.share(X.data), self.share(X.indices), self.share(X.indptr))
+        X = np.ascontiguousarray(X)
+        block = SharedMemory(create=True, size=max(X.nbytes, 1))
+        self.blocks.append(block)
+        np.ndarray(X.shape, dtype=X.dtype, buffer=block.buf)[...] = X
+        return ('ndarray', block.name, X.shape, X.dtype.str)
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _attach(descriptor: Tuple, blocks: List[SharedMemory]) -> Any:
+    """Rebuild a shared array in a worker without copying it."""
+    if descriptor[0] == 'csr':
+        _, shape, data, indices, indptr = descriptor
+        return sparse.csr_matrix((_attach(data, blocks), _attach(indices, blocks), _attach(indptr, blocks)),
+                                 shape=shape, copy=False)
+    _, name, shape, dtype = descriptor
+    # Spawned workers share the parent's resource tracker, so attaching does not
+    # take ownership; the parent unlinks the block
+    block = SharedMemory(name=name)
+    blocks.append(block)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _train_member_worker(name: str, descriptors: Tuple, engineer: Any, n_threads: int,
+                         profile: bool = False, params: Optional[Dict[str, Any]] = None) -> Tuple:
+    """Process pool task: attach the shared matrices and train one member within its budget."""
+    blocks: List[SharedMemory] = []
+    X_train, y_train, X_val, y_val = (_attach(d, blocks) for d in descriptors)
+    start = time.perf_counter()
+    with threadpool_limits(limits=n_threads):
+        if profile:
+            model, scores, member_profile = profile_member(name, X_train, y_train, X_val, y_val, engineer,
+                                                           n_jobs=n_threads, params=params)
+        else:
+            model, scores = train_member(name, X_train, y_train, X_val, y_val, engineer, n_jobs=n_threads,
+                                         params=params)
+            member_profile = None
+    elapsed = time.perf_counter() - start
+    del X_train, y_train, X_val, y_val
+    for block in blocks:
+        block.close()
+    return name, model, scores, elapsed, member_profile
+
+
+def train_suite_parallel(X_train, y_train, X_val, y_val, engineer=None,
+                         n_cores: Optional[int] = None,
+                         names: Sequence[str] = MODEL_NAMES,
+                         profile: bool = False,
+                         tuned_params: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[Dict, Dict, Dict]:
+    """
+    Train all members concurrently with partitioned thread budgets.
+
+    Args:
+        X_train, y_train, X_val, y_val: Training and validation data (dense or CSR).
+        engineer: Fitted feature engineer used to adapt inputs per member.
+        n_cores (Optional[int]): Cores to partition (default: all).
+        names (Sequence[str]): Members to train.
+        profile (bool): Measure each member's resources in its worker (see ml.training_profiler).
+        tuned_params (Optional[Dict[str, Dict[str, Any]]]): Hyperparameter overrides per member.
+
+    Returns:
+        Tuple[Dict, Dict, Dict]: Models and validation scores keyed by member name
+            (in ``names`` order) and a timing report with the parallel wall
+            time, each member's training time and the saving against running
+            the same members one after another (plus ``profiles`` when profiling).
+    """
+    names = list(names)
+    tuned_params = tuned_params or {}
+    budgets = thread_budgets(names, n_cores)
+    workers = min(len(names), sum(budgets.values()))
+
+    print("\n" + "="*60)
+    print(f"TRAINING MODEL SUITE ({workers} parallel workers)")
+    print("="*60)
+
+    results = {}
+    start = time.perf_counter()
+    with SharedArrays() as shared:
+        descriptors = tuple(shared.share(a) for a in (X_train, y_train, X_val, y_val))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+            futures = [pool.submit(_train_member_worker, name, descriptors, engineer, budgets[name], profile,
+                                   tuned_params.get(name))
+                       for name in names]
+            for future in as_completed(futures):
+                name, model, scores, elapsed, member_profile = future.result()
+                results[name] = (model, scores, elapsed, member_profile)
+                print(f"  {name} ({budgets[name]} threads, {elapsed:.1f}s) - "
+                      f"R²: {scores['R2']:.4f}, MAPE: {scores['MAPE']:.2f}%")
+                if member_profile:
+                    print(f"    {format_profile(member_profile)}")
+    wall = time.perf_counter() - start
+
+    models = {name: results[name][0] for name in names}
+    scores = {name: results[name][1] for name in names}
+    member_seconds = {name: results[name][2] for name in names}
+    sequential = sum(member_seconds.values())
+    report = {
+        'n_cores': sum(budgets.values()),
+        'thread_budgets': budgets,
+        'member_seconds': member_seconds,
+        'sequential_seconds': sequential,
+        'wall_seconds': wall,
+        'saving_seconds': sequential - wall,
+        'speedup': sequential / wall if wall else float('nan'),
+        'profiles': {name: results[name][3] for name in names} if profile else {},
+    }
+    print(f"\nParallel wall time: {wall:.1f}s vs {sequential:.1f}s summed member time "
+          f"(saved {report['saving_seconds']:.1f}s, {report['speedup']:.2f}x)")
+    return models, scores, report
+
+
+def benchmark_parallel_training(X_train, y_train, X_val, y_val, engineer=None,
+                                n_cores: Optional[int] = None) -> Dict:
+    """
+    Measure parallel training against an actual sequential run with all cores per member.
+
+    Returns:
+        Dict: Parallel timing report extended with the measured sequential wall time.
+    """
+    start = time.perf_counter()
+    train_model_suite(X_train, y_train, X_val, y_val, engineer, parallel=False)
+    sequential_wall = time.perf_counter() - start
+    _, _, report = train_suite_parallel(X_train, y_train, X_val, y_val, engineer, n_cores)
+    report['sequential_wall_seconds'] = sequential_wall
+    report['measured_saving_seconds'] = sequential_wall - report['wall_seconds']
+    print(f"\nSequential: {sequential_wall:.1f}s, parallel: {report['wall_seconds']:.1f}s "
+          f"(saved {report['measured_saving_seconds']:.1f}s)")
+    return report
+
+
+if __name__ == "__main__":
+    import config
+    from ml.feature_cache import load_features
+    from ml.feature_engineering import AdvancedFeatureEngineer
+    from ml.model_training import load_data
+    from ml.split_manifest import split_indices
+
+    apply_process_limits(core_budget(config.TRAINING_CORES))
+    df = load_data()
+    split = split_indices(len(df))
+    X, y, _, engineer = load_features(df=df, engineer=AdvancedFeatureEngineer(encoding=config.CATEGORICAL_ENCODING),
+                                      fit_index=split['train'])
+    X_train, y_train, X_val, y_val = X[split['train']], y[split['train']], X[split['val']], y[split['val']]
+    benchmark_parallel_training(X_train, y_train, X_val, y_val, engineer, config.TRAINING_CORES)
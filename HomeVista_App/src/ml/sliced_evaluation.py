@@ -0,0 +1,221 @@
+"""
+Sliced Evaluation with Bootstrap Confidence Intervals.
+
+Computes the suite's metrics (R², MAE, RMSE, MAPE) for the whole test set and
+for every value of each slice column (``config.EVALUATION_SLICES``). Every
+metric is a function of six per-row sums (count, |error|, error², APE, y, y²),
+so all slices are reduced at once by multiplying the per-row statistics with a
+sparse row-to-slice indicator matrix.
+
+Confidence intervals use the Poisson bootstrap: each replicate weights every row
+with an independent Poisson(1) count, which resamples all slices at once and
+turns a batch of replicates into one dense-by-sparse matrix product. Batches of
+replicates run in parallel on a process pool.
+"""
+
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from threadpoolctl import threadpool_limits
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from ml.thread_budget import apply_process_limits, core_budget
+
+METRICS = ('R2', 'MAE', 'RMSE', 'MAPE')
+# Upper bound on the replicates one task weights at once (replicates x rows floats)
+BOOTSTRAP_BATCH = 250
+
+
+def row_statistics(y_true, y_pred) -> np.ndarray:
+    """Per-row sums behind every metric: count, |error|, error², APE, y and y²."""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    error = y_true - np.asarray(y_pred, dtype=np.float64)
+    return np.column_stack([np.ones_like(y_true), np.abs(error), error ** 2,
+                            np.abs(error) / np.abs(y_true), y_true, y_true ** 2])
+
+
+def metrics_from_sums(sums: np.ndarray) -> np.ndarray:
+    """
+    Metrics from summed row statistics.
+
+    Args:
+        sums (np.ndarray): Array of shape (..., 6) as produced by summing ``row_statistics``.
+
+    Returns:
+        np.ndarray: Array of shape (..., 4) holding ``METRICS`` (NaN for empty or constant groups).
+    """
+    n, abs_err, sq_err, ape, y, y2 = np.moveaxis(sums, -1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = 1 - sq_err / (y2 - y ** 2 / n)
+        return np.stack([r2, abs_err / n, np.sqrt(sq_err / n), ape / n * 100], axis=-1)
+
+
+def slice_indicator(slice_frame: pd.DataFrame, columns: Sequence[str]) -> Tuple[sparse.csr_matrix, pd.DataFrame]:
+    """
+    Sparse row-to-slice membership matrix.
+
+    Returns:
+        Tuple[sparse.csr_matrix, pd.DataFrame]: (rows x slices) 0/1 matrix whose first
+            column is the whole set, and the (slice, value) label of each column.
+    """
+    n_rows = len(slice_frame)
+    blocks = [sparse.csr_matrix(np.ones((n_rows, 1)))]
+    labels = [('All', 'All')]
+    for col in columns:
+        codes, values = pd.factorize(slice_frame[col].astype(str), sort=True)
+        blocks.append(sparse.csr_matrix((np.ones(n_rows), (np.arange(n_rows), codes)),
+                                        shape=(n_rows, len(values))))
+        labels += [(col, value) for value in values]
+    return sparse.hstack(blocks, format='csr'), pd.DataFrame(labels, columns=['slice', 'value'])
+
+
+def _bootstrap_worker(stats: np.ndarray, indicator: sparse.csr_matrix, n_replicates: int,
+                      seed: np.random.SeedSequence, n_threads: int) -> np.ndarray:
+    """Process pool task: metrics of ``n_replicates`` Poisson-bootstrap replicates for every slice."""
+    rng = np.random.default_rng(seed)
+    results = []
+    with threadpool_limits(limits=n_threads):
+        for start in range(0, n_replicates, BOOTSTRAP_BATCH):
+            size = min(BOOTSTRAP_BATCH, n_replicates - start)
+            weights = rng.poisson(1.0, size=(size, stats.shape[0])).astype(np.float64)
+            # (replicates x rows) @ (rows x slices), one product per statistic
+            sums = np.stack([np.asarray((indicator.T.multiply(stats[:, k]) @ weights.T).T)
+                             for k in range(stats.shape[1])], axis=-1)
+            results.append(metrics_from_sums(sums))
+    return np.concatenate(results)
+
+
+def bootstrap_metrics(stats: np.ndarray, indicator: sparse.csr_matrix,
+                      n_replicates: Optional[int] = None,
+                      n_cores: Optional[int] = None,
+                      seed: Optional[int] = None) -> np.ndarray:
+    """
+    Bootstrap replicates of every metric for every slice, computed in parallel.
+
+    Returns:
+        np.ndarray: Array of shape (replicates, slices, len(METRICS)).
+    """
+    n_replicates = n_replicates or config.BOOTSTRAP_REPLICATES
+    n_cores = core_budget(n_cores)
+    workers = max(1, min(n_cores, -(-n_replicates // BOOTSTRAP_BATCH)))
+    n_threads = max(1, n_cores // workers)
+    shares = [n_replicates // workers + (i < n_replicates % workers) for i in range(workers)]
+    seeds = np.random.SeedSequence(config.RANDOM_SEED if seed is None else seed).spawn(workers)
+    if workers == 1:
+        return _bootstrap_worker(stats, indicator, n_replicates, seeds[0], n_threads)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        futures = [pool.submit(_bootstrap_worker, stats, indicator, share, task_seed, n_threads)
+                   for share, task_seed in zip(shares, seeds)]
+        return np.concatenate([future.result() for future in futures])
+
+
+def evaluate_slices(y_true, y_pred, slice_frame: pd.DataFrame,
+                    columns: Optional[Sequence[str]] = None,
+                    n_replicates: Optional[int] = None,
+                    confidence: Optional[float] = None,
+                    n_cores: Optional[int] = None) -> pd.DataFrame:
+    """
+    Metrics with bootstrap confidence intervals for the whole set and every slice.
+
+    Args:
+        y_true, y_pred: Targets and predictions.
+        slice_frame (pd.DataFrame): Slice columns of the same rows (e.g. the raw test listings).
+        columns (Optional[Sequence[str]]): Columns to slice by (default ``config.EVALUATION_SLICES``,
+            missing columns are skipped).
+        n_replicates (Optional[int]): Bootstrap replicates (default ``config.BOOTSTRAP_REPLICATES``,
+            0 for point estimates only).
+        confidence (Optional[float]): Interval coverage (default ``config.BOOTSTRAP_CONFIDENCE``).
+        n_cores (Optional[int]): Cores for the bootstrap (default: the core budget).
+
+    Returns:
+        pd.DataFrame: Tidy report with one row per (slice, value, metric) and columns
+            ``slice``, ``value``, ``n``, ``metric``, ``estimate``, ``ci_lower``, ``ci_upper``.
+    """
+    columns = [col for col in (columns if columns is not None else config.EVALUATION_SLICES)
+               if col in slice_frame.columns]
+    n_replicates = config.BOOTSTRAP_REPLICATES if n_replicates is None else n_replicates
+    confidence = confidence or config.BOOTSTRAP_CONFIDENCE
+
+    stats = row_statistics(y_true, y_pred)
+    indicator, labels = slice_indicator(slice_frame.reset_index(drop=True), columns)
+    sums = np.asarray((indicator.T @ stats))
+    estimates = metrics_from_sums(sums)
+
+    if n_replicates:
+        start = time.perf_counter()
+        replicates = bootstrap_metrics(stats, indicator, n_replicates, n_cores)
+        alpha = (1 - confidence) / 2
+        with warnings.catch_warnings():
+            # Slices too small to score (e.g. R² of one row) are NaN in every replicate
+            warnings.simplefilter('ignore', RuntimeWarning)
+            lower, upper = np.nanquantile(replicates, [alpha, 1 - alpha], axis=0)
+        print(f"[INFO] {n_replicates} bootstrap replicates over {len(labels)} slices "
+              f"in {time.perf_counter() - start:.1f}s")
+    else:
+        lower = upper = np.full_like(estimates, np.nan)
+
+    report = labels.loc[labels.index.repeat(len(METRICS))].reset_index(drop=True)
+    report.insert(2, 'n', np.repeat(sums[:, 0].astype(int), len(METRICS)))
+    report['metric'] = np.tile(METRICS, len(labels))
+    report['estimate'] = estimates.ravel()
+    report['ci_lower'] = lower.ravel()
+    report['ci_upper'] = upper.ravel()
+    return report
+
+
+def worst_slices(report: pd.DataFrame, metric: str = 'MAPE', min_rows: int = 30, top: int = 10) -> pd.DataFrame:
+    """Slices with the worst value of a metric (lowest R², highest error), ignoring small slices."""
+    rows = report[(report['metric'] == metric) & (report['slice'] != 'All') & (report['n'] >= min_rows)]
+    return rows.sort_values('estimate', ascending=(metric == 'R2')).head(top).reset_index(drop=True)
+
+
+def format_slice_report(report: pd.DataFrame, metrics: Sequence[str] = ('MAE', 'MAPE')) -> str:
+    """Human-readable table of estimates with their intervals, one line per slice value."""
+    lines: List[str] = []
+    wide = report[report['metric'].isin(metrics)]
+    for (slice_name, value), group in wide.groupby(['slice', 'value'], sort=False):
+        cells = [f"{row.metric} {row.estimate:,.2f} [{row.ci_lower:,.2f}, {row.ci_upper:,.2f}]"
+                 for row in group.itertuples()]
+        lines.append(f"  {slice_name}={value} (n={group['n'].iloc[0]:,}): " + ", ".join(cells))
+    return "\n".join(lines)
+
+
+def save_slice_report(report: pd.DataFrame, path: Optional[Path] = None) -> Path:
+    """Write the tidy report as CSV (default reports/sliced_evaluation.csv)."""
+    path = Path(path) if path is not None else config.REPORTS_DIR / 'sliced_evaluation.csv'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    import joblib
+    from ml.model_training import model_inputs
+    from ml.split_manifest import load_holdout, load_split_frame
+
+    apply_process_limits(core_budget())
+    models = joblib.load(config.MODELS_DIR / 'model_suite.pkl')
+    weights = joblib.load(config.MODELS_DIR / 'ensemble_weights.pkl')
+    engineer = joblib.load(config.MODELS_DIR / 'feature_engineer.pkl')
+
+    # Held-out test matrix saved by model training; raw rows only supply the slice columns
+    X_test, y_test = load_holdout('test', engineer=engineer)
+    test_df = load_split_frame('test')
+    y_pred = sum(weights[name] * model.predict(model_inputs(engineer, name, X_test)[0])
+                 for name, model in models.items())
+
+    report = evaluate_slices(y_test, y_pred, test_df)
+    print(format_slice_report(report))
+    print("\nWorst slices by MAPE:")
+    print(worst_slices(report).to_string(index=False))
+    print(f"[SUCCESS] Sliced evaluation saved to {save_slice_report(report)}")
@@ -0,0 +1,161 @@
+"""
+Persisted Train/Validation/Test Split.
+
+``model_training`` draws the split from the raw rows, fits the feature engineer
+on the training rows only and stores the held-out feature matrices (in the
+final, possibly pruned, column layout) next to the model suite, along with the
+exact rows of each split. Evaluation, SHAP and the sliced report load the test
+set from here instead of re-running feature engineering and re-deriving the
+split, so they score exactly the rows the models never saw. Incremental updates
+rewrite the manifest with the appended listings as an extra source.
+
+Layout::
+
+    <SPLIT_DIR>/manifest.json    (sizes, seed, sources, dataset fingerprint, feature names)
+    <SPLIT_DIR>/indices.npz      (train / val / test row indices into the concatenated sources)
+    <SPLIT_DIR>/X_<split>.npy    (X_<split>.npz for 'sparse' encoding)
+    <SPLIT_DIR>/y_<split>.npy
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.model_selection import train_test_split
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+
+SPLITS = ('train', 'val', 'test')
+# Held-out splits whose feature matrices are stored
+HOLDOUT_SPLITS = ('val', 'test')
+
+
+def split_indices(n_rows: int, random_state: int = 42) -> Dict[str, np.ndarray]:
+    """
+    Row indices of the 70/15/15 train/validation/test split.
+
+    Selects the same rows as splitting X and y directly with ``train_test_split``
+    (the shuffle depends only on the row count and the seed).
+    """
+    train_idx, temp_idx = train_test_split(np.arange(n_rows), test_size=0.3, random_state=random_state)
+    val_idx, test_idx = train_test_split(temp_idx, test_size=0.5, random_state=random_state)
+    return {'train': train_idx, 'val': val_idx, 'test': test_idx}
+
+
+def save_split(indices: Dict[str, np.ndarray], holdouts: Dict[str, Tuple[Any, np.ndarray]],
+               feature_names: List[str], data_fingerprint: Optional[str] = None,
+               random_state: int = 42, split_dir: Union[str, Path, None] = None,
+               sources: Optional[Sequence[Union[str, Path]]] = None) -> Path:
+    """
+    Write the split manifest and held-out matrices atomically (default ``config.SPLIT_DIR``).
+
+    Args:
+        indices (Dict[str, np.ndarray]): Row indices per split (see ``split_indices``).
+        holdouts (Dict[str, Tuple[Any, np.ndarray]]): (X, y) per held-out split, in the
+            column layout the saved models consume.
+        feature_names (List[str]): Column names of the held-out matrices.
+        data_fingerprint (Optional[str]): Fingerprint of the dataset the indices refer to.
+        random_state (int): Seed the split was drawn with.
+        sources (Optional[Sequence[Union[str, Path]]]): CSV files whose concatenated rows
+            the indices refer to (default: the analytical dataset).
+
+    Returns:
+        Path: Directory holding the split.
+    """
+    split_dir = Path(split_dir) if split_dir is not None else config.SPLIT_DIR
+    split_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{split_dir.name}-", dir=split_dir.parent))
+    try:
+        np.savez(tmp_dir / 'indices.npz', **{name: np.asarray(indices[name]) for name in SPLITS})
+        for name, (X, y) in holdouts.items():
+            if sparse.issparse(X):
+                sparse.save_npz(tmp_dir / f'X_{name}.npz', X.tocsr())
+            else:
+                np.save(tmp_dir / f'X_{name}.npy', np.ascontiguousarray(X))
+            np.save(tmp_dir / f'y_{name}.npy', np.ascontiguousarray(y))
+        with open(tmp_dir / 'manifest.json', 'w') as f:
+            json.dump({
+                'sizes': {name: int(len(indices[name])) for name in SPLITS},
+                'holdouts': list(holdouts),
+                'random_state': random_state,
+                'data_fingerprint': data_fingerprint,
+                'sources': [str(path) for path in (sources or [config.FILE_ANALYTICAL_DATASET])],
+                'feature_names': list(feature_names),
+                'created': datetime.now().isoformat(timespec='seconds'),
+            }, f, indent=2)
+        shutil.rmtree(split_dir, ignore_errors=True)
+        os.replace(tmp_dir, split_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return split_dir
+
+
+def load_manifest(split_dir: Union[str, Path, None] = None) -> Dict[str, Any]:
+    """
+    Read the split manifest.
+
+    Raises:
+        FileNotFoundError: If model training has not saved a split yet.
+    """
+    split_dir = Path(split_dir) if split_dir is not None else config.SPLIT_DIR
+    with open(split_dir / 'manifest.json') as f:
+        return json.load(f)
+
+
+def load_split_indices(split_dir: Union[str, Path, None] = None) -> Dict[str, np.ndarray]:
+    """Row indices into the analytical dataset per split."""
+    split_dir = Path(split_dir) if split_dir is not None else config.SPLIT_DIR
+    with np.load(split_dir / 'indices.npz') as indices:
+        return {name: indices[name] for name in SPLITS}
+
+
+def load_split_frame(name: str = 'test', split_dir: Union[str, Path, None] = None) -> pd.DataFrame:
+    """Raw listings of one split, read from the manifest's sources (e.g. for slice columns)."""
+    split_dir = Path(split_dir) if split_dir is not None else config.SPLIT_DIR
+    manifest = load_manifest(split_dir)
+    # Manifests written before incremental updates name a single source
+    sources = manifest.get('sources') or [manifest['source']]
+    df = pd.concat([pd.read_csv(path) for path in sources], ignore_index=True)
+    return df.iloc[load_split_indices(split_dir)[name]]
+
+
+def load_holdout(name: str = 'test', split_dir: Union[str, Path, None] = None,
+                 engineer: Any = None, mmap: bool = True) -> Tuple[Any, np.ndarray]:
+    """
+    Load a held-out feature matrix and target saved by model training.
+
+    Args:
+        name (str): One of ``HOLDOUT_SPLITS``.
+        split_dir (Union[str, Path, None]): Split directory (default ``config.SPLIT_DIR``).
+        engineer: Saved feature engineer; its ``feature_names`` must match the stored columns.
+        mmap (bool): Memory-map dense arrays read-only instead of reading them into RAM.
+
+    Returns:
+        Tuple[Any, np.ndarray]: X (dense or CSR) and y.
+
+    Raises:
+        ValueError: If ``name`` is not stored or the columns do not match ``engineer``.
+    """
+    split_dir = Path(split_dir) if split_dir is not None else config.SPLIT_DIR
+    manifest = load_manifest(split_dir)
+    if name not in manifest['holdouts']:
+        raise ValueError(f"Split '{name}' is not stored; expected one of {manifest['holdouts']}")
+    if engineer is not None and list(engineer.feature_names) != manifest['feature_names']:
+        raise ValueError("Stored held-out matrices do not match the feature engineer; re-run model training")
+    mmap_mode = 'r' if mmap else None
+    if (split_dir / f'X_{name}.npz').exists():
+        X = sparse.load_npz(split_dir / f'X_{name}.npz').tocsr()
+    else:
+        X = np.load(split_dir / f'X_{name}.npy', mmap_mode=mmap_mode)
+    return X, np.load(split_dir / f'y_{name}.npy', mmap_mode=mmap_mode)
@@ -0,0 +1,169 @@
+"""
+Process-Wide Thread Budgets.
+
+XGBoost, LightGBM, CatBoost and scikit-learn each default to every core, and
+NumPy's BLAS and the OpenMP runtimes keep pools of their own. Training, tuning
+and the dashboard therefore resolve their thread counts here, from one place:
+
+- ``core_budget``: cores shared by a training or tuning run (explicit argument,
+  then ``HOMEVISTA_THREADS``, then ``config.THREAD_LIMIT``, then the cores
+  available to the process). Process pools split it between their workers.
+- ``inference_threads``: threads per prediction in the dashboard
+  (``HOMEVISTA_INFERENCE_THREADS``, then ``config.INFERENCE_THREADS``).
+
+``apply_process_limits`` enforces a budget on the native pools of the current
+process and exports it to the BLAS/OpenMP environment variables inherited by
+spawned workers; the models get theirs through ``n_jobs``/``thread_count``.
+``thread_pool_report`` shows the pools actually in effect (``python -m
+ml.thread_budget`` prints it).
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import xgboost as xgb
+from threadpoolctl import threadpool_info, threadpool_limits
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+
+ENV_THREADS = 'HOMEVISTA_THREADS'
+ENV_INFERENCE_THREADS = 'HOMEVISTA_INFERENCE_THREADS'
+# Read by the BLAS / OpenMP runtimes when a (spawned) process loads them
+NATIVE_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+
+def available_cores() -> int:
+    """Cores this process may run on (CPU affinity where supported)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return max(1, int(value))
+    except ValueError:
+        raise ValueError(f"{name} must be a positive integer, got {value!r}") from None
+
+
+def core_budget(n_cores: Optional[int] = None) -> int:
+    """
+    Cores available to a training or tuning run.
+
+    Args:
+        n_cores (Optional[int]): Explicit budget (e.g. ``config.TRAINING_CORES``); wins when set.
+
+    Returns:
+        int: ``n_cores``, else ``HOMEVISTA_THREADS``, else ``config.THREAD_LIMIT``,
+            else every available core.
+    """
+    return max(1, n_cores or _env_int(ENV_THREADS) or config.THREAD_LIMIT or available_cores())
+
+
+def inference_threads() -> int:
+    """Threads per prediction request (``HOMEVISTA_INFERENCE_THREADS`` or ``config.INFERENCE_THREADS``)."""
+    return max(1, _env_int(ENV_INFERENCE_THREADS) or config.INFERENCE_THREADS or 1)
+
+
+def apply_process_limits(n_threads: int) -> int:
+    """
+    Cap the native thread pools of this process and of the workers it spawns.
+
+    Limits the BLAS and OpenMP pools already loaded (threadpoolctl) and
+    XGBoost's global default, and exports ``NATIVE_ENV_VARS`` so spawned
+    processes start with pools of the same size.
+
+    Returns:
+        int: The applied limit.
+    """
+    n_threads = max(1, int(n_threads))
+    for var in NATIVE_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    threadpool_limits(limits=n_threads)
+    xgb.set_config(nthread=n_threads)
+    return n_threads
+
+
+def limit_model_threads(models: Dict[str, Any], n_threads: int) -> None:
+    """Set the prediction thread count of fitted members (see ``predict_options`` for CatBoost)."""
+    for model in models.values():
+        params = model.get_params()
+        if 'n_jobs' in params:
+            model.set_params(n_jobs=n_threads)
+
+
+def predict_options(model: Any, n_threads: int) -> Dict[str, int]:
+    """Extra ``predict`` arguments enforcing a thread count (CatBoost ignores its fit-time setting)."""
+    if type(model).__module__.startswith('catboost'):
+        return {'thread_count': n_threads}
+    return {}
+
+
+def _process_threads() -> Optional[int]:
+    """OS threads currently alive in this process (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def thread_pool_report() -> Dict[str, Any]:
+    """
+    Effective thread configuration of this process.
+
+    Returns:
+        Dict[str, Any]: Available cores, resolved budgets, the relevant
+            environment variables, every native pool loaded (BLAS/OpenMP, via
+            threadpoolctl), XGBoost's global thread setting and the number of
+            live OS threads.
+    """
+    return {
+        'available_cores': available_cores(),
+        'core_budget': core_budget(),
+        'inference_threads': inference_threads(),
+        'environment': {var: os.environ.get(var)
+                        for var in (ENV_THREADS, ENV_INFERENCE_THREADS) + NATIVE_ENV_VARS},
+        'native_pools': [{key: pool.get(key) for key in ('user_api', 'internal_api', 'prefix',
+                                                         'num_threads', 'version')}
+                         for pool in threadpool_info()],
+        'xgboost_nthread': xgb.get_config().get('nthread'),
+        'process_threads': _process_threads(),
+    }
+
+
+def format_thread_report(report: Dict[str, Any]) -> str:
+    """Human-readable version of ``thread_pool_report``."""
+    lines = [
+        f"Available cores: {report['available_cores']}",
+        f"Training/tuning budget: {report['core_budget']} threads",
+        f"Inference budget: {report['inference_threads']} threads per request",
+        f"XGBoost global nthread: {report['xgboost_nthread']}",
+        f"Live OS threads: {report['process_threads']}",
+        "Environment:",
+    ]
+    lines += [f"  {var}={value}" for var, value in report['environment'].items() if value is not None]
+    lines.append("Native pools:")
+    lines += [f"  {pool['internal_api']} ({pool['user_api']}, {pool['prefix']}): {pool['num_threads']} threads"
+              for pool in report['native_pools']]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import numpy  # noqa: F401  (load the BLAS pool so it is reported)
+    import sklearn.ensemble  # noqa: F401
+    import lightgbm  # noqa: F401
+
+    apply_process_limits(core_budget())
+    print(format_thread_report(thread_pool_report()))
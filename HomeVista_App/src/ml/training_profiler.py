@@ -0,0 +1,211 @@
+"""
+Training Resource Profiler.
+
+Instruments the training of each ensemble member: wall and CPU time, peak
+resident memory, trees or boosting rounds actually kept after early stopping,
+serialized model size and single-row / batch inference latency. Profiles are
+written as JSON next to the model artifacts (models/training_profile.json).
+"""
+
+import json
+import os
+import pickle
+import platform
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+import config
+from ml.model_training import model_inputs, train_member
+from ml.thread_budget import core_budget
+
+# Single-row latency is the median over this many predict calls
+LATENCY_REPEATS = 50
+LATENCY_BATCH_ROWS = 1000
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class ResourceMonitor:
+    """
+    Context manager measuring wall time, CPU time and peak RSS of a block.
+
+    Peak RSS is sampled by a background thread, so it reflects the block rather
+    than the lifetime maximum of the process; without /proc it falls back to
+    ``ru_maxrss``.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.start_rss: Optional[int] = None
+        self.peak_rss: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and rss > (self.peak_rss or 0):
+                self.peak_rss = rss
+
+    def __enter__(self) -> 'ResourceMonitor':
+        self.start_rss = self.peak_rss = current_rss()
+        if self.start_rss is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.process_time() - self._cpu
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak_rss = max(self.peak_rss or 0, current_rss() or 0)
+        else:
+            # ru_maxrss is in kilobytes on Linux
+            self.peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def as_dict(self) -> Dict[str, Any]:
+        mb = 1024 ** 2
+        return {
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'cpu_utilisation': self.cpu_seconds / self.wall_seconds if self.wall_seconds else None,
+            'peak_rss_mb': self.peak_rss / mb if self.peak_rss else None,
+            'rss_increase_mb': (self.peak_rss - self.start_rss) / mb if self.start_rss else None,
+        }
+
+
+def trees_built(name: str, model: Any) -> Dict[str, Optional[int]]:
+    """Trees (RF) or boosting rounds kept after early stopping, and the configured maximum."""
+    if name == 'Random Forest':
+        trees = {'built': len(model.estimators_), 'configured': model.n_estimators}
+        if hasattr(model, 'oob_learning_curve_'):
+            trees['oob_learning_curve'] = [list(point) for point in model.oob_learning_curve_]
+        return trees
+    if name == 'XGBoost':
+        best = getattr(model, 'best_iteration', None)
+        built = model.get_booster().num_boosted_rounds()
+        return {'built': built, 'used': best + 1 if best is not None else built,
+                'configured': model.n_estimators}
+    if name == 'LightGBM':
+        best = model.best_iteration_ or None
+        return {'built': model.booster_.current_iteration(), 'used': best or model.booster_.current_iteration(),
+                'configured': model.n_estimators}
+    if name == 'CatBoost':
+        return {'built': model.tree_count_, 'configured': model.get_params().get('iterations')}
+    return {'built': None, 'configured': None}
+
+
+def serialized_size(model: Any) -> int:
+    """Size in bytes of the pickled model (what model_suite.pkl stores per member)."""
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def inference_latency(model: Any, X: Any, repeats: int = LATENCY_REPEATS,
+                      batch_rows: int = LATENCY_BATCH_ROWS) -> Dict[str, float]:
+    """
+    Median single-row latency and batch throughput of ``model.predict`` on ``X``.
+
+    Returns:
+        Dict[str, float]: ``single_row_ms``, ``batch_rows``, ``batch_ms`` and ``batch_us_per_row``.
+    """
+    row = X[:1]
+    model.predict(row)  # warm up lazily initialised predictors
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+    batch = X[:batch_rows]
+    start = time.perf_counter()
+    model.predict(batch)
+    batch_seconds = time.perf_counter() - start
+    n_batch = batch.shape[0]
+    return {
+        'single_row_ms': float(np.median(timings)) * 1000,
+        'batch_rows': n_batch,
+        'batch_ms': batch_seconds * 1000,
+        'batch_us_per_row': batch_seconds / n_batch * 1e6,
+    }
+
+
+def model_footprint(name: str, model: Any, X_val: Any, engineer: Any = None) -> Dict[str, Any]:
+    """Size and speed of a fitted member: trees kept, serialized bytes and inference latency."""
+    X_va, = model_inputs(engineer, name, X_val)
+    return {
+        'trees': trees_built(name, model),
+        'serialized_bytes': serialized_size(model),
+        'inference': inference_latency(model, X_va),
+    }
+
+
+def profile_member(name: str, X_train, y_train, X_val, y_val, engineer=None, n_jobs: Optional[int] = None,
+                   params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, float], Dict[str, Any]]:
+    """
+    Train one member under the resource monitor and measure the fitted model.
+
+    Returns:
+        Tuple[Any, Dict[str, float], Dict[str, Any]]: Model, validation scores and profile.
+    """
+    n_jobs = core_budget(n_jobs)
+    with ResourceMonitor() as monitor:
+        model, scores = train_member(name, X_train, y_train, X_val, y_val, engineer, n_jobs=n_jobs,
+                                     params=params)
+    profile = {'training': monitor.as_dict(), 'n_jobs': n_jobs, 'train_rows': X_train.shape[0]}
+    profile.update(model_footprint(name, model, X_val, engineer))
+    return model, scores, profile
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """One-line summary of a member profile for console output."""
+    training = profile['training']
+    peak = f"{training['peak_rss_mb']:.0f} MB peak RSS" if training.get('peak_rss_mb') else "peak RSS n/a"
+    return (f"{training['wall_seconds']:.1f}s wall, {training['cpu_seconds']:.1f}s CPU, {peak}, "
+            f"{profile['trees']['built']} trees, {profile['serialized_bytes'] / 1024 ** 2:.1f} MB, "
+            f"{profile['inference']['single_row_ms']:.2f} ms/row")
+
+
+def write_profile_report(profiles: Dict[str, Dict[str, Any]], path: Optional[Path] = None) -> Path:
+    """
+    Write member profiles with host details as JSON (default models/training_profile.json).
+
+    Returns:
+        Path: Location of the report.
+    """
+    path = Path(path) if path is not None else config.MODELS_DIR / 'training_profile.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'host': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        },
+        'models': profiles,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, default=float)
+    return path
@@ -0,0 +1,73 @@
+"""
+Unit tests for the feature matrix cache.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.ml import feature_cache
+from src.ml.feature_cache import evict_cache, load_features
+
+@pytest.fixture
+def listings_df():
+    """Fixture for a small listings dataframe."""
+    rng = np.random.default_rng(1)
+    n = 30
+    return pd.DataFrame({
+        'neighborhood': rng.choice(['Dubai Marina', 'Deira'], n),
+        'property_type': rng.choice(['Studio', '1BR'], n),
+        'size_sqft': rng.uniform(400, 1000, n),
+        'bedrooms': rng.integers(0, 2, n),
+        'bathrooms': rng.integers(1, 3, n),
+        'amenity_count': rng.integers(0, 9, n),
+        'tier_numeric': rng.integers(1, 5, n),
+        'furnished_numeric': rng.integers(0, 2, n),
+        'has_metro_numeric': rng.integers(0, 2, n),
+        'beach_accessible_numeric': rng.integers(0, 2, n),
+        'price_per_sqft': rng.uniform(50, 150, n),
+        'annual_rent': rng.uniform(40000, 120000, n)
+    })
+
+def test_cache_hit_returns_same_matrix(listings_df, tmp_path):
+    """A second load must come from disk and match the first build."""
+    X1, y1, names1, _ = load_features(df=listings_df, cache_dir=tmp_path)
+    X2, y2, names2, engineer = load_features(df=listings_df, cache_dir=tmp_path)
+    
+    assert len(list(tmp_path.iterdir())) == 1
+    assert isinstance(X2, np.memmap)
+    np.testing.assert_array_equal(X1, X2)
+    np.testing.assert_array_equal(y1, y2)
+    assert names1 == names2 == engineer.feature_names
+
+def test_cache_key_changes_with_data(listings_df, tmp_path):
+    """Different input data must not reuse an existing entry."""
+    load_features(df=listings_df, cache_dir=tmp_path)
+    changed = listings_df.assign(annual_rent=listings_df['annual_rent'] * 1.1)
+    load_features(df=changed, cache_dir=tmp_path)
+    
+    assert len(list(tmp_path.iterdir())) == 2
+
+def test_fit_index_excludes_held_out_targets(listings_df, tmp_path):
+    """Fitting on a row subset must keep other rows' targets out of the statistics and the key."""
+    train_idx = np.arange(20)
+    X_all, y, _, _ = load_features(df=listings_df, cache_dir=tmp_path)
+    X_fit, y_fit, _, engineer = load_features(df=listings_df, cache_dir=tmp_path, fit_index=train_idx)
+    
+    assert len(list(tmp_path.iterdir())) == 2
+    assert X_fit.shape == X_all.shape
+    np.testing.assert_array_equal(y_fit, listings_df['annual_rent'].values)
+    assert engineer.global_mean == pytest.approx(listings_df['annual_rent'].iloc[:20].mean())
+
+def test_cache_evicts_least_recently_used(listings_df, tmp_path, monkeypatch):
+    """Writing past the size cap evicts older entries but never the one just written."""
+    monkeypatch.setattr(feature_cache.config, 'FEATURE_CACHE_MAX_MB', 0)
+    load_features(df=listings_df, cache_dir=tmp_path)
+    changed = listings_df.assign(annual_rent=listings_df['annual_rent'] * 1.1)
+    X, _, _, _ = load_features(df=changed, cache_dir=tmp_path)
+    
+    entries = list(tmp_path.iterdir())
+    assert len(entries) == 1
+    X_cached, _, _, _ = load_features(df=changed, cache_dir=tmp_path)
+    np.testing.assert_array_equal(X_cached, X)
+    assert evict_cache(max_mb=1, cache_dir=tmp_path) == 0
+    assert evict_cache(max_mb=0, cache_dir=tmp_path) == 1
@@ -5,7 +5,7 @@ Unit tests for AdvancedFeatureEngineer class.
 import pytest
 import pandas as pd
 import numpy as np
-from src.ml.feature_engineering import AdvancedFeatureEngineer
+from src.ml.feature_engineering import AdvancedFeatureEngineer, resolve_feature_dependencies
 
 @pytest.fixture
 def engineer():
@@ -67,3 +67,198 @@ def test_fit_transform_shape(engineer, sample_df):
     assert isinstance(X, np.ndarray)
     assert len(features) > 0
     assert X.shape[1] == len(features)
+
+@pytest.fixture
+def listings_df():
+    """Fixture for a small multi-neighborhood dataframe."""
+    rng = np.random.default_rng(0)
+    n = 40
+    return pd.DataFrame({
+        'neighborhood': rng.choice(['Dubai Marina', 'Deira', 'Jumeirah'], n),
+        'property_type': rng.choice(['Studio', '1BR', '2BR'], n),
+        'size_sqft': rng.uniform(400, 1500, n),
+        'bedrooms': rng.integers(0, 3, n),
+        'bathrooms': rng.integers(1, 3, n),
+        'amenity_count': rng.integers(0, 9, n),
+        'tier_numeric': rng.integers(1, 5, n),
+        'furnished_numeric': rng.integers(0, 2, n),
+        'has_metro_numeric': rng.integers(0, 2, n),
+        'beach_accessible_numeric': rng.integers(0, 2, n),
+        'price_per_sqft': rng.uniform(50, 150, n),
+        'annual_rent': rng.uniform(40000, 200000, n),
+        'has_pool': rng.integers(0, 2, n),
+        'has_gym': rng.integers(0, 2, n),
+        'has_parking': rng.integers(0, 2, n),
+        'has_balcony': rng.integers(0, 2, n)
+    })
+
+def test_resolve_feature_dependencies_orders_inputs_first():
+    """Registered inputs must be resolved before the features that consume them."""
+    specs = resolve_feature_dependencies(['has_complete_amenities'])
+    names = [spec.name for spec in specs]
+    
+    assert names[-1] == 'has_complete_amenities'
+    assert names.index('has_pool') < names.index('has_complete_amenities')
+    with pytest.raises(KeyError):
+        resolve_feature_dependencies(['not_a_feature'])
+
+def test_transform_matches_fit_transform(engineer, listings_df):
+    """Transform must reproduce the training matrix, including target encodings."""
+    X, _, features = engineer.fit_transform(listings_df)
+    X_new = engineer.transform(listings_df.drop(columns=['annual_rent']))
+    
+    np.testing.assert_allclose(X_new, X)
+    assert len(engineer.get_feature_schema()) == len(features)
+
+def test_select_features_prunes_output(engineer, listings_df):
+    """Selecting a subset narrows the output and the required raw inputs."""
+    X, _, _ = engineer.fit_transform(listings_df)
+    engineer.select_features(['size_per_bedroom', 'neighborhood_rent_avg'])
+    
+    X_pruned = engineer.transform(listings_df[engineer.required_inputs()])
+    
+    assert X_pruned.shape[1] == len(engineer.feature_names)
+    assert engineer.feature_names[:2] == ['size_per_bedroom', 'neighborhood_rent_avg']
+    assert 'price_per_sqft' not in engineer.required_inputs()
+
+def test_native_encoding_expands_to_onehot(listings_df):
+    """Native codes expanded to one-hot must equal the dense one-hot matrix."""
+    X_dense, _, _ = AdvancedFeatureEngineer().fit_transform(listings_df)
+    native = AdvancedFeatureEngineer(encoding='native')
+    X_native, _, features = native.fit_transform(listings_df)
+    
+    assert features[-2:] == ['neighborhood', 'property_type']
+    assert native.categorical_indices == [X_native.shape[1] - 2, X_native.shape[1] - 1]
+    np.testing.assert_array_equal(native.expand_onehot(X_native).toarray(), X_dense)
+    
+    unseen = native.transform(listings_df.head(1).assign(neighborhood='Atlantis'))
+    assert unseen[0, native.categorical_indices[0]] == -1
+
+def test_sparse_encoding_returns_csr(listings_df):
+    """Sparse encoding must return a CSR matrix with the dense one-hot values."""
+    X_dense, _, _ = AdvancedFeatureEngineer().fit_transform(listings_df)
+    X_sparse, _, _ = AdvancedFeatureEngineer(encoding='sparse').fit_transform(listings_df)
+    
+    assert X_sparse.format == 'csr'
+    np.testing.assert_array_equal(X_sparse.toarray(), X_dense)
+
+def test_partial_fit_matches_full_fit(listings_df):
+    """Merged batch statistics must match a fit on the full history."""
+    full = AdvancedFeatureEngineer(encoding='native')
+    full.fit_transform(listings_df)
+    incremental = AdvancedFeatureEngineer(encoding='native')
+    for batch in (listings_df.iloc[:15], listings_df.iloc[15:]):
+        incremental.partial_fit(batch)
+    
+    stats = incremental.neighborhood_stats.loc[full.neighborhood_stats.index]
+    np.testing.assert_allclose(stats.values, full.neighborhood_stats.values)
+    assert incremental.global_std == pytest.approx(full.global_std)
+    assert incremental.price_per_sqft_median == pytest.approx(full.price_per_sqft_median, rel=0.02)
+
+def test_partial_fit_extends_encoder(listings_df):
+    """A new neighborhood gets the next native code without changing existing ones."""
+    engineer = AdvancedFeatureEngineer(encoding='native')
+    engineer.fit_transform(listings_df)
+    before = engineer.transform(listings_df.head(5))
+    
+    engineer.partial_fit(listings_df.head(2).assign(neighborhood='Atlantis'))
+    X_new = engineer.transform(listings_df.head(1).assign(neighborhood='Atlantis'))
+    
+    assert X_new[0, engineer.categorical_indices[0]] == 3
+    np.testing.assert_array_equal(
+        engineer.transform(listings_df.head(5))[:, engineer.categorical_indices],
+        before[:, engineer.categorical_indices]
+    )
+
+def test_transform_is_column_order_independent(engineer, listings_df):
+    """The compiled plan must not depend on the input column order."""
+    X, _, _ = engineer.fit_transform(listings_df)
+    shuffled = listings_df[listings_df.columns[::-1]]
+    
+    np.testing.assert_allclose(engineer.transform(shuffled), X)
+
+def test_transform_missing_input_raises(engineer, listings_df):
+    """A missing required input must fail loudly instead of shifting columns."""
+    engineer.fit_transform(listings_df)
+    
+    with pytest.raises(ValueError, match='size_sqft'):
+        engineer.transform(listings_df.drop(columns=['size_sqft']))
+
+def test_arrow_backend_matches_pandas(listings_df):
+    """Arrow tables must produce the same matrix as the pandas path."""
+    pa = pytest.importorskip('pyarrow')
+    from src.ml.arrow_engine import transform_arrow, fit_transform_arrow
+    
+    engineer = AdvancedFeatureEngineer(encoding='native')
+    X, y, features = engineer.fit_transform(listings_df)
+    table = pa.Table.from_pandas(listings_df, preserve_index=False)
+    
+    np.testing.assert_allclose(transform_arrow(engineer, table), X)
+    X_arrow, y_arrow, features_arrow = fit_transform_arrow(AdvancedFeatureEngineer(encoding='native'), table)
+    np.testing.assert_allclose(X_arrow, X)
+    assert features_arrow == features
+
+def test_chunked_fit_transform_matches_in_memory(listings_df, tmp_path):
+    """Two-pass chunked fit_transform must match the in-memory fit up to the median sketches."""
+    from src.ml.out_of_core import fit_transform_chunked
+    
+    path = tmp_path / 'listings.csv'
+    listings_df.to_csv(path, index=False)
+    X, y, features = AdvancedFeatureEngineer(encoding='native').fit_transform(listings_df)
+    X_chunked, y_chunked, features_chunked, _ = fit_transform_chunked(
+        path, tmp_path / 'out', AdvancedFeatureEngineer(encoding='native'), chunksize=7
+    )
+    
+    assert isinstance(X_chunked, np.memmap)
+    assert features_chunked == features
+    np.testing.assert_allclose(y_chunked, y)
+    exact = [i for i, name in enumerate(features) if name not in ('is_spacious', 'is_value_property', 'is_premium_property')]
+    np.testing.assert_allclose(X_chunked[:, exact], X[:, exact])
+
+def test_chunked_fit_from_parquet_matches_csv(listings_df, tmp_path):
+    """Parquet record batches must stream through fit_chunks like CSV chunks."""
+    pytest.importorskip('pyarrow')
+    from src.ml.out_of_core import iter_chunks, fit_transform_chunked
+    
+    csv_path, parquet_path = tmp_path / 'listings.csv', tmp_path / 'listings.parquet'
+    listings_df.to_csv(csv_path, index=False)
+    listings_df.to_parquet(parquet_path, index=False)
+    
+    chunks = list(iter_chunks(parquet_path, chunksize=7))
+    assert [len(chunk) for chunk in chunks] == [7] * 5 + [5]
+    from_csv = AdvancedFeatureEngineer(encoding='native')
+    from_parquet = AdvancedFeatureEngineer(encoding='native')
+    assert from_parquet.fit_chunks(iter_chunks(parquet_path, chunksize=7)) == len(listings_df)
+    from_csv.fit_chunks(iter_chunks(csv_path, chunksize=7))
+    np.testing.assert_allclose(from_parquet.transform(listings_df), from_csv.transform(listings_df))
+    
+    X_parquet, y_parquet, _, _ = fit_transform_chunked(parquet_path, tmp_path / 'out',
+                                                       AdvancedFeatureEngineer(encoding='native'), chunksize=7)
+    np.testing.assert_allclose(y_parquet, listings_df['annual_rent'].values)
+    assert X_parquet.shape[0] == len(listings_df)
+
+def test_model_input_sources_fold_onehot_to_codes(listings_df):
+    """Expanded one-hot columns map back to the native code column they came from."""
+    native = AdvancedFeatureEngineer(encoding='native')
+    native.fit_transform(listings_df)
+    n_numeric = len(native.numeric_features)
+    
+    sources = native.model_input_sources('Random Forest')
+    
+    assert len(sources) == native.model_input_width('Random Forest')
+    np.testing.assert_array_equal(sources[:n_numeric], np.arange(n_numeric))
+    assert set(sources[n_numeric:]) == set(native.categorical_indices)
+    np.testing.assert_array_equal(native.model_input_sources('LightGBM'), np.arange(len(native.feature_names)))
+
+def test_raw_feature_attribution_preserves_totals(engineer, listings_df):
+    """Derived and one-hot columns are attributed to their raw inputs, shares summing to 1."""
+    engineer.fit_transform(listings_df)
+    names, matrix = engineer.raw_feature_attribution()
+    
+    assert matrix.shape == (len(engineer.feature_names), len(names))
+    np.testing.assert_allclose(matrix.sum(axis=1), 1.0)
+    row = matrix[engineer.feature_names.index('size_per_bedroom')]
+    assert row[names.index('size_sqft')] == row[names.index('bedrooms')] == 0.5
+    onehot = [i for i, name in enumerate(engineer.feature_names) if name.startswith('neighborhood_')
+              and name not in engineer.numeric_features]
+    assert onehot and all(matrix[i, names.index('neighborhood')] == 1.0 for i in onehot)
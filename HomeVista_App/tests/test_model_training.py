@@ -0,0 +1,82 @@
+"""
+Unit tests for the model training helpers.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.ml.feature_engineering import AdvancedFeatureEngineer
+from sklearn.ensemble import RandomForestRegressor
+from src.ml.model_training import check_input_layout, grow_random_forest, input_layout
+
+@pytest.fixture
+def listings_df():
+    """Fixture for a small listings dataframe."""
+    rng = np.random.default_rng(2)
+    n = 40
+    return pd.DataFrame({
+        'neighborhood': rng.choice(['Dubai Marina', 'Deira', 'Jumeirah'], n),
+        'property_type': rng.choice(['Studio', '1BR', '2BR'], n),
+        'size_sqft': rng.uniform(400, 1500, n),
+        'bedrooms': rng.integers(0, 3, n),
+        'bathrooms': rng.integers(1, 3, n),
+        'amenity_count': rng.integers(0, 9, n),
+        'tier_numeric': rng.integers(1, 5, n),
+        'furnished_numeric': rng.integers(0, 2, n),
+        'has_metro_numeric': rng.integers(0, 2, n),
+        'beach_accessible_numeric': rng.integers(0, 2, n),
+        'price_per_sqft': rng.uniform(50, 150, n),
+        'annual_rent': rng.uniform(40000, 200000, n)
+    })
+
+def test_input_layout_rejects_unseen_native_category(listings_df):
+    """A new category keeps the native columns but widens the one-hot members' inputs."""
+    engineer = AdvancedFeatureEngineer(encoding='native')
+    engineer.fit_transform(listings_df)
+    layout = input_layout(engineer)
+    
+    engineer.partial_fit(listings_df.head(3).assign(neighborhood='Atlantis'))
+    
+    assert engineer.feature_names == layout['feature_names']
+    assert input_layout(engineer)['widths']['Random Forest'] == layout['widths']['Random Forest'] + 1
+    with pytest.raises(ValueError, match='Random Forest, XGBoost'):
+        check_input_layout(engineer, layout)
+
+def test_input_layout_accepts_known_categories(listings_df):
+    """Batches with only known categories can be continued."""
+    engineer = AdvancedFeatureEngineer(encoding='native')
+    engineer.fit_transform(listings_df)
+    layout = input_layout(engineer)
+    
+    engineer.partial_fit(listings_df.head(10))
+    
+    check_input_layout(engineer, layout)
+
+@pytest.fixture
+def regression_data():
+    """Fixture for a small noisy regression problem."""
+    rng = np.random.default_rng(3)
+    X = rng.uniform(0, 1, (200, 4))
+    return X, X @ np.array([3.0, -2.0, 1.0, 0.5]) + rng.normal(0, 0.1, 200)
+
+def test_grow_random_forest_stops_on_plateau(regression_data):
+    """Growth stops at the first step improving the OOB error by less than the tolerance."""
+    X, y = regression_data
+    model = RandomForestRegressor(n_estimators=60, random_state=0)
+    
+    grow_random_forest(model, X, y, step=10, tolerance=1.0)
+    
+    assert [n for n, _ in model.oob_learning_curve_] == [10, 20]
+    assert model.n_estimators == len(model.estimators_) == 20
+    assert model.warm_start is False
+
+def test_grow_random_forest_stops_at_tree_cap(regression_data):
+    """Without a plateau the forest grows to its configured n_estimators."""
+    X, y = regression_data
+    model = RandomForestRegressor(n_estimators=45, random_state=0)
+    
+    grow_random_forest(model, X, y, step=10, tolerance=float('-inf'))
+    
+    assert [n for n, _ in model.oob_learning_curve_] == [10, 20, 30, 40, 45]
+    assert len(model.estimators_) == 45
+    assert all(mae > 0 for _, mae in model.oob_learning_curve_)
@@ -0,0 +1,114 @@
+"""
+Unit tests for the hyperparameter search helpers.
+"""
+
+import pytest
+import numpy as np
+import optuna
+from src.ml.optimization import (MULTI_OBJECTIVES, SEARCH_SPACES, halving_fractions, make_pruner, pareto_front,
+                                 narrow_space, search_fingerprint, select_configuration, stratified_subsample,
+                                 study_name, warm_start_seeds)
+
+def test_study_name_is_deterministic():
+    """Workers and resumed runs must attach to the same study."""
+    name = study_name('Random Forest', 'a' * 64)
+    
+    assert name == study_name('Random Forest', 'a' * 64)
+    assert 'random_forest' in name
+    assert name != study_name('Random Forest', 'b' * 64)
+    assert name != study_name('Random Forest', 'a' * 64, multi=True)
+    assert name != study_name('XGBoost', 'a' * 64)
+
+def test_make_pruner_kinds():
+    """Configured pruner names map to Optuna pruners; unknown names fail loudly."""
+    assert isinstance(make_pruner('median'), optuna.pruners.MedianPruner)
+    assert isinstance(make_pruner('hyperband'), optuna.pruners.HyperbandPruner)
+    assert isinstance(make_pruner(''), optuna.pruners.NopPruner)
+    with pytest.raises(ValueError, match='bogus'):
+        make_pruner('bogus')
+
+def test_halving_fractions_end_on_full_split():
+    """Rungs grow by eta from the minimum fraction and always end on the full training split."""
+    assert halving_fractions(1 / 9, 3) == pytest.approx([1 / 9, 1 / 3, 1.0])
+    assert halving_fractions(0.25, 3) == pytest.approx([0.25, 0.75, 1.0])
+    assert halving_fractions(1.0, 3) == [1.0]
+
+def test_stratified_subsample_keeps_rent_distribution():
+    """Subsamples have the requested size and cover every rent decile."""
+    rng = np.random.default_rng(4)
+    y = rng.lognormal(11, 0.4, 1000)
+    X = np.arange(1000).reshape(-1, 1)
+    
+    X_sub, y_sub = stratified_subsample(X, y, 0.2)
+    
+    assert len(y_sub) == 200
+    np.testing.assert_array_equal(y[X_sub[:, 0]], y_sub)
+    assert len(np.unique(np.digitize(y_sub, np.quantile(y, np.linspace(0.1, 0.9, 9))))) == 10
+    assert stratified_subsample(X, y, 1.0)[0] is X
+
+@pytest.fixture
+def multi_study():
+    """Fixture for a multi-objective study with a known Pareto front."""
+    study = optuna.create_study(directions=['minimize'] * len(MULTI_OBJECTIVES))
+    distributions = {'max_depth': optuna.distributions.IntDistribution(3, 15)}
+    for depth, values in [(12, [100.0, 4.0, 50.0, 20.0]),   # accurate, slow
+                          (6, [150.0, 1.0, 10.0, 5.0]),     # fast
+                          (8, [160.0, 2.0, 20.0, 8.0])]:    # dominated by depth 6
+        study.add_trial(optuna.trial.create_trial(params={'max_depth': depth}, distributions=distributions,
+                                                  values=values))
+    return study
+
+def test_pareto_front_drops_dominated_trials(multi_study):
+    """The front holds the non-dominated trials, most accurate first, with named objectives."""
+    front = pareto_front(multi_study)
+    
+    assert [record['params']['max_depth'] for record in front] == [12, 6]
+    assert set(MULTI_OBJECTIVES) <= set(front[0])
+    assert front[1]['single_row_ms'] == 1.0
+
+def test_select_configuration_respects_budgets(multi_study):
+    """The most accurate configuration within every budget wins; none fits an impossible budget."""
+    front = pareto_front(multi_study)
+    
+    assert select_configuration(front)['params']['max_depth'] == 12
+    assert select_configuration(front, latency_budget_ms=2.0)['params']['max_depth'] == 6
+    assert select_configuration(front, size_budget_mb=10.0, batch_budget_us=60.0)['params']['max_depth'] == 6
+    assert select_configuration(front, latency_budget_ms=0.5) is None
+
+def test_warm_start_seeds_stay_in_space():
+    """Seeds start with the (clipped) previous best and stay within the search space."""
+    space = SEARCH_SPACES['XGBoost']
+    previous = {'n_estimators': 5000, 'max_depth': 6, 'learning_rate': 0.1, 'subsample': 0.9,
+                'colsample_bytree': 0.7, 'min_child_weight': 3}
+    
+    seeds = warm_start_seeds('XGBoost', previous, n_neighbors=5, spread=0.2)
+    
+    assert len(seeds) == 6
+    assert seeds[0] == {**previous, 'n_estimators': 1000}
+    for seed in seeds:
+        for param, (kind, low, high) in space.items():
+            assert low <= seed[param] <= high
+            assert isinstance(seed[param], kind)
+    assert seeds == warm_start_seeds('XGBoost', previous, n_neighbors=5, spread=0.2)
+
+def test_narrow_space_shrinks_around_center():
+    """Each centred parameter keeps +/- spread of its range; others keep the full range."""
+    space = SEARCH_SPACES['Random Forest']
+    narrowed = narrow_space(space, {'max_depth': 29, 'min_samples_leaf': 5}, spread=0.2)
+    
+    assert narrowed['max_depth'] == (int, 24, 30)
+    assert narrowed['min_samples_leaf'] == (int, 3, 7)
+    assert narrowed['n_estimators'] == space['n_estimators']
+
+def test_study_name_changes_with_space_and_seeds():
+    """Warm starts from other seeds or a narrowed space must not resume an existing study."""
+    space = SEARCH_SPACES['LightGBM']
+    seeds = [{'max_depth': 6}]
+    base = study_name('LightGBM', 'a' * 64)
+    
+    assert base == study_name('LightGBM', 'a' * 64, space=space)
+    assert search_fingerprint('LightGBM') == search_fingerprint('LightGBM', space)
+    assert study_name('LightGBM', 'a' * 64, seeds=seeds) not in (base, study_name('LightGBM', 'a' * 64,
+                                                                                   seeds=[{'max_depth': 7}]))
+    narrowed = narrow_space(space, {'max_depth': 6})
+    assert study_name('LightGBM', 'a' * 64, space=narrowed) != base
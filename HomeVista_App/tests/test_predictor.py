@@ -5,7 +5,7 @@ Unit tests for RentPredictor class.
 import pytest
 import pandas as pd
 import numpy as np
-from src.dashboard.predictor import RentPredictor
+from src.dashboard.predictor import BASELINE_LABEL, PLACEHOLDER_INPUTS, RentPredictor
 
 @pytest.fixture
 def predictor():
@@ -74,3 +74,28 @@ def test_compare_with_market(predictor, sample_property):
     low_price = prediction * 0.8
     result_low = predictor.compare_with_market(sample_property, low_price)
     assert result_low['status'] == "Great Deal"
+
+def test_explain_adds_up_to_prediction(predictor, sample_property):
+    """Base value plus contributions must reproduce the ensemble prediction."""
+    prediction = predictor.predict(sample_property, return_confidence=False)['prediction']
+    explanation = predictor.explain(sample_property)
+    
+    assert 'Neighborhood' in explanation['contributions']
+    total = explanation['base_value'] + sum(explanation['contributions'].values())
+    assert total == pytest.approx(prediction, rel=1e-3)
+    assert explanation['prediction'] == pytest.approx(prediction, rel=1e-3)
+    
+    batch = predictor.explain([sample_property, {**sample_property, 'size_sqft': 2000}])
+    assert batch['contributions'].shape[0] == 2
+    assert batch['prediction'][0] == pytest.approx(prediction, rel=1e-3)
+
+def test_explain_groups_placeholder_inputs(predictor, sample_property):
+    """Inputs the user never entered must not be reported as labelled drivers."""
+    explanation = predictor.explain(sample_property)
+    labels = list(explanation['contributions'])
+    
+    assert not set(PLACEHOLDER_INPUTS) & set(labels)
+    assert 'Price per sq ft' not in labels
+    assert BASELINE_LABEL not in labels[:-1]
+    total = explanation['base_value'] + sum(explanation['contributions'].values())
+    assert total == pytest.approx(explanation['prediction'], rel=1e-3)
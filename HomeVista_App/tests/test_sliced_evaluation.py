@@ -0,0 +1,62 @@
+"""
+Unit tests for sliced evaluation with bootstrap confidence intervals.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, mean_squared_error, r2_score
+from src.ml.sliced_evaluation import METRICS, evaluate_slices, metrics_from_sums, row_statistics, worst_slices
+
+@pytest.fixture
+def predictions():
+    """Fixture for targets, predictions and slice columns of 60 listings."""
+    rng = np.random.default_rng(5)
+    n = 60
+    y_true = rng.uniform(40000, 200000, n)
+    y_pred = y_true * rng.normal(1, 0.1, n)
+    slices = pd.DataFrame({
+        'neighborhood': rng.choice(['Deira', 'Dubai Marina', 'Jumeirah'], n),
+        'bedrooms': rng.integers(0, 2, n),
+    })
+    return y_true, y_pred, slices
+
+def test_metrics_from_sums_match_sklearn(predictions):
+    """Metrics rebuilt from summed row statistics equal the sklearn metrics."""
+    y_true, y_pred, _ = predictions
+    
+    r2, mae, rmse, mape = metrics_from_sums(row_statistics(y_true, y_pred).sum(axis=0))
+    
+    assert r2 == pytest.approx(r2_score(y_true, y_pred))
+    assert mae == pytest.approx(mean_absolute_error(y_true, y_pred))
+    assert rmse == pytest.approx(np.sqrt(mean_squared_error(y_true, y_pred)))
+    assert mape == pytest.approx(mean_absolute_percentage_error(y_true, y_pred) * 100)
+
+def test_evaluate_slices_report_layout(predictions):
+    """One row per (slice, value, metric), the whole set first, intervals around the estimates."""
+    y_true, y_pred, slices = predictions
+    
+    report = evaluate_slices(y_true, y_pred, slices, columns=['neighborhood', 'bedrooms', 'missing'],
+                             n_replicates=40, n_cores=1)
+    
+    assert list(report.columns) == ['slice', 'value', 'n', 'metric', 'estimate', 'ci_lower', 'ci_upper']
+    assert len(report) == (1 + 3 + 2) * len(METRICS)
+    assert list(report['metric'][:len(METRICS)]) == list(METRICS)
+    assert (report['slice'][:len(METRICS)] == 'All').all() and report['n'].iloc[0] == len(y_true)
+    deira = report[(report['slice'] == 'neighborhood') & (report['value'] == 'Deira') & (report['metric'] == 'MAE')]
+    mask = (slices['neighborhood'] == 'Deira').to_numpy()
+    assert deira['estimate'].iloc[0] == pytest.approx(mean_absolute_error(y_true[mask], y_pred[mask]))
+    assert deira['n'].iloc[0] == mask.sum()
+    assert (report['ci_lower'] <= report['ci_upper']).all()
+    errors = report[report['metric'].isin(['MAE', 'MAPE'])]
+    assert ((errors['ci_lower'] <= errors['estimate'] * 1.5) & (errors['estimate'] <= errors['ci_upper'] * 1.5)).all()
+    assert worst_slices(report, min_rows=1, top=2)['slice'].ne('All').all()
+
+def test_evaluate_slices_without_bootstrap(predictions):
+    """Zero replicates give point estimates with empty intervals."""
+    y_true, y_pred, slices = predictions
+    
+    report = evaluate_slices(y_true, y_pred, slices, columns=['bedrooms'], n_replicates=0)
+    
+    assert report['ci_lower'].isna().all() and report['ci_upper'].isna().all()
+    assert report['estimate'].notna().all()
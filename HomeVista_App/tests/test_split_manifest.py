@@ -0,0 +1,69 @@
+"""
+Unit tests for the persisted train/validation/test split.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from src.ml.split_manifest import (SPLITS, load_holdout, load_manifest, load_split_frame, load_split_indices,
+                                   save_split, split_indices)
+
+@pytest.fixture
+def dataset(tmp_path):
+    """Fixture for a saved 40-row dataset with its split and held-out matrices."""
+    rng = np.random.default_rng(6)
+    df = pd.DataFrame({'size_sqft': rng.uniform(400, 1500, 40), 'annual_rent': rng.uniform(40000, 200000, 40)})
+    source = tmp_path / 'listings.csv'
+    df.to_csv(source, index=False)
+    X = df[['size_sqft']].to_numpy()
+    y = df['annual_rent'].to_numpy()
+    indices = split_indices(len(df))
+    split_dir = save_split(indices, {name: (X[indices[name]], y[indices[name]]) for name in ('val', 'test')},
+                           ['size_sqft'], split_dir=tmp_path / 'split', sources=[source])
+    return df, X, y, indices, split_dir
+
+def test_split_indices_partition_rows():
+    """The three splits partition the rows 70/15/15, reproducibly."""
+    indices = split_indices(100)
+    
+    assert [len(indices[name]) for name in SPLITS] == [70, 15, 15]
+    np.testing.assert_array_equal(np.sort(np.concatenate(list(indices.values()))), np.arange(100))
+    np.testing.assert_array_equal(split_indices(100)['test'], indices['test'])
+
+def test_save_split_round_trip(dataset):
+    """Held-out matrices, indices and raw rows come back exactly as saved."""
+    df, X, y, indices, split_dir = dataset
+    
+    X_test, y_test = load_holdout('test', split_dir=split_dir, engineer=SimpleNamespace(feature_names=['size_sqft']))
+    
+    np.testing.assert_array_equal(X_test, X[indices['test']])
+    np.testing.assert_array_equal(y_test, y[indices['test']])
+    for name in SPLITS:
+        np.testing.assert_array_equal(load_split_indices(split_dir)[name], indices[name])
+    pd.testing.assert_frame_equal(load_split_frame('val', split_dir), df.iloc[indices['val']], check_exact=False)
+    assert load_manifest(split_dir)['sizes'] == {name: len(indices[name]) for name in SPLITS}
+
+def test_load_holdout_rejects_mismatched_engineer(dataset):
+    """Matrices saved for other columns must not be scored by the current engineer."""
+    split_dir = dataset[-1]
+    
+    with pytest.raises(ValueError, match='re-run model training'):
+        load_holdout('test', split_dir=split_dir, engineer=SimpleNamespace(feature_names=['bedrooms']))
+    with pytest.raises(ValueError, match='train'):
+        load_holdout('train', split_dir=split_dir)
+
+def test_save_split_keeps_sparse_matrices(tmp_path):
+    """CSR held-out matrices are stored and loaded as CSR."""
+    indices = split_indices(20)
+    X = sparse.random(20, 5, density=0.3, format='csr', random_state=0)
+    y = np.arange(20.0)
+    split_dir = save_split(indices, {'test': (X[indices['test']], y[indices['test']])}, list('abcde'),
+                           split_dir=tmp_path / 'split')
+    
+    X_test, _ = load_holdout('test', split_dir=split_dir)
+    
+    assert sparse.issparse(X_test)
+    np.testing.assert_array_equal(X_test.toarray(), X[indices['test']].toarray())
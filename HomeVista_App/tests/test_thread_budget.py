@@ -0,0 +1,45 @@
+"""
+Unit tests for the process-wide thread budgets.
+"""
+
+import pytest
+from src.ml import thread_budget
+from src.ml.thread_budget import ENV_INFERENCE_THREADS, ENV_THREADS, core_budget, inference_threads
+
+@pytest.fixture
+def no_limits(monkeypatch):
+    """Fixture clearing the environment and config overrides."""
+    monkeypatch.delenv(ENV_THREADS, raising=False)
+    monkeypatch.delenv(ENV_INFERENCE_THREADS, raising=False)
+    monkeypatch.setattr(thread_budget.config, 'THREAD_LIMIT', None)
+    monkeypatch.setattr(thread_budget.config, 'INFERENCE_THREADS', None)
+    monkeypatch.setattr(thread_budget, 'available_cores', lambda: 8)
+
+def test_core_budget_precedence(no_limits, monkeypatch):
+    """Explicit argument, then environment, then config, then the available cores."""
+    assert core_budget() == 8
+    monkeypatch.setattr(thread_budget.config, 'THREAD_LIMIT', 4)
+    assert core_budget() == 4
+    monkeypatch.setenv(ENV_THREADS, '2')
+    assert core_budget() == 2
+    assert core_budget(6) == 6
+
+def test_core_budget_is_at_least_one(no_limits, monkeypatch):
+    """Zero or negative settings never yield an empty budget."""
+    monkeypatch.setenv(ENV_THREADS, '0')
+    assert core_budget() == 1
+    assert core_budget(-3) == 1
+
+def test_core_budget_rejects_malformed_environment(no_limits, monkeypatch):
+    """A non-numeric override must fail loudly."""
+    monkeypatch.setenv(ENV_THREADS, 'all')
+    with pytest.raises(ValueError, match=ENV_THREADS):
+        core_budget()
+
+def test_inference_threads_defaults_to_one(no_limits, monkeypatch):
+    """The dashboard serves with one thread unless configured otherwise."""
+    assert inference_threads() == 1
+    monkeypatch.setattr(thread_budget.config, 'INFERENCE_THREADS', 3)
+    assert inference_threads() == 3
+    monkeypatch.setenv(ENV_INFERENCE_THREADS, '2')
+    assert inference_threads() == 2